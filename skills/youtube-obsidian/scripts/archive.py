@@ -0,0 +1,257 @@
+#!/usr/bin/env python3
+"""Append-only archive of compressed transcripts with an O(1) index.
+
+Two files make up an archive:
+
+- the data file: zlib-compressed sidecar records (Transcript.to_bytes)
+  appended one after another;
+- the index file: a fixed-width, open-addressed hash table mapping a video
+  ID to the offset and length of its latest record.
+
+Both are read through mmap. Finding a transcript hashes the video ID to a
+slot and probes a few fixed-width records; its compressed bytes are a
+memoryview of the data map, so nothing is copied until it is inflated.
+Storing a transcript again appends a new record and repoints the slot; the
+old bytes stay behind until compact() is called.
+
+Several processes may share an archive: writes hold an exclusive flock on
+transcripts.lock and lookups a shared one. Growing or compacting replaces
+the index file, so every operation first checks whether the index was
+replaced since it was mapped and remaps it if so.
+"""
+
+import hashlib
+import mmap
+import os
+import struct
+import zlib
+
+from locks import FileLock
+from transcript import Transcript
+
+INDEX_MAGIC = b"YTX1"
+# magic, slot count, used slots
+INDEX_HEADER = struct.Struct("<4sQQ4x")
+# video ID (NUL-padded), data offset, record length
+INDEX_SLOT = struct.Struct("<16sQQ")
+INITIAL_SLOTS = 1024
+MAX_LOAD = 0.5
+COMPRESSION_LEVEL = 6
+
+
+def _slot_of(key, slots):
+    digest = hashlib.blake2b(key, digest_size=8).digest()
+    return int.from_bytes(digest, "little") % slots
+
+
+def _key(video_id):
+    key = video_id.encode("ascii")
+    if not key or len(key) > 16:
+        raise ValueError(f"Invalid video ID for archive: {video_id!r}")
+    return key.ljust(16, b"\0")
+
+
+def _create_index(path, slots, entries=()):
+    """Write a fresh index with the given (key, offset, length) entries."""
+    table = bytearray(INDEX_HEADER.size + slots * INDEX_SLOT.size)
+    used = 0
+    for key, offset, length in entries:
+        slot = _slot_of(key, slots)
+        while table[_position(slot) : _position(slot) + 16] != bytes(16):
+            slot = (slot + 1) % slots
+        INDEX_SLOT.pack_into(table, _position(slot), key, offset, length)
+        used += 1
+    INDEX_HEADER.pack_into(table, 0, INDEX_MAGIC, slots, used)
+    temp_path = f"{path}.tmp"
+    with open(temp_path, "wb") as f:
+        f.write(table)
+    os.replace(temp_path, path)
+
+
+def _position(slot):
+    return INDEX_HEADER.size + slot * INDEX_SLOT.size
+
+
+class TranscriptArchive:
+    """Transcripts of a vault, stored once and read through mmap."""
+
+    def __init__(self, directory):
+        os.makedirs(directory, exist_ok=True)
+        self.data_path = os.path.join(directory, "transcripts.dat")
+        self.index_path = os.path.join(directory, "transcripts.idx")
+        self.lock_path = os.path.join(directory, "transcripts.lock")
+        self._data = None
+        self._data_file = None
+        self._index = None
+        self._index_file = None
+        self._index_inode = None
+        with FileLock(self.lock_path):
+            if not os.path.exists(self.index_path):
+                _create_index(self.index_path, INITIAL_SLOTS)
+            self._open_index()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def close(self):
+        self._close_data()
+        self._index.close()
+        self._index_file.close()
+
+    def _open_index(self):
+        self._index_file = open(self.index_path, "r+b")
+        self._index_inode = os.fstat(self._index_file.fileno()).st_ino
+        self._index = mmap.mmap(self._index_file.fileno(), 0)
+        magic, self.slots, self.used = INDEX_HEADER.unpack_from(self._index)
+        if magic != INDEX_MAGIC:
+            self._index.close()
+            self._index_file.close()
+            raise ValueError("Not a transcript archive index")
+
+    def _refresh(self):
+        """Pick up changes other processes made; call with the lock held."""
+        if os.stat(self.index_path).st_ino != self._index_inode:
+            self._index.close()
+            self._index_file.close()
+            self._close_data()
+            self._open_index()
+        else:
+            _, self.slots, self.used = INDEX_HEADER.unpack_from(self._index)
+
+    def _close_data(self):
+        if self._data is not None:
+            self._data.close()
+            self._data_file.close()
+            self._data = self._data_file = None
+
+    def _find(self, key):
+        """Return (slot, offset, length) for key, or (free slot, 0, 0)."""
+        slot = _slot_of(key, self.slots)
+        while True:
+            stored, offset, length = INDEX_SLOT.unpack_from(
+                self._index, _position(slot)
+            )
+            if stored == key or stored == bytes(16):
+                return slot, offset, length
+            slot = (slot + 1) % self.slots
+
+    def __len__(self):
+        with FileLock(self.lock_path, shared=True):
+            self._refresh()
+            return self.used
+
+    def __contains__(self, video_id):
+        with FileLock(self.lock_path, shared=True):
+            self._refresh()
+            return self._find(_key(video_id))[2] > 0
+
+    def video_ids(self):
+        """Return the IDs of all archived transcripts, in slot order."""
+        video_ids = []
+        with FileLock(self.lock_path, shared=True):
+            self._refresh()
+            for slot in range(self.slots):
+                key, _, length = INDEX_SLOT.unpack_from(self._index, _position(slot))
+                if length:
+                    video_ids.append(key.rstrip(b"\0").decode("ascii"))
+        return video_ids
+
+    def raw(self, video_id):
+        """Return the compressed record as a memoryview of the data map.
+
+        Returns None for unknown videos. The view must be released before
+        the archive is closed or written to.
+        """
+        with FileLock(self.lock_path, shared=True):
+            self._refresh()
+            _, offset, length = self._find(_key(video_id))
+        if not length:
+            return None
+        if self._data is None or offset + length > len(self._data):
+            self._close_data()
+            self._data_file = open(self.data_path, "rb")
+            self._data = mmap.mmap(self._data_file.fileno(), 0, access=mmap.ACCESS_READ)
+        return memoryview(self._data)[offset : offset + length]
+
+    def get(self, video_id):
+        """Return the archived Transcript for video_id, or None."""
+        view = self.raw(video_id)
+        if view is None:
+            return None
+        with view:
+            return Transcript.from_bytes(zlib.decompress(view))
+
+    def put(self, video_id, transcript):
+        """Append a transcript and point video_id's slot at it."""
+        key = _key(video_id)
+        record = zlib.compress(transcript.to_bytes(), COMPRESSION_LEVEL)
+        self._close_data()
+        with FileLock(self.lock_path):
+            self._refresh()
+            with open(self.data_path, "ab") as f:
+                offset = f.tell()
+                f.write(record)
+
+            slot, _, length = self._find(key)
+            INDEX_SLOT.pack_into(self._index, _position(slot), key, offset, len(record))
+            if not length:
+                self.used += 1
+                INDEX_HEADER.pack_into(
+                    self._index, 0, INDEX_MAGIC, self.slots, self.used
+                )
+            if self.used > self.slots * MAX_LOAD:
+                self._grow()
+
+    def _grow(self):
+        entries = []
+        for slot in range(self.slots):
+            entry = INDEX_SLOT.unpack_from(self._index, _position(slot))
+            if entry[2]:
+                entries.append(entry)
+        slots = self.slots * 2
+        self._index.close()
+        self._index_file.close()
+        _create_index(self.index_path, slots, entries)
+        self._open_index()
+
+    def compact(self):
+        """Rewrite the data file with only the latest record per video.
+
+        Returns the number of bytes freed; the file is left alone when no
+        record was replaced.
+        """
+        with FileLock(self.lock_path):
+            self._refresh()
+            return self._compact()
+
+    def _compact(self):
+        self._close_data()
+        if not os.path.exists(self.data_path):
+            return 0
+        size = os.path.getsize(self.data_path)
+        live = sum(
+            INDEX_SLOT.unpack_from(self._index, _position(slot))[2]
+            for slot in range(self.slots)
+        )
+        if live == size:
+            return 0
+        entries = []
+        temp_path = f"{self.data_path}.tmp"
+        with open(self.data_path, "rb") as source, open(temp_path, "wb") as target:
+            for slot in range(self.slots):
+                key, offset, length = INDEX_SLOT.unpack_from(
+                    self._index, _position(slot)
+                )
+                if length:
+                    source.seek(offset)
+                    entries.append((key, target.tell(), length))
+                    target.write(source.read(length))
+        os.replace(temp_path, self.data_path)
+        self._index.close()
+        self._index_file.close()
+        _create_index(self.index_path, self.slots, entries)
+        self._open_index()
+        return size - live
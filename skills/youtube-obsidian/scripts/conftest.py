@@ -182,6 +182,16 @@ def mock_transcript_list(mock_transcript_entry_factory):
     ]
 
 
+@pytest.fixture(autouse=True)
+def clear_transcript_list_cache():
+    """Keep the per-video transcript-list cache from leaking between tests."""
+    from get_youtube_data import list_transcripts
+
+    list_transcripts.cache_clear()
+    yield
+    list_transcripts.cache_clear()
+
+
 # =============================================================================
 # FIXTURE: Temporary Directory for File Operations
 # =============================================================================
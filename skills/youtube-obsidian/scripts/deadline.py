@@ -0,0 +1,44 @@
+#!/usr/bin/env python3
+"""Time budget of a run (--deadline).
+
+The deadline is fixed when the run starts. Every network request is given
+the time left as its timeout, so a stuck request can't outlive the budget,
+and a stage about to start when no time is left is cancelled instead.
+"""
+
+import time
+
+
+class DeadlineExceededError(Exception):
+    """The run's deadline passed before a stage could start."""
+
+
+class Deadline:
+    """A point in time the run has to finish by."""
+
+    def __init__(self, seconds, clock=time.monotonic):
+        self._clock = clock
+        self.expires = clock() + seconds
+
+    def remaining(self):
+        """Seconds left, 0 once the deadline has passed."""
+        return max(0.0, self.expires - self._clock())
+
+    @property
+    def expired(self):
+        return self.remaining() == 0.0
+
+    def timeout(self, stage):
+        """Time left, as the timeout of a request made by stage.
+
+        Raises DeadlineExceededError if there is none left.
+        """
+        remaining = self.remaining()
+        if not remaining:
+            raise DeadlineExceededError(f"Deadline reached before {stage}")
+        return remaining
+
+
+def stage_timeout(deadline, stage):
+    """Timeout for a stage's requests: None without a deadline."""
+    return None if deadline is None else deadline.timeout(stage)
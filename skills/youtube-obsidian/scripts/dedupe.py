@@ -0,0 +1,173 @@
+#!/usr/bin/env python3
+"""Near-duplicate transcript detection with MinHash and LSH banding.
+
+Each transcript is reduced to a fixed-size MinHash signature over its word
+shingles. Signatures are computed in one pass with one-permutation hashing:
+every shingle is hashed once and its hash is kept as the minimum of one of
+SIGNATURE_SIZE bins. Words are streamed from the text and hashed once
+each with CRC-32; a shingle's 64-bit hash is Python's hash of the tuple of
+its word hashes, which (unlike str hashes) is the same in every process, so
+signatures stay comparable across runs. The fraction of equal slots in two signatures
+estimates the Jaccard similarity of the shingle sets.
+
+Signatures live in a small SQLite file together with their LSH band keys.
+A lookup fetches only the notes sharing at least one band through an
+indexed query, so its cost does not grow with the size of the vault.
+"""
+
+import hashlib
+import os
+import re
+import sqlite3
+import zlib
+from array import array
+from collections import deque
+
+SHINGLE_WORDS = 5
+SIGNATURE_SIZE = 128
+# 16 bands of 8 rows: pairs above ~0.7 similarity almost always share a
+# band, pairs below ~0.4 almost never do.
+BANDS = 16
+ROWS = SIGNATURE_SIZE // BANDS
+DUPLICATE_THRESHOLD = 0.8
+
+WORD = re.compile(r"\w+")
+_MASK = 0xFFFFFFFF
+_MASK64 = (1 << 64) - 1
+_BIN_BITS = SIGNATURE_SIZE.bit_length() - 1
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS signatures (
+    video_id TEXT PRIMARY KEY,
+    note TEXT NOT NULL,
+    signature BLOB NOT NULL
+);
+CREATE TABLE IF NOT EXISTS bands (
+    band_key INTEGER NOT NULL,
+    video_id TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS bands_by_key ON bands (band_key);
+CREATE INDEX IF NOT EXISTS bands_by_video ON bands (video_id);
+"""
+
+
+def shingle_hashes(text, size=SHINGLE_WORDS):
+    """Yield a 64-bit hash for every run of size consecutive words.
+
+    A text shorter than size words yields one hash over all its words.
+    """
+    window = deque(maxlen=size)
+    for match in WORD.finditer(str(text)):
+        window.append(zlib.crc32(match[0].lower().encode("utf-8")))
+        if len(window) == size:
+            yield hash(tuple(window)) & _MASK64
+    if 0 < len(window) < size:
+        yield hash(tuple(window)) & _MASK64
+
+
+def minhash_signature(text):
+    """Return the MinHash signature of text as array('I'), or None if empty.
+
+    Bins no shingle fell into borrow the value of the next filled bin
+    (rotation densification), so every slot stays comparable.
+    """
+    empty = 1 << 64
+    bins = [empty] * SIGNATURE_SIZE
+    for value in shingle_hashes(text):
+        slot = value & (SIGNATURE_SIZE - 1)
+        value >>= _BIN_BITS
+        if value < bins[slot]:
+            bins[slot] = value
+    if all(value == empty for value in bins):
+        return None
+
+    signature = array("I", [0]) * SIGNATURE_SIZE
+    for slot in range(SIGNATURE_SIZE):
+        distance = 0
+        while bins[(slot + distance) % SIGNATURE_SIZE] == empty:
+            distance += 1
+        value = bins[(slot + distance) % SIGNATURE_SIZE]
+        signature[slot] = (value + distance * 0x9E3779B1) & _MASK
+    return signature
+
+
+def similarity(a, b):
+    """Estimated Jaccard similarity of two signatures."""
+    return sum(x == y for x, y in zip(a, b)) / len(a)
+
+
+def band_keys(signature):
+    """Return one signed 64-bit key per LSH band of signature."""
+    keys = []
+    for band in range(BANDS):
+        rows = signature[band * ROWS : (band + 1) * ROWS]
+        digest = hashlib.blake2b(bytes([band]) + rows.tobytes(), digest_size=8).digest()
+        keys.append(int.from_bytes(digest, "little", signed=True))
+    return keys
+
+
+class DuplicateIndex:
+    """On-disk MinHash signatures with an LSH band lookup table."""
+
+    def __init__(self, path):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self.connection = sqlite3.connect(path)
+        self.connection.executescript(SCHEMA)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def close(self):
+        self.connection.close()
+
+    def __len__(self):
+        (count,) = self.connection.execute("SELECT COUNT(*) FROM signatures").fetchone()
+        return count
+
+    def add(self, video_id, note, signature):
+        """Store (or replace) the signature of a video's note."""
+        with self.connection:
+            self.connection.execute("DELETE FROM bands WHERE video_id = ?", (video_id,))
+            self.connection.execute(
+                "INSERT OR REPLACE INTO signatures VALUES (?, ?, ?)",
+                (video_id, note, signature.tobytes()),
+            )
+            self.connection.executemany(
+                "INSERT INTO bands VALUES (?, ?)",
+                [(key, video_id) for key in band_keys(signature)],
+            )
+
+    def remove(self, video_id):
+        """Forget a video's signature."""
+        with self.connection:
+            self.connection.execute("DELETE FROM bands WHERE video_id = ?", (video_id,))
+            self.connection.execute(
+                "DELETE FROM signatures WHERE video_id = ?", (video_id,)
+            )
+
+    def find(self, signature, threshold=DUPLICATE_THRESHOLD, exclude=None):
+        """Return [(similarity, video_id, note)] at or above threshold.
+
+        Only notes sharing an LSH band with signature are compared. Results
+        are sorted by decreasing similarity; exclude skips one video ID
+        (the video being ingested).
+        """
+        keys = band_keys(signature)
+        rows = self.connection.execute(
+            "SELECT s.video_id, s.note, s.signature FROM signatures s "
+            "WHERE s.video_id IN (SELECT video_id FROM bands WHERE band_key IN "
+            f"({', '.join('?' * len(keys))}))",
+            keys,
+        )
+        matches = []
+        for video_id, note, blob in rows:
+            if video_id == exclude:
+                continue
+            score = similarity(signature, array("I", blob))
+            if score >= threshold:
+                matches.append((score, video_id, note))
+        matches.sort(key=lambda match: (-match[0], match[1]))
+        return matches
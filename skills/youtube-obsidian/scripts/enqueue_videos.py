@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""Queue videos for import by get_youtube_data.py --worker.
+
+enqueue_videos.py URL...               queue videos (playlist URLs queue
+                                       every video in the playlist)
+enqueue_videos.py --status             jobs per status and failures
+enqueue_videos.py --retry-failed       queue failed jobs again
+"""
+
+import argparse
+import os
+import sys
+
+from get_youtube_data import (
+    extract_playlist_id,
+    extract_video_id,
+    get_playlist_video_ids,
+    job_queue_path,
+)
+from job_queue import JobQueue
+
+
+def build_parser():
+    """Command line interface for the job queue."""
+    parser = argparse.ArgumentParser(
+        description="Add videos to the vault's import queue."
+    )
+    parser.add_argument(
+        "urls", nargs="*", help="YouTube video or playlist URLs, or video IDs"
+    )
+    parser.add_argument(
+        "--vault",
+        default=os.environ.get("VAULT_PATH") or os.environ.get("OBSIDIAN_VAULT_PATH"),
+        help="Vault to queue for (defaults to VAULT_PATH / OBSIDIAN_VAULT_PATH)",
+    )
+    parser.add_argument(
+        "--status",
+        action="store_true",
+        help="Show how many jobs are queued, leased, done and failed",
+    )
+    parser.add_argument(
+        "--retry-failed",
+        action="store_true",
+        help="Queue the jobs that failed for good again",
+    )
+    return parser
+
+
+def expand_urls(urls, api_key):
+    """Return [(video_id, url)] for video URLs and the videos of playlist URLs."""
+    jobs = []
+    for url in urls:
+        playlist_id = extract_playlist_id(url)
+        if playlist_id and "v=" not in url:
+            if not api_key:
+                raise ValueError("YOUTUBE_API_KEY is needed to expand playlists")
+            jobs.extend(
+                (video_id, f"https://www.youtube.com/watch?v={video_id}")
+                for video_id in get_playlist_video_ids(playlist_id, api_key)
+            )
+        else:
+            jobs.append((extract_video_id(url), url))
+    return jobs
+
+
+def main():
+    parser = build_parser()
+    args = parser.parse_args()
+
+    if not args.vault:
+        print("Error: VAULT_PATH or OBSIDIAN_VAULT_PATH environment variable not set")
+        sys.exit(1)
+    if not args.urls and not args.status and not args.retry_failed:
+        parser.print_usage()
+        sys.exit(1)
+
+    try:
+        jobs = expand_urls(args.urls, os.environ.get("YOUTUBE_API_KEY"))
+    except Exception as e:
+        print(f"Error: {e}")
+        sys.exit(1)
+
+    with JobQueue(job_queue_path(args.vault)) as queue:
+        if jobs:
+            outcomes = queue.enqueue(jobs)
+            print(f"Queued {outcomes.get('added', 0)} video(s)")
+            waiting = outcomes.get("queued", 0) + outcomes.get("leased", 0)
+            if waiting:
+                print(f"{waiting} already queued")
+            if outcomes.get("done"):
+                print(f"{outcomes['done']} already imported")
+            if outcomes.get("failed"):
+                print(f"{outcomes['failed']} failed before (see --retry-failed)")
+        if args.retry_failed:
+            print(f"Queued {queue.retry_failed()} failed video(s) again")
+        if args.status:
+            counts = queue.counts()
+            for status in ("queued", "leased", "done", "failed"):
+                print(f"{counts.get(status, 0):6d}  {status}")
+            for video_id, error in queue.failures():
+                print(f"{video_id}: {error}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,9 +1,29 @@
 #!/usr/bin/env python3
+import argparse
+import functools
+import hashlib
+import itertools
 import json
 import os
 import re
 import sys
 
+from archive import TranscriptArchive
+from deadline import Deadline, stage_timeout
+from dedupe import DUPLICATE_THRESHOLD, DuplicateIndex, minhash_signature
+from job_queue import LEASE_SECONDS, Heartbeat, JobQueue, worker_name
+from journal import Journal
+from locks import FileLock, LockBusyError, stripe
+from note_patch import NOTE_SECTIONS, find_sections, patch_note
+from note_writer import FSYNC_EVERY, READ_SIZE, NoteWriter
+from related import RELATED_NOTES, RelatedIndex, term_counts
+from search_index import SearchIndex
+from summarize import format_summary, summarize
+from tag_index import SUGGESTED_TAGS, TagIndex
+from transcript import Transcript, clean_segments, format_timestamp
+from vault_index import VaultIndex
+from video_store import VideoStore
+
 try:
     import requests
 except ImportError:
@@ -19,6 +39,83 @@ except ImportError:
     )
     sys.exit(1)
 
+# Bump whenever the layout produced by create_obsidian_note changes so that
+# rerender_notes.py regenerates existing notes.
+NOTE_TEMPLATE_VERSION = 3
+
+# Hidden vault directory for the skill's own bookkeeping files.
+STATE_DIR = ".youtube-obsidian"
+
+MAX_TAGS = 15
+
+COMMON_TECH_TERMS = [
+    "python",
+    "javascript",
+    "ai",
+    "machine learning",
+    "programming",
+    "development",
+    "software",
+    "api",
+    "data",
+    "web",
+    "frontend",
+    "backend",
+    "cloud",
+    "docker",
+    "kubernetes",
+    "tutorial",
+    "guide",
+    "youtube",
+    "video",
+    "learning",
+    "course",
+    "tips",
+    "best practices",
+]
+
+# Long transcripts are rendered and scanned in slices of this many characters
+# so no whole-transcript copy is ever made.
+TRANSCRIPT_CHUNK_SIZE = 1 << 16
+
+# Caption languages to look for, most preferred first. Manual captions in
+# any of these beat auto-generated ones; a translation is the last resort.
+DEFAULT_LANGUAGES = ("en",)
+
+# Paragraph grouping for timestamped transcripts: a paragraph is closed once
+# it spans PARAGRAPH_SECONDS or at a pause of PARAGRAPH_PAUSE_SECONDS.
+PARAGRAPH_SECONDS = 60.0
+PARAGRAPH_PAUSE_SECONDS = 2.0
+
+# "00:00 Intro", "1:02:03 - Q&A", "(12:34) Setup", "- 12:34 Setup"
+CHAPTER_PATTERN = re.compile(
+    r"^\s*(?:[-*•]\s*)?\(?((?:\d{1,2}:)?\d{1,2}:\d{2})\)?\s*(?:[-–—:|]\s*)?(\S.*?)\s*$",
+    re.MULTILINE,
+)
+# YouTube only treats a description timestamp list as chapters when it has
+# at least this many entries, starting at 0:00, in ascending order.
+MIN_CHAPTERS = 3
+
+VAULT_LAYOUTS = ("flat", "channel", "date", "hash")
+
+# Canonical watch URL of a video, the base of timestamp deep links.
+VIDEO_URL = "https://www.youtube.com/watch?v={}"
+
+# Stages of process_video, in order, as reported to its progress callback
+# and recorded in batch checkpoint journals.
+STAGES = ("metadata", "transcript", "note", "indexes")
+# Statuses of videos a resumed batch doesn't process again.
+FINISHED = ("written", "unchanged", "skipped")
+# Statuses batch and worker runs count, in the order they are reported.
+RUN_STATUSES = FINISHED + ("failed", "partial", "cancelled")
+
+# Notes whose transcript is longer than this many characters are split into
+# linked transcript part notes (see iter_note_files).
+DEFAULT_MAX_NOTE_SIZE = 1_000_000
+
+KEYWORD_PATTERN = re.compile(r"\b[A-Z][a-z]+(?:\s+[A-Z][a-z]+)*\b")
+KEYWORD_CONTINUATION = re.compile(r"\s*[A-Z][a-z]+(?:\s+[A-Z][a-z]+)*\b")
+
 
 def extract_video_id(url):
     """Extract YouTube video ID from various URL formats."""
@@ -35,17 +132,56 @@ def extract_video_id(url):
     raise ValueError(f"Could not extract video ID from URL: {url}")
 
 
-def get_video_metadata(video_id, api_key):
-    """Fetch video title, description, and tags from YouTube Data API."""
+def extract_playlist_id(url):
+    """Return the playlist ID of a playlist URL (its list= parameter), or None."""
+    match = re.search(r"[?&]list=([a-zA-Z0-9_-]+)", url)
+    return match.group(1) if match else None
+
+
+def get_playlist_video_ids(playlist_id, api_key):
+    """Return the IDs of the videos in a playlist, in playlist order."""
+    url = "https://www.googleapis.com/youtube/v3/playlistItems"
+    params = {
+        "part": "contentDetails",
+        "playlistId": playlist_id,
+        "key": api_key,
+        "maxResults": 50,
+        "fields": "nextPageToken,items(contentDetails(videoId))",
+    }
+    video_ids = []
+    while True:
+        response = requests.get(url, params=params)
+        response.raise_for_status()
+        data = response.json()
+        video_ids.extend(
+            item["contentDetails"]["videoId"] for item in data.get("items", [])
+        )
+        if not data.get("nextPageToken"):
+            return video_ids
+        params["pageToken"] = data["nextPageToken"]
+
+
+def get_video_metadata(video_id, api_key, etag=None, timeout=None):
+    """Fetch video title, description, tags, channel and upload time.
+
+    The response ETag is returned as metadata["etag"]. Passing a stored
+    etag makes the request conditional: None is returned when the video is
+    unchanged (HTTP 304). timeout (seconds) bounds the request.
+    """
     url = "https://www.googleapis.com/youtube/v3/videos"
     params = {
         "part": "snippet",
         "id": video_id,
         "key": api_key,
-        "fields": "items(snippet(title,description,tags))",
+        "fields": (
+            "etag,items(snippet(title,description,tags,channelTitle,publishedAt))"
+        ),
     }
+    headers = {"If-None-Match": etag} if etag else {}
 
-    response = requests.get(url, params=params)
+    response = requests.get(url, params=params, headers=headers, timeout=timeout)
+    if etag and response.status_code == 304:
+        return None
     response.raise_for_status()
 
     data = response.json()
@@ -58,20 +194,342 @@ def get_video_metadata(video_id, api_key):
         "title": snippet.get("title", ""),
         "description": snippet.get("description", ""),
         "tags": snippet.get("tags", []),
+        "channel": snippet.get("channelTitle", ""),
+        "published_at": snippet.get("publishedAt", ""),
+        "etag": data.get("etag"),
     }
 
 
+def parse_timestamp(text):
+    """Convert "mm:ss" or "h:mm:ss" to seconds."""
+    seconds = 0
+    for part in text.split(":"):
+        seconds = seconds * 60 + int(part)
+    return seconds
+
+
+def parse_chapters(description):
+    """Extract the chapter list from a video description.
+
+    Returns a list of (start_seconds, title) tuples, or an empty list when
+    the description has no valid chapter list.
+    """
+    chapters = [
+        (parse_timestamp(match.group(1)), match.group(2))
+        for match in CHAPTER_PATTERN.finditer(description)
+    ]
+    if len(chapters) < MIN_CHAPTERS or chapters[0][0] != 0:
+        return []
+    if any(a[0] >= b[0] for a, b in zip(chapters, chapters[1:])):
+        return []
+    return chapters
+
+
+class DeadlineSession(requests.Session):
+    """HTTP session timing every request out when its deadline passes.
+
+    The timeout is the time left when each request starts, so a slow first
+    request leaves less time for the next. Without a deadline requests are
+    made as usual.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.deadline = None
+
+    def request(self, *args, **kwargs):
+        if self.deadline is not None:
+            kwargs.setdefault("timeout", self.deadline.timeout("transcript request"))
+        return super().request(*args, **kwargs)
+
+
+# Every transcript list (and so every track fetched from a cached list)
+# makes its requests through this session; fetch_transcript sets the
+# deadline it runs under.
+TRANSCRIPT_SESSION = DeadlineSession()
+
+
+@functools.lru_cache(maxsize=64)
+def list_transcripts(video_id):
+    """Fetch the list of caption tracks for a video (cached per video)."""
+    return YouTubeTranscriptApi(http_client=TRANSCRIPT_SESSION).list(video_id)
+
+
+def select_transcript(transcript_list, languages=DEFAULT_LANGUAGES):
+    """Pick a caption track from a transcript list without further requests.
+
+    Preference: manual captions in the first available language of
+    languages, then auto-generated ones, then a translation of a manual (or
+    else generated) track into the first translatable language, then any
+    track at all. Returns (track, kind) where kind is "manual", "generated"
+    or "translated".
+    """
+    tracks = list(transcript_list)
+    by_kind = {}
+    for track in tracks:
+        by_kind.setdefault((track.is_generated, track.language_code), track)
+
+    for generated in (False, True):
+        for language in languages:
+            track = by_kind.get((generated, language))
+            if track is not None:
+                return track, "generated" if generated else "manual"
+
+    for track in sorted(tracks, key=lambda t: t.is_generated):
+        if not track.is_translatable:
+            continue
+        available = {lang.language_code for lang in track.translation_languages}
+        for language in languages:
+            if language in available:
+                return track.translate(language), "translated"
+
+    if not tracks:
+        raise ValueError("No transcripts available")
+    track = tracks[0]
+    return track, "generated" if track.is_generated else "manual"
+
+
+def fetch_transcript(video_id, clean=True, languages=DEFAULT_LANGUAGES, deadline=None):
+    """Fetch the transcript for the video, keeping segment timing.
+
+    The caption track is chosen by select_transcript from a single (cached)
+    transcript-list request. With clean=True, noise annotations and
+    redundant whitespace are removed and, for auto-generated captions,
+    rolling-caption repeats are merged. With a deadline, each request
+    times out when it passes.
+    """
+    TRANSCRIPT_SESSION.deadline = deadline
+    try:
+        track, kind = select_transcript(list_transcripts(video_id), languages)
+        fetched = track.fetch()
+        entries = fetched
+        if clean:
+            entries = clean_segments(fetched, merge_overlaps=track.is_generated)
+        transcript = Transcript.from_entries(entries)
+        transcript.language = track.language_code
+        transcript.kind = kind
+        return transcript
+    except Exception as e:
+        raise ValueError(f"Could not fetch transcript: {e}")
+    finally:
+        TRANSCRIPT_SESSION.deadline = None
+
+
 def get_transcript(video_id):
     """Fetch full transcript for the video."""
     try:
         api = YouTubeTranscriptApi()
         transcript_list = api.fetch(video_id)
-        transcript = " ".join([entry.text for entry in transcript_list])
-        return transcript
+        return Transcript.from_entries(transcript_list).text
     except Exception as e:
         raise ValueError(f"Could not fetch transcript: {e}")
 
 
+def video_store_path(vault_path):
+    """Path of the vault's canonical store of fetched video data."""
+    return os.path.join(vault_path, STATE_DIR, "videos.sqlite")
+
+
+def note_directory(layout, video_id, metadata):
+    """Vault-relative directory a new note goes to under a layout.
+
+    "flat" puts every note in the vault root, "channel" in one directory
+    per channel, "date" in upload year/month directories and "hash" in 256
+    shards keyed by a hash of the video ID.
+    """
+    if layout == "flat":
+        return ""
+    if layout == "channel":
+        # No leading dots: ".." would leave the vault and ".name" would be
+        # a hidden directory that find_notes skips.
+        channel = metadata.get("channel") or "Unknown channel"
+        channel = sanitize_filename(channel).lstrip(". ")
+        return channel or "Unknown channel"
+    if layout == "date":
+        published = metadata.get("published_at") or ""
+        if len(published) < 7:
+            return "Undated"
+        return os.path.join(published[:4], published[5:7])
+    if layout == "hash":
+        return hashlib.blake2b(video_id.encode(), digest_size=1).hexdigest()
+    raise ValueError(f"Unknown vault layout: {layout}")
+
+
+def vault_index_path(vault_path):
+    """Path of the vault's index of written note files."""
+    return os.path.join(vault_path, STATE_DIR, "vault.sqlite")
+
+
+def vault_lock(vault_path, name, shared=False, blocking=True):
+    """Cross-process lock called name in the vault's lock directory."""
+    path = os.path.join(vault_path, STATE_DIR, "locks", f"{name}.lock")
+    return FileLock(path, shared, blocking)
+
+
+def note_lock(vault_path, video_id):
+    """Lock held while a video's note is named, written and indexed."""
+    return vault_lock(vault_path, f"note-{stripe(video_id):02x}")
+
+
+def index_journal_path(vault_path):
+    """Path of the write-ahead journal of index updates."""
+    return os.path.join(vault_path, STATE_DIR, "index.journal")
+
+
+def find_notes(vault_path):
+    """Yield paths of all markdown files in the vault, skipping hidden dirs."""
+    for root, dirs, files in os.walk(vault_path):
+        dirs[:] = sorted(d for d in dirs if not d.startswith("."))
+        for name in sorted(files):
+            if name.endswith(".md"):
+                yield os.path.join(root, name)
+
+
+def note_owner(path):
+    """Return the youtube_id in the frontmatter of the note at path.
+
+    Returns "" for a note without one (not written by this skill) and None
+    if there is no file at path. Only the frontmatter is read.
+    """
+    try:
+        with open(path, encoding="utf-8", errors="replace") as f:
+            if f.readline() != "---\n":
+                return ""
+            for line in f:
+                if line == "---\n":
+                    break
+                key, sep, value = line.partition(":")
+                if sep and key.strip() == "youtube_id":
+                    return value.strip()
+    except FileNotFoundError:
+        return None
+    return ""
+
+
+def file_owner(vault_path, vault_index, note_path):
+    """Return the video whose note is at vault-relative note_path.
+
+    Files the skill wrote are looked up in the vault index: a note by its
+    path, a transcript part by the owner of its name. Only other paths are
+    probed, with note_owner.
+    """
+    if vault_index is not None:
+        owner = vault_index.video_at(note_path)
+        if owner is None and vault_index.has_file(note_path):
+            owner = vault_index.name_owner(
+                os.path.basename(note_path).removesuffix(".md")
+            )
+        if owner is not None:
+            return owner
+    return note_owner(os.path.join(vault_path, note_path))
+
+
+def check_note_owner(vault_path, vault_index, note_path, video_id):
+    """Raise ValueError if the file at note_path is not video_id's note."""
+    owner = file_owner(vault_path, vault_index, note_path)
+    if owner is not None and owner != video_id:
+        raise ValueError(
+            f"Not overwriting {note_path}: it is not the note of {video_id}"
+        )
+
+
+def open_vault_index(vault_path, store):
+    """Open the vault index, registering notes it predates as taken names.
+
+    The first time, the names of the stored videos' notes are registered,
+    then every note name in the vault (transcript parts and hand-written
+    notes included) under the youtube_id of its frontmatter.
+    """
+    index = VaultIndex(vault_index_path(vault_path))
+    if not index.has_names():
+        index.import_names(store.notes())
+        index.import_names(
+            (note_owner(path), os.path.basename(path).removesuffix(".md"))
+            for path in find_notes(vault_path)
+        )
+    return index
+
+
+def job_queue_path(vault_path):
+    """Path of the vault's queue of videos waiting to be imported."""
+    return os.path.join(vault_path, STATE_DIR, "queue.sqlite")
+
+
+def batch_journal_path(vault_path, urls):
+    """Path of the checkpoint journal of a batch, keyed by its URL list."""
+    digest = hashlib.blake2b("\n".join(urls).encode(), digest_size=8).hexdigest()
+    return os.path.join(vault_path, STATE_DIR, "batches", f"{digest}.journal")
+
+
+def transcript_archive(vault_path):
+    """Open the vault's transcript archive."""
+    return TranscriptArchive(os.path.join(vault_path, STATE_DIR))
+
+
+def load_transcript(vault_path, video_id):
+    """Return a video's archived Transcript (one mmap'd lookup), or None."""
+    with transcript_archive(vault_path) as archive:
+        return archive.get(video_id)
+
+
+def duplicate_index_path(vault_path):
+    """Path of the vault's near-duplicate (MinHash) index."""
+    return os.path.join(vault_path, STATE_DIR, "duplicates.sqlite")
+
+
+def related_index_path(vault_path):
+    """Path of the vault's related-notes (TF-IDF) index."""
+    return os.path.join(vault_path, STATE_DIR, "related.sqlite")
+
+
+def tag_index_path(vault_path):
+    """Path of the vault's tag -> notes index."""
+    return os.path.join(vault_path, STATE_DIR, "tags.sqlite")
+
+
+def search_index_path(vault_path):
+    """Path of the vault's full-text (FTS5) search index."""
+    return os.path.join(vault_path, STATE_DIR, "search.sqlite")
+
+
+def _iter_keywords(header, transcript):
+    """Yield capitalized phrases from header + transcript without joining them.
+
+    header always ends with a space, so the only phrase that can span the
+    join is one followed by nothing but whitespace in the header that
+    continues at the start of the transcript.
+    """
+    carry = None
+    for match in KEYWORD_PATTERN.finditer(header):
+        if header[match.end() :].isspace():
+            carry = match
+        else:
+            yield match.group()
+
+    pos = 0
+    if carry is not None:
+        continuation = KEYWORD_CONTINUATION.match(transcript)
+        if continuation:
+            yield header[carry.start() :] + continuation.group()
+            pos = continuation.end()
+        else:
+            yield carry.group()
+    yield from (m.group() for m in KEYWORD_PATTERN.finditer(transcript, pos))
+
+
+def _iter_lowercase_windows(header, transcript, overlap):
+    """Yield lowercased windows covering header + transcript.
+
+    Consecutive windows share overlap characters so that any substring of
+    up to overlap + 1 characters appears whole in at least one window.
+    """
+    yield header.lower()
+    yield (header[max(0, len(header) - overlap) :] + transcript[:overlap]).lower()
+    for start in range(0, len(transcript), TRANSCRIPT_CHUNK_SIZE):
+        window = transcript[max(0, start - overlap) : start + TRANSCRIPT_CHUNK_SIZE]
+        yield window.lower()
+
+
 def generate_tags(title, description, transcript, youtube_tags=None):
     """Generate relevant tags from video content."""
     tags = set()
@@ -79,46 +537,39 @@ def generate_tags(title, description, transcript, youtube_tags=None):
     if youtube_tags:
         tags.update(youtube_tags)
 
-    content = f"{title} {description} {transcript}"
+    # Scan title/description and the transcript separately rather than
+    # concatenating them, which would copy the whole transcript twice.
+    header = f"{title} {description} "
 
-    keywords = re.findall(r"\b[A-Z][a-z]+(?:\s+[A-Z][a-z]+)*\b", content)
-    for kw in keywords[:10]:
+    for kw in itertools.islice(_iter_keywords(header, transcript), 10):
         tag = kw.lower()
         if len(tag) > 3:
             tags.add(tag)
 
-    common_tech_terms = [
-        "python",
-        "javascript",
-        "ai",
-        "machine learning",
-        "programming",
-        "development",
-        "software",
-        "api",
-        "data",
-        "web",
-        "frontend",
-        "backend",
-        "cloud",
-        "docker",
-        "kubernetes",
-        "tutorial",
-        "guide",
-        "youtube",
-        "video",
-        "learning",
-        "course",
-        "tips",
-        "best practices",
-    ]
+    remaining = list(COMMON_TECH_TERMS)
+    overlap = max(map(len, remaining), default=1) - 1
+    for window in _iter_lowercase_windows(header, transcript, overlap):
+        found = [term for term in remaining if term in window]
+        tags.update(found)
+        remaining = [term for term in remaining if term not in found]
+        if not remaining:
+            break
+
+    return sorted(list(tags))[:MAX_TAGS]
 
-    lower_content = content.lower()
-    for term in common_tech_terms:
-        if term in lower_content:
-            tags.add(term)
 
-    return sorted(list(tags))[:15]
+def render_hash():
+    """Hash of the note template and tag vocabulary used to render notes."""
+    payload = json.dumps(
+        [
+            NOTE_TEMPLATE_VERSION,
+            MAX_TAGS,
+            COMMON_TECH_TERMS,
+            PARAGRAPH_SECONDS,
+            PARAGRAPH_PAUSE_SECONDS,
+        ]
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()[:12]
 
 
 def sanitize_filename(title):
@@ -134,26 +585,108 @@ def sanitize_filename(title):
     return title or "video"
 
 
-def create_obsidian_note(
-    video_id, url, metadata, transcript, user_summary, user_comments=None
+def timestamp_url(video_id, seconds):
+    """Deep link into the video at the given offset.
+
+    Built from the video ID rather than the URL the user gave, which may be
+    a bare ID or already carry a t= parameter.
+    """
+    return f"{VIDEO_URL.format(video_id)}&t={int(seconds)}s"
+
+
+def _iter_text_slices(text, start, stop):
+    """Yield text[start:stop] in slices of at most TRANSCRIPT_CHUNK_SIZE.
+
+    Slices end after a space where possible so that anything splitting the
+    stream at slice boundaries does not cut words in half.
+    """
+    pos = start
+    while pos < stop:
+        end = min(pos + TRANSCRIPT_CHUNK_SIZE, stop)
+        if end < stop:
+            space = text.rfind(" ", pos, end)
+            if space > pos:
+                end = space + 1
+        yield text[pos:end]
+        pos = end
+
+
+def _iter_segment_range(transcript, video_id, timestamps, first, stop):
+    """Yield segments first..stop-1 as plain text or linked paragraphs."""
+    if timestamps:
+        paragraphs = transcript.paragraphs(
+            PARAGRAPH_SECONDS, PARAGRAPH_PAUSE_SECONDS, first, stop
+        )
+        for start, text in paragraphs:
+            yield f"[{format_timestamp(start)}]({timestamp_url(video_id, start)}) "
+            yield text
+            yield "\n\n"
+    elif first < stop:
+        start = transcript.offsets[first]
+        yield from _iter_text_slices(
+            transcript.text, start, transcript.offsets[stop] - 1
+        )
+        yield "\n\n"
+
+
+def _iter_transcript_chunks(transcript, video_id, timestamps, chapters):
+    """Yield the Full Transcript section body."""
+    if not isinstance(transcript, Transcript):
+        yield from _iter_text_slices(transcript, 0, len(transcript))
+        yield "\n"
+        return
+
+    if not chapters:
+        if timestamps:
+            yield from _iter_segment_range(
+                transcript, video_id, True, 0, len(transcript)
+            )
+        else:
+            yield from _iter_text_slices(transcript.text, 0, len(transcript.text))
+            yield "\n"
+        return
+
+    ranges = transcript.split_at([start for start, _ in chapters])
+    for (start, title), (first, stop) in zip(chapters, ranges):
+        link = timestamp_url(video_id, start)
+        yield f"### [{format_timestamp(start)}]({link}) {title}\n"
+        yield from _iter_segment_range(transcript, video_id, timestamps, first, stop)
+
+
+def _iter_note_header(
+    video_id,
+    url,
+    metadata,
+    transcript,
+    user_summary,
+    user_comments,
+    timestamps,
+    transcript_parts=0,
 ):
-    """Create Obsidian markdown note with frontmatter and content."""
+    """Yield everything up to and including the Full Transcript heading."""
     title = metadata["title"]
     description = metadata["description"]
     youtube_tags = metadata.get("tags", [])
 
-    tags = generate_tags(title, description, transcript, youtube_tags)
+    tags = generate_tags(title, description, str(transcript), youtube_tags)
 
-    frontmatter = f"""---
+    yield f"""---
 title: {title}
 youtube_id: {video_id}
 tags: {json.dumps(tags)}
 youtube_url: {url}
----
-
+youtube_tags: {json.dumps(youtube_tags)}
 """
+    if metadata.get("transcript_language"):
+        yield f"transcript_language: {metadata['transcript_language']}\n"
+        yield f"transcript_kind: {metadata.get('transcript_kind', '')}\n"
+    if timestamps:
+        yield "transcript_format: timestamped\n"
+    if transcript_parts:
+        yield f"transcript_parts: {transcript_parts}\n"
+    yield "---\n\n"
 
-    content = f"""# {title}
+    yield f"""# {title}
 
 ## Summary
 {user_summary}
@@ -161,35 +694,984 @@ youtube_url: {url}
 """
 
     if user_comments:
-        content += f"""## Notes/Comments
+        yield f"""## Notes/Comments
 {user_comments}
 
 """
 
-    content += f"""## Description
+    if metadata.get("related"):
+        links = "\n".join(f"- [[{name}]]" for name in metadata["related"])
+        yield f"""## Related
+{links}
+
+"""
+
+    yield f"""## Description
 {description}
 
 ## Full Transcript
-{transcript}
 """
 
-    return frontmatter + content, sanitize_filename(title)
 
+def render_obsidian_note(
+    video_id,
+    url,
+    metadata,
+    transcript,
+    user_summary,
+    user_comments=None,
+    timestamps=False,
+):
+    """Yield the Obsidian note for a video as a sequence of text chunks.
 
-def main():
-    if len(sys.argv) < 2:
+    transcript is a str or a Transcript. The transcript is emitted in
+    TRANSCRIPT_CHUNK_SIZE slices (or one paragraph at a time), so writing
+    the chunks out never holds more than one slice beyond the transcript
+    itself. With timestamps=True and a Transcript, the transcript is grouped
+    into paragraphs, each prefixed with a deep link to where it starts. When
+    the description lists chapters and the transcript has timing, the
+    transcript is split into one heading per chapter.
+    """
+    timestamps = timestamps and isinstance(transcript, Transcript)
+    yield from _iter_note_header(
+        video_id, url, metadata, transcript, user_summary, user_comments, timestamps
+    )
+    yield from _iter_transcript_chunks(
+        transcript, video_id, timestamps, _chapters_for(metadata, transcript)
+    )
+
+
+def _chapters_for(metadata, transcript):
+    """Chapters to split the transcript by; they need segment timing."""
+    if not isinstance(transcript, Transcript):
+        return []
+    return parse_chapters(metadata["description"])
+
+
+def _split_chunks(chunks, max_size):
+    """Lazily group chunks into parts of at most max_size characters.
+
+    Yields one iterator per part; each must be exhausted before the next
+    is requested. A chunk larger than max_size gets a part to itself.
+    """
+    chunks = iter(chunks)
+    pending = next(chunks, None)
+
+    def part():
+        nonlocal pending
+        size = 0
+        while pending is not None and (size == 0 or size + len(pending) <= max_size):
+            size += len(pending)
+            yield pending
+            pending = next(chunks, None)
+
+    while pending is not None:
+        yield part()
+
+
+def transcript_part_name(filename, number):
+    """Filename (without .md) of a transcript part note."""
+    return f"{filename} (Transcript {number})"
+
+
+def iter_note_files(
+    filename,
+    video_id,
+    url,
+    metadata,
+    transcript,
+    user_summary,
+    user_comments=None,
+    timestamps=False,
+    max_size=None,
+):
+    """Yield (filename, chunks) for every file making up a video's note.
+
+    Notes whose transcript exceeds max_size characters are split: the
+    transcript is streamed into numbered part notes, followed by the main
+    note with frontmatter, summary and description and links to the parts.
+    Each chunk iterator must be exhausted before advancing to the next file.
+    """
+    if not max_size or len(str(transcript)) <= max_size:
+        yield (
+            filename,
+            render_obsidian_note(
+                video_id,
+                url,
+                metadata,
+                transcript,
+                user_summary,
+                user_comments,
+                timestamps,
+            ),
+        )
+        return
+
+    timestamps = timestamps and isinstance(transcript, Transcript)
+    title = metadata["title"]
+    chunks = _iter_transcript_chunks(
+        transcript, video_id, timestamps, _chapters_for(metadata, transcript)
+    )
+    parts = 0
+    for part in _split_chunks(chunks, max_size):
+        parts += 1
+        header = f"""---
+title: {title} (Transcript {parts})
+youtube_id: {video_id}
+transcript_part: {parts}
+---
+
+# {title} (Transcript {parts})
+
+Back to [[{filename}]]
+
+"""
+        yield transcript_part_name(filename, parts), itertools.chain([header], part)
+
+    links = "".join(
+        f"- [[{transcript_part_name(filename, number)}]]\n"
+        for number in range(1, parts + 1)
+    )
+    header = _iter_note_header(
+        video_id,
+        url,
+        metadata,
+        transcript,
+        user_summary,
+        user_comments,
+        timestamps,
+        transcript_parts=parts,
+    )
+    yield (
+        filename,
+        itertools.chain(header, [f"Transcript split into {parts} parts:\n", links]),
+    )
+
+
+def create_obsidian_note(
+    video_id,
+    url,
+    metadata,
+    transcript,
+    user_summary,
+    user_comments=None,
+    timestamps=False,
+):
+    """Create Obsidian markdown note with frontmatter and content."""
+    chunks = render_obsidian_note(
+        video_id, url, metadata, transcript, user_summary, user_comments, timestamps
+    )
+    return "".join(chunks), sanitize_filename(metadata["title"])
+
+
+def parse_obsidian_note(content):
+    """Parse a note written by create_obsidian_note back into its parts.
+
+    Returns a dict with the frontmatter fields plus one entry per section
+    (summary, comments, description, transcript). Raises ValueError if the
+    content has no frontmatter.
+    """
+    if not content.startswith("---\n"):
+        raise ValueError("Note has no frontmatter")
+    end = content.find("\n---\n", 3)
+    if end == -1:
+        raise ValueError("Note frontmatter is not closed")
+
+    note = {}
+    for line in content[4:end].split("\n"):
+        key, sep, value = line.partition(":")
+        if not sep:
+            continue
+        key, value = key.strip(), value.strip()
+        if key in ("tags", "youtube_tags"):
+            try:
+                value = json.loads(value)
+            except ValueError:
+                value = []
+        note[key] = value
+
+    # Section bodies may contain their own "## " headings (user summaries
+    # often do), so only the known top-level headings delimit sections.
+    body = content[end + 5 :]
+    positions = []
+    search_from = 0
+    for name in NOTE_SECTIONS:
+        heading = f"\n## {name}\n"
+        pos = body.find(heading, search_from)
+        if pos != -1:
+            positions.append((name, pos, pos + len(heading)))
+            search_from = pos + len(heading)
+    for i, (name, _, start) in enumerate(positions):
+        stop = positions[i + 1][1] if i + 1 < len(positions) else len(body)
+        note[NOTE_SECTIONS[name]] = body[start:stop].removesuffix("\n")
+    return note
+
+
+def update_indexes(
+    vault_path,
+    video_id,
+    filename,
+    note_path,
+    metadata,
+    transcript,
+    tags,
+    signature,
+    counts,
+):
+    """Add a written note to the vault's indexes, each under its own lock."""
+    if signature is not None:
+        with (
+            vault_lock(vault_path, "duplicates"),
+            DuplicateIndex(duplicate_index_path(vault_path)) as index,
+        ):
+            index.add(video_id, filename, signature)
+    if counts:
+        with (
+            vault_lock(vault_path, "related"),
+            RelatedIndex(related_index_path(vault_path)) as index,
+        ):
+            index.add(video_id, filename, counts)
+    with vault_lock(vault_path, "tags"), TagIndex(tag_index_path(vault_path)) as index:
+        index.set_tags(video_id, filename, tags)
+    with (
+        vault_lock(vault_path, "search"),
+        SearchIndex(search_index_path(vault_path)) as index,
+    ):
+        index.add(
+            video_id,
+            note_path,
+            metadata["title"],
+            metadata["description"],
+            transcript,
+        )
+
+
+def _unfinished_updates(journal):
+    """Return {video_id: index record} for updates without a done record."""
+    pending = {}
+    for record in journal.records():
+        if record.get("op") == "index":
+            pending[record["video_id"]] = record
+        elif record.get("op") == "done":
+            pending.pop(record.get("video_id"), None)
+    return pending
+
+
+def compact_index_journal(vault_path):
+    """Drop the finished updates from the index journal when a run ends.
+
+    Only done if no other writer holds the journal lock, so runs that
+    overlap leave it to whichever finishes last; unfinished updates are
+    kept for recover_indexes. Returns True if the journal was compacted.
+    """
+    journal_path = index_journal_path(vault_path)
+    if not os.path.exists(journal_path):
+        return False
+    try:
+        lock = vault_lock(vault_path, "journal", blocking=False)
+        lock.acquire()
+    except LockBusyError:
+        return False
+    try:
+        with Journal(journal_path) as journal:
+            journal.rewrite(_unfinished_updates(journal).values())
+        return True
+    finally:
+        lock.release()
+
+
+def recover_indexes(vault_path, store, vault_index):
+    """Finish index updates that a crashed writer journaled but didn't complete.
+
+    Runs only while no other writer holds the journal lock, replays the
+    unfinished updates from the stored metadata and transcript, then
+    empties the journal. Returns the number of updates replayed.
+    """
+    journal_path = index_journal_path(vault_path)
+    if not os.path.exists(journal_path):
+        return 0
+    try:
+        lock = vault_lock(vault_path, "journal", blocking=False)
+        lock.acquire()
+    except LockBusyError:
+        return 0
+    try:
+        with Journal(journal_path) as journal:
+            pending = _unfinished_updates(journal)
+            for video_id, record in pending.items():
+                metadata = store.get(video_id)
+                transcript = load_transcript(vault_path, video_id)
+                if metadata is None or transcript is None:
+                    continue
+                tags = generate_tags(
+                    metadata["title"],
+                    metadata["description"],
+                    str(transcript),
+                    metadata["tags"],
+                )
+                update_indexes(
+                    vault_path,
+                    video_id,
+                    record["note"],
+                    record["path"],
+                    metadata,
+                    transcript,
+                    tags,
+                    minhash_signature(transcript),
+                    term_counts(transcript, metadata["tags"]),
+                )
+                store.put_note(video_id, record["note"], tags)
+                vault_index.put_note(video_id, record["path"])
+            vault_index.commit()
+            journal.rewrite([])
+        return len(pending)
+    finally:
+        lock.release()
+
+
+def load_metadata(store, video_id, url, api_key, timeout=None):
+    """Return a video's metadata, revalidating the stored copy by ETag.
+
+    Unchanged videos (HTTP 304) are served from the store; new or changed
+    ones are fetched and stored.
+    """
+    stored = store.get(video_id)
+    metadata = get_video_metadata(
+        video_id, api_key, etag=stored["etag"] if stored else None, timeout=timeout
+    )
+    if metadata is None:
+        store.touch_metadata(video_id)
+        print("Metadata unchanged since last fetch")
+        keys = ("title", "description", "tags", "channel", "published_at", "etag")
+        return {key: stored[key] for key in keys}
+    store.put_metadata(video_id, url, metadata)
+    return metadata
+
+
+def _remove_stale_parts(vault_path, directory, filename, video_id, files, writer):
+    """Delete part notes past the files just written; returns how many.
+
+    Parts are numbered from 1 without gaps, so the stale ones are found by
+    probing upwards from the first number no longer written. A file that
+    isn't a part of video_id's note ends the probe and is left alone.
+    """
+    removed = 0
+    number = files
+    while True:
+        note_path = os.path.join(
+            directory, f"{transcript_part_name(filename, number)}.md"
+        )
+        if file_owner(vault_path, writer.index, note_path) != video_id:
+            return removed
+        os.remove(os.path.join(vault_path, note_path))
+        if writer.index is not None:
+            writer.index.remove_file(note_path)
+        removed += 1
+        number += 1
+
+
+def _ignore_stage(stage):
+    pass
+
+
+def _lacks_transcript(path):
+    """Whether the note at path has an empty Full Transcript section."""
+    sections = find_sections(path)
+    if "transcript" not in sections:
+        return False
+    _, body, stop = sections["transcript"]
+    with open(path, "rb") as f:
+        f.seek(body)
+        # Transcript text starts right after the heading; no need to read on.
+        return not f.read(min(stop - body, READ_SIZE)).strip()
+
+
+def _update_sections(metadata, user_summary, user_comments):
+    """Sections --update rewrites; summary and comments only if given."""
+    sections = {"description": metadata["description"]}
+    if metadata.get("related"):
+        sections["related"] = "\n".join(f"- [[{name}]]" for name in metadata["related"])
+    if user_summary:
+        sections["summary"] = user_summary
+    if user_comments:
+        sections["comments"] = user_comments
+    return sections
+
+
+def process_video(
+    youtube_url,
+    args,
+    vault_path,
+    api_key,
+    store,
+    writer,
+    user_summary="",
+    user_comments="",
+    progress=None,
+    deadline=None,
+):
+    """Fetch one video and write its note(s) into the vault.
+
+    Returns "written", "unchanged" when the rendered note(s) match what is
+    already in the vault, or "skipped" when the video is a near-duplicate
+    and args.skip_duplicates is set. Errors propagate to the caller.
+    progress, if given, is called with the name of each stage completed
+    (one of STAGES).
+
+    With a deadline, requests time out when it passes. If that happens
+    while fetching the transcript, a partial note without the transcript is
+    written (and left out of the indexes) and "partial" is returned; the
+    next run without a deadline problem completes it.
+    """
+    if progress is None:
+        progress = _ignore_stage
+    video_id = extract_video_id(youtube_url)
+    print(f"Extracted video ID: {video_id}")
+
+    print("Fetching video metadata...")
+    metadata = load_metadata(
+        store, video_id, youtube_url, api_key, stage_timeout(deadline, "metadata")
+    )
+    print(f"Title: {metadata['title']}")
+    progress("metadata")
+
+    partial = False
+    transcript = None
+    if not args.refetch_transcript:
+        transcript = load_transcript(vault_path, video_id)
+    if transcript is not None:
+        print("Using stored transcript")
+        stored = store.get(video_id)
+        transcript.language = stored["transcript_language"]
+        transcript.kind = stored["transcript_kind"]
+    else:
+        print("Fetching transcript...")
+        languages = tuple(filter(None, args.languages.split(",")))
+        try:
+            transcript = fetch_transcript(
+                video_id,
+                clean=not args.raw_transcript,
+                languages=languages,
+                deadline=deadline,
+            )
+        except Exception:
+            if deadline is None or not deadline.expired:
+                raise
+            print("Deadline reached: writing the note without its transcript")
+            transcript = Transcript()
+            partial = True
+        else:
+            with transcript_archive(vault_path) as archive:
+                archive.put(video_id, transcript)
+            store.put_transcript(video_id, transcript)
+    metadata["transcript_language"] = transcript.language
+    metadata["transcript_kind"] = transcript.kind
+    print(f"Transcript track: {transcript.language} ({transcript.kind})")
+    print(
+        f"Transcript length: {len(transcript.text)} characters, "
+        f"{len(transcript)} segments"
+    )
+    if not partial:
+        progress("transcript")
+
+    signature = minhash_signature(transcript)
+    if signature is not None:
+        with DuplicateIndex(duplicate_index_path(vault_path)) as index:
+            duplicates = index.find(
+                signature, args.duplicate_threshold, exclude=video_id
+            )
+        for score, other_id, note in duplicates:
+            print(f"Possible duplicate of [[{note}]] ({other_id}, {score:.0%})")
+        if duplicates and args.skip_duplicates:
+            print("Skipping note: near-duplicate transcript")
+            return "skipped"
+
+    if args.auto_summary and not user_summary and not partial:
+        print("Summarizing transcript...")
+        user_summary = format_summary(summarize(transcript))
+
+    print("Generating Obsidian note...")
+    with note_lock(vault_path, video_id):
+        vault_index = writer.index
+        known = vault_index.note_path(video_id) if vault_index is not None else None
+        # A known note keeps its directory, even if the layout changed since.
+        if known is not None:
+            directory = os.path.dirname(known)
+        else:
+            directory = note_directory(args.layout, video_id, metadata)
+
+        def free(name):
+            # Catches notes added to the vault since its names were
+            # registered, before the name is claimed.
+            path = os.path.join(directory, f"{name}.md")
+            return file_owner(vault_path, vault_index, path) in (None, video_id)
+
+        filename = sanitize_filename(metadata["title"])
+        if vault_index is not None:
+            filename = vault_index.allocate_name(video_id, filename, free)
+        counts = term_counts(transcript, metadata.get("tags", []))
+        if args.related > 0:
+            with RelatedIndex(related_index_path(vault_path)) as index:
+                related = index.related(counts, args.related, exclude=video_id)
+            metadata["related"] = [note for _, _, note in related]
+        note_path = os.path.join(directory, f"{filename}.md")
+        output_path = os.path.join(vault_path, note_path)
+        check_note_owner(vault_path, vault_index, note_path, video_id)
+        if partial and not args.update and os.path.exists(output_path):
+            print(f"Keeping the existing note: {output_path}")
+            return "partial"
+        tags = generate_tags(
+            metadata["title"],
+            metadata["description"],
+            str(transcript),
+            metadata.get("tags", []),
+        )
+        update = args.update and os.path.exists(output_path)
+        if update and not partial and _lacks_transcript(output_path):
+            # A partial note: rendered in full to fill in the transcript,
+            # keeping the summary and comments written into it.
+            print("Filling in the transcript of a partial note...")
+            with open(output_path, encoding="utf-8") as f:
+                note = parse_obsidian_note(f.read())
+            user_summary = user_summary or note.get("summary", "")
+            user_comments = user_comments or note.get("comments")
+            update = False
+        if update:
+            print("Updating note sections...")
+            changed = patch_note(
+                output_path,
+                _update_sections(metadata, user_summary, user_comments),
+                fsync=writer.sync_every == 1,
+                fields={
+                    "tags": json.dumps(tags),
+                    "youtube_tags": json.dumps(metadata.get("tags", [])),
+                },
+            )
+        else:
+            note_files = iter_note_files(
+                filename,
+                video_id,
+                youtube_url,
+                metadata,
+                transcript,
+                user_summary,
+                user_comments,
+                timestamps=args.timestamps,
+                max_size=args.max_note_size,
+            )
+            os.makedirs(os.path.join(vault_path, directory), exist_ok=True)
+            files = 0
+            changed = 0
+            for name, chunks in note_files:
+                part_path = os.path.join(directory, f"{name}.md")
+                output_path = os.path.join(vault_path, part_path)
+                check_note_owner(vault_path, vault_index, part_path, video_id)
+                if vault_index is not None and not vault_index.claim_name(
+                    video_id, name
+                ):
+                    raise ValueError(f"Note name {name} belongs to another note")
+                changed += writer.write(output_path, chunks)
+                files += 1
+            if files > 1:
+                print(f"Transcript split into {files - 1} part notes")
+            removed = _remove_stale_parts(
+                vault_path, directory, filename, video_id, files, writer
+            )
+            if removed:
+                print(f"Removed {removed} transcript part note(s) no longer needed")
+                changed += removed
+        progress("note")
+        if partial:
+            # Only record where the note is, so the next run replaces it.
+            if vault_index is not None:
+                vault_index.put_note(video_id, note_path)
+                vault_index.commit()
+            print(f"Partial note written: {output_path}")
+            return "partial"
+        # Journal the index updates so a crash halfway through them is
+        # finished by the next run (see recover_indexes).
+        with (
+            vault_lock(vault_path, "journal", shared=True),
+            Journal(index_journal_path(vault_path)) as journal,
+        ):
+            journal.append(op="index", video_id=video_id, note=filename, path=note_path)
+            update_indexes(
+                vault_path,
+                video_id,
+                filename,
+                note_path,
+                metadata,
+                transcript,
+                tags,
+                signature,
+                counts,
+            )
+            store.put_note(video_id, filename, tags)
+            if vault_index is not None:
+                vault_index.put_note(video_id, note_path)
+                vault_index.commit()
+            journal.append(op="done", video_id=video_id)
+    progress("indexes")
+
+    with TagIndex(tag_index_path(vault_path)) as index:
+        suggestions = index.suggest(tags, SUGGESTED_TAGS)
+
+    if not changed:
+        print(f"Note unchanged: {output_path}")
+        return "unchanged"
+    print(f"✅ Obsidian note created: {output_path}")
+    print(f"   Filename: {note_path}")
+    print(f"   Tags: {metadata.get('tags', [])}")
+    if suggestions:
+        print(f"   Often tagged together: {', '.join(t for t, _ in suggestions)}")
+    return "written"
+
+
+def _report_recovery(count):
+    if count:
+        print(f"Finished {count} interrupted index update(s)")
+
+
+def read_batch(path):
+    """Return the URLs listed in a batch file ("-" for stdin).
+
+    One URL or video ID per line; blank lines and # comments are skipped.
+    """
+    if path == "-":
+        lines = sys.stdin.read().splitlines()
+    else:
+        with open(path, encoding="utf-8") as f:
+            lines = f.read().splitlines()
+    return [line.strip() for line in lines if line.strip() and not line.startswith("#")]
+
+
+def _checkpoint(journal, url, stage):
+    journal.append(url=url, stage=stage)
+
+
+def run_batch(urls, args, vault_path, api_key, deadline=None):
+    """Process every URL, continuing past failures.
+
+    Progress is checkpointed in the batch's journal: each stage a video
+    completes, then its status. With args.resume, videos the journal shows
+    as finished are skipped (failed ones are retried); otherwise the
+    journal starts over. At the end it is compacted to one status record
+    per URL. When the deadline passes, the videos not started yet are
+    counted as cancelled and left for --resume. Returns a dict of status
+    counts (written, unchanged, skipped, failed, partial, cancelled).
+    """
+    counts = dict.fromkeys(RUN_STATUSES, 0)
+    path = batch_journal_path(vault_path, urls)
+    name = os.path.splitext(os.path.basename(path))[0]
+    lock = vault_lock(vault_path, f"batch-{name}", blocking=False)
+    try:
+        lock.acquire()
+    except LockBusyError:
+        raise RuntimeError("this batch is already running") from None
+    try:
+        with (
+            Journal(path) as journal,
+            VideoStore(video_store_path(vault_path)) as store,
+            open_vault_index(vault_path, store) as index,
+            NoteWriter(args.fsync_every, index, vault_path) as writer,
+        ):
+            _report_recovery(recover_indexes(vault_path, store, index))
+            checkpoints = {}
+            if args.resume:
+                checkpoints = {record["url"]: record for record in journal.records()}
+            else:
+                journal.rewrite([])
+            resumed = 0
+            for number, url in enumerate(urls, 1):
+                last = checkpoints.get(url, {})
+                if last.get("status") in FINISHED:
+                    resumed += 1
+                    continue
+                if deadline is not None and deadline.expired:
+                    counts["cancelled"] += 1
+                    continue
+                print(f"[{number}/{len(urls)}] {url}")
+                if "stage" in last:
+                    print(f"Resuming after stage: {last['stage']}")
+                try:
+                    status = process_video(
+                        url,
+                        args,
+                        vault_path,
+                        api_key,
+                        store,
+                        writer,
+                        progress=functools.partial(_checkpoint, journal, url),
+                        deadline=deadline,
+                    )
+                except Exception as e:
+                    print(f"Error: {url}: {e}")
+                    journal.append(url=url, status="failed", error=str(e))
+                    status = "failed"
+                else:
+                    # Only checkpoint the video once its note is on disk.
+                    writer.when_synced(
+                        functools.partial(journal.append, url=url, status=status)
+                    )
+                counts[status] += 1
+            if resumed:
+                print(f"Skipped {resumed} video(s) finished by an earlier run")
+            writer.sync()
+            # Keep the last status of each URL, in batch order.
+            final = {}
+            for record in journal.records():
+                if "status" in record:
+                    final[record["url"]] = record
+            journal.rewrite(final[url] for url in dict.fromkeys(urls) if url in final)
+        compact_index_journal(vault_path)
+    finally:
+        lock.release()
+    return counts
+
+
+def run_worker(args, vault_path, api_key, deadline=None):
+    """Import queued videos until the vault's job queue is empty.
+
+    Each job is leased, kept alive with heartbeats while it runs and until
+    its note is synced (see --fsync-every), and then completed, or failed
+    with the error so it is retried (see job_queue);
+    a partial note counts as a failure, so the video is fetched again. No
+    new job is leased once the deadline has passed. Returns a dict of
+    status counts like run_batch.
+    """
+    counts = dict.fromkeys(RUN_STATUSES, 0)
+    worker = worker_name()
+    path = job_queue_path(vault_path)
+    with (
+        JobQueue(path) as queue,
+        VideoStore(video_store_path(vault_path)) as store,
+        open_vault_index(vault_path, store) as index,
+        NoteWriter(args.fsync_every, index, vault_path) as writer,
+    ):
+        _report_recovery(recover_indexes(vault_path, store, index))
+        while not (deadline is not None and deadline.expired):
+            job = queue.lease(worker, LEASE_SECONDS)
+            if job is None:
+                break
+            job_id, _, url = job
+            print(f"[job {job_id}] {url}")
+            heartbeat = Heartbeat(path, job_id, worker, LEASE_SECONDS)
+            heartbeat.start()
+            try:
+                status = process_video(
+                    url,
+                    args,
+                    vault_path,
+                    api_key,
+                    store,
+                    writer,
+                    deadline=deadline,
+                )
+            except Exception as e:
+                heartbeat.stop()
+                print(f"Error: {url}: {e}")
+                _finish_job(queue, job, worker, str(e))
+                status = "failed"
+            else:
+                if status == "partial":
+                    heartbeat.stop()
+                    reason = "deadline reached, transcript missing"
+                    _finish_job(queue, job, worker, reason)
+                else:
+                    # The lease is kept until the note's batch is synced.
+                    writer.when_synced(
+                        functools.partial(
+                            _finish_job, queue, job, worker, heartbeat=heartbeat
+                        )
+                    )
+            counts[status] += 1
+    compact_index_journal(vault_path)
+    return counts
+
+
+def _finish_job(queue, job, worker, reason=None, heartbeat=None):
+    """Complete a leased job, or fail it with reason; report a lost lease.
+
+    heartbeat, if given, is stopped first. A lost lease means the job may
+    have been handed to another worker, which then processes the video a
+    second time.
+    """
+    if heartbeat is not None:
+        heartbeat.stop()
+    job_id, _, url = job
+    if reason is None:
+        held = queue.complete(job_id, worker)
+    else:
+        held = queue.fail(job_id, worker, reason)
+    if not held:
         print(
-            "Usage: python get_youtube_data.py <youtube_url> "
-            "[user_summary] [user_comments]"
+            f"Warning: lost the lease on job {job_id} ({url}); "
+            "another worker may process it again"
         )
+
+
+def build_parser():
+    """Command line interface for creating a note from one video."""
+    parser = argparse.ArgumentParser(
+        description="Create an Obsidian note from a YouTube video.",
+        epilog=(
+            "Environment variables needed: YOUTUBE_API_KEY (YouTube Data API "
+            "v3 key) and VAULT_PATH or OBSIDIAN_VAULT_PATH (Obsidian vault)."
+        ),
+    )
+    parser.add_argument("youtube_url", nargs="?", help="YouTube URL or video ID")
+    parser.add_argument("user_summary", nargs="?", default="")
+    parser.add_argument("user_comments", nargs="?", default="")
+    parser.add_argument(
+        "--timestamps",
+        action="store_true",
+        help="Group the transcript into paragraphs with timestamp deep links",
+    )
+    parser.add_argument(
+        "--languages",
+        default=",".join(DEFAULT_LANGUAGES),
+        help=(
+            "Comma-separated caption languages in order of preference "
+            f"(default: {','.join(DEFAULT_LANGUAGES)})"
+        ),
+    )
+    parser.add_argument(
+        "--raw-transcript",
+        action="store_true",
+        help="Keep captions as fetched ([Music] markers, rolling repeats, ...)",
+    )
+    parser.add_argument(
+        "--refetch-transcript",
+        action="store_true",
+        help="Fetch the transcript again even if one is stored for the video",
+    )
+    parser.add_argument(
+        "--max-note-size",
+        type=int,
+        default=DEFAULT_MAX_NOTE_SIZE,
+        help=(
+            "Split transcripts longer than this many characters into linked "
+            f"part notes (default: {DEFAULT_MAX_NOTE_SIZE}, 0 disables)"
+        ),
+    )
+    parser.add_argument(
+        "--auto-summary",
+        action="store_true",
+        help=(
+            "Fill an empty summary with key transcript sentences "
+            "(extractive, runs locally, needs numpy)"
+        ),
+    )
+    parser.add_argument(
+        "--related",
+        type=int,
+        default=RELATED_NOTES,
+        help=(
+            "Link up to this many notes with similar transcripts and tags "
+            f"(default: {RELATED_NOTES}, 0 disables)"
+        ),
+    )
+    parser.add_argument(
+        "--skip-duplicates",
+        action="store_true",
+        help="Don't write a note if the transcript nearly matches an existing one",
+    )
+    parser.add_argument(
+        "--duplicate-threshold",
+        type=float,
+        default=DUPLICATE_THRESHOLD,
+        help=(
+            "Transcript similarity (0-1) at which notes count as duplicates "
+            f"(default: {DUPLICATE_THRESHOLD})"
+        ),
+    )
+    parser.add_argument(
+        "--layout",
+        choices=VAULT_LAYOUTS,
+        default="flat",
+        help=(
+            "Where new notes go: vault root (flat, default), one directory per "
+            "channel, year/month of upload (date) or 256 hash shards (hash)"
+        ),
+    )
+    parser.add_argument(
+        "--update",
+        action="store_true",
+        help=(
+            "If the note exists, rewrite only its description, related links "
+            "and the given summary/comments, keeping everything else as is"
+        ),
+    )
+    parser.add_argument(
+        "--batch",
+        metavar="FILE",
+        help=(
+            "Create notes for every URL or video ID listed in FILE "
+            "(one per line, - for stdin) instead of a single video"
+        ),
+    )
+    parser.add_argument(
+        "--resume",
+        action="store_true",
+        help=(
+            "With --batch, skip the videos an earlier, interrupted run of the "
+            "same batch finished"
+        ),
+    )
+    parser.add_argument(
+        "--worker",
+        action="store_true",
+        help=(
+            "Import videos from the vault's job queue (see enqueue_videos.py) "
+            "until it is empty; any number of workers can run at once"
+        ),
+    )
+    parser.add_argument(
+        "--deadline",
+        type=float,
+        metavar="SECONDS",
+        help=(
+            "Finish within this many seconds: requests time out when the time "
+            "is up, a video whose transcript didn't arrive gets a note without "
+            "it, and batch/worker runs start no new videos"
+        ),
+    )
+    parser.add_argument(
+        "--fsync-every",
+        type=int,
+        default=FSYNC_EVERY,
+        help=(
+            "Flush notes to disk once per this many written notes "
+            f"(default: {FSYNC_EVERY}, 0 leaves it to the OS)"
+        ),
+    )
+    return parser
+
+
+def main():
+    parser = build_parser()
+    if len(sys.argv) < 2:
+        parser.print_usage()
         print("Environment variables needed:")
         print("  YOUTUBE_API_KEY - Your YouTube Data API v3 key")
         print("  OBSIDIAN_VAULT_PATH - Path to your Obsidian vault")
         sys.exit(1)
 
-    youtube_url = sys.argv[1]
-    user_summary = sys.argv[2] if len(sys.argv) > 2 else ""
-    user_comments = sys.argv[3] if len(sys.argv) > 3 else ""
+    args = parser.parse_args()
+    deadline = Deadline(args.deadline) if args.deadline else None
+    youtube_url = args.youtube_url
+    user_summary = args.user_summary
+    user_comments = args.user_comments
+
+    if [bool(youtube_url), bool(args.batch), args.worker].count(True) != 1:
+        print("Error: give one of a YouTube URL, --batch FILE or --worker")
+        sys.exit(1)
+    if args.resume and not args.batch:
+        print("Error: --resume only applies to --batch runs")
+        sys.exit(1)
+    if not youtube_url and (user_summary or user_comments):
+        print("Error: summary and comments can only be given for a single video")
+        sys.exit(1)
 
     api_key = os.environ.get("YOUTUBE_API_KEY")
     if not api_key:
@@ -202,31 +1684,44 @@ def main():
         sys.exit(1)
 
     try:
-        video_id = extract_video_id(youtube_url)
-        print(f"Extracted video ID: {video_id}")
-
-        print("Fetching video metadata...")
-        metadata = get_video_metadata(video_id, api_key)
-        print(f"Title: {metadata['title']}")
-
-        print("Fetching transcript...")
-        transcript = get_transcript(video_id)
-        print(f"Transcript length: {len(transcript)} characters")
-
-        print("Generating Obsidian note...")
-        note_content, filename = create_obsidian_note(
-            video_id, youtube_url, metadata, transcript, user_summary, user_comments
-        )
-
-        output_path = os.path.join(vault_path, f"{filename}.md")
-
-        with open(output_path, "w", encoding="utf-8") as f:
-            f.write(note_content)
-
-        print(f"✅ Obsidian note created: {output_path}")
-        print(f"   Filename: {filename}.md")
-        print(f"   Tags: {metadata.get('tags', [])}")
-
+        if args.batch or args.worker:
+            if args.batch:
+                urls = read_batch(args.batch)
+                counts = run_batch(urls, args, vault_path, api_key, deadline)
+                run = "Batch"
+            else:
+                counts = run_worker(args, vault_path, api_key, deadline)
+                run = "Worker"
+            print(
+                f"{run} done: {counts['written']} written, "
+                f"{counts['unchanged']} unchanged, {counts['skipped']} skipped, "
+                f"{counts['failed']} failed"
+            )
+            if counts["partial"]:
+                print(f"{counts['partial']} note(s) written without transcript")
+            if counts["cancelled"]:
+                print(f"Deadline reached: {counts['cancelled']} video(s) not started")
+            if counts["failed"] or counts["cancelled"]:
+                sys.exit(1)
+            return
+        with (
+            VideoStore(video_store_path(vault_path)) as store,
+            open_vault_index(vault_path, store) as index,
+            NoteWriter(args.fsync_every, index, vault_path) as writer,
+        ):
+            _report_recovery(recover_indexes(vault_path, store, index))
+            process_video(
+                youtube_url,
+                args,
+                vault_path,
+                api_key,
+                store,
+                writer,
+                user_summary,
+                user_comments,
+                deadline=deadline,
+            )
+        compact_index_journal(vault_path)
     except Exception as e:
         print(f"Error: {e}")
         sys.exit(1)
@@ -0,0 +1,204 @@
+#!/usr/bin/env python3
+"""Durable queue of videos to import, shared by any number of workers.
+
+Jobs live in an SQLite file in the vault state directory, so every process
+(and every machine mounting the vault) sees the same queue. A worker
+leases the oldest available job for a visibility timeout and keeps the
+lease alive with heartbeats while it works. A job whose lease runs out,
+because its worker died or hung, becomes available to other workers again.
+Leasing is a single UPDATE ... RETURNING statement, so two workers never
+get the same job.
+
+Failed jobs are retried until they have been attempted MAX_ATTEMPTS times,
+then kept as failed with the last reason; so are jobs whose lease ran out
+that many times, so a video that crashes its worker can't loop forever.
+"""
+
+import os
+import socket
+import sqlite3
+import threading
+import time
+
+LEASE_SECONDS = 300.0
+MAX_ATTEMPTS = 3
+# How long to wait for another worker's write to finish.
+BUSY_TIMEOUT_SECONDS = 30.0
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id INTEGER PRIMARY KEY,
+    video_id TEXT NOT NULL UNIQUE,
+    url TEXT NOT NULL,
+    status TEXT NOT NULL DEFAULT 'queued',
+    attempts INTEGER NOT NULL DEFAULT 0,
+    worker TEXT,
+    lease_expires REAL,
+    enqueued_at REAL NOT NULL,
+    finished_at REAL,
+    error TEXT
+);
+CREATE INDEX IF NOT EXISTS jobs_by_status ON jobs (status, id);
+"""
+
+
+def worker_name():
+    """Name identifying this process across hosts (host:pid)."""
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+class JobQueue:
+    """SQLite-backed job queue with leases and heartbeats."""
+
+    def __init__(self, path):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self.path = path
+        self.connection = sqlite3.connect(path, timeout=BUSY_TIMEOUT_SECONDS)
+        self.connection.executescript(SCHEMA)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def close(self):
+        self.connection.close()
+
+    def enqueue(self, jobs):
+        """Queue [(video_id, url)] jobs; videos the queue has seen are skipped.
+
+        Returns {outcome: count}: "added" for new jobs, else the status of
+        the existing job ("queued", "leased", "done" or "failed"). Finished
+        jobs are not queued again; use retry_failed for failed ones.
+        """
+        now = time.time()
+        outcomes = {}
+        with self.connection:
+            for video_id, url in jobs:
+                cursor = self.connection.execute(
+                    "INSERT OR IGNORE INTO jobs (video_id, url, enqueued_at) "
+                    "VALUES (?, ?, ?)",
+                    (video_id, url, now),
+                )
+                if cursor.rowcount:
+                    outcome = "added"
+                else:
+                    (outcome,) = self.connection.execute(
+                        "SELECT status FROM jobs WHERE video_id = ?", (video_id,)
+                    ).fetchone()
+                outcomes[outcome] = outcomes.get(outcome, 0) + 1
+        return outcomes
+
+    def lease(self, worker, seconds=LEASE_SECONDS):
+        """Lease the oldest available job; returns (id, video_id, url) or None.
+
+        Available means queued, or leased with an expired lease.
+        """
+        now = time.time()
+        with self.connection:
+            self.connection.execute(
+                "UPDATE jobs SET status = 'failed', worker = NULL, "
+                "lease_expires = NULL, error = 'lease expired', finished_at = ? "
+                "WHERE status = 'leased' AND lease_expires < ? AND attempts >= ?",
+                (now, now, MAX_ATTEMPTS),
+            )
+            row = self.connection.execute(
+                "UPDATE jobs SET status = 'leased', worker = ?, "
+                "lease_expires = ?, attempts = attempts + 1 "
+                "WHERE id = (SELECT id FROM jobs WHERE status = 'queued' "
+                "OR (status = 'leased' AND lease_expires < ?) ORDER BY id LIMIT 1) "
+                "RETURNING id, video_id, url",
+                (worker, now + seconds, now),
+            ).fetchone()
+        return row
+
+    def heartbeat(self, job_id, worker, seconds=LEASE_SECONDS):
+        """Extend a lease; returns False if the worker no longer holds it."""
+        with self.connection:
+            cursor = self.connection.execute(
+                "UPDATE jobs SET lease_expires = ? "
+                "WHERE id = ? AND worker = ? AND status = 'leased'",
+                (time.time() + seconds, job_id, worker),
+            )
+        return cursor.rowcount == 1
+
+    def complete(self, job_id, worker):
+        """Mark a leased job done; returns False if the lease was lost."""
+        with self.connection:
+            cursor = self.connection.execute(
+                "UPDATE jobs SET status = 'done', worker = NULL, "
+                "lease_expires = NULL, error = NULL, finished_at = ? "
+                "WHERE id = ? AND worker = ? AND status = 'leased'",
+                (time.time(), job_id, worker),
+            )
+        return cursor.rowcount == 1
+
+    def fail(self, job_id, worker, reason):
+        """Record a failed attempt: requeue the job, or fail it for good
+        after MAX_ATTEMPTS. Returns False if the lease was lost."""
+        with self.connection:
+            cursor = self.connection.execute(
+                "UPDATE jobs SET status = CASE WHEN attempts < ? "
+                "THEN 'queued' ELSE 'failed' END, "
+                "worker = NULL, lease_expires = NULL, error = ?, finished_at = ? "
+                "WHERE id = ? AND worker = ? AND status = 'leased'",
+                (MAX_ATTEMPTS, reason, time.time(), job_id, worker),
+            )
+        return cursor.rowcount == 1
+
+    def retry_failed(self):
+        """Requeue every failed job with a fresh attempt count."""
+        with self.connection:
+            cursor = self.connection.execute(
+                "UPDATE jobs SET status = 'queued', attempts = 0 "
+                "WHERE status = 'failed'"
+            )
+        return cursor.rowcount
+
+    def counts(self):
+        """Return {status: number of jobs}."""
+        rows = self.connection.execute(
+            "SELECT status, COUNT(*) FROM jobs GROUP BY status"
+        )
+        return dict(rows)
+
+    def failures(self):
+        """Return [(video_id, error)] for jobs that failed for good."""
+        rows = self.connection.execute(
+            "SELECT video_id, error FROM jobs WHERE status = 'failed' ORDER BY id"
+        )
+        return rows.fetchall()
+
+
+class Heartbeat:
+    """Keep a job's lease alive from a background thread while it runs."""
+
+    def __init__(self, path, job_id, worker, seconds=LEASE_SECONDS):
+        self.path = path
+        self.job_id = job_id
+        self.worker = worker
+        self.seconds = seconds
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+
+    def _run(self):
+        # sqlite3 connections belong to the thread that opened them.
+        with JobQueue(self.path) as queue:
+            while not self._stop.wait(self.seconds / 3):
+                if not queue.heartbeat(self.job_id, self.worker, self.seconds):
+                    return
@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+"""Append-only journal of JSON records.
+
+Each record is one JSON line written with a single append, so records from
+concurrent writers never interleave and a crash can at worst leave a torn
+last line, which reading skips (and the next writer terminates, so it
+can't swallow the following record). Compaction rewrites the journal with
+just the records still needed and swaps it in atomically.
+"""
+
+import json
+import os
+
+from note_writer import write_atomic
+
+
+class Journal:
+    """A JSON-lines journal file opened for appending."""
+
+    def __init__(self, path):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self.path = path
+        self._fd = None
+        self._open()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def close(self):
+        if self._fd is not None:
+            os.close(self._fd)
+            self._fd = None
+
+    def _open(self):
+        self._fd = os.open(self.path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+        size = os.fstat(self._fd).st_size
+        if size:
+            with open(self.path, "rb") as f:
+                f.seek(size - 1)
+                torn = f.read(1) != b"\n"
+            if torn:
+                os.write(self._fd, b"\n")
+
+    def append(self, **record):
+        """Append one record (keyword arguments) to the journal."""
+        line = json.dumps(record, separators=(",", ":")) + "\n"
+        os.write(self._fd, line.encode("utf-8"))
+
+    def records(self):
+        """Yield the journal's records in order, skipping torn lines."""
+        try:
+            f = open(self.path, encoding="utf-8")
+        except FileNotFoundError:
+            return
+        with f:
+            for line in f:
+                try:
+                    yield json.loads(line)
+                except ValueError:
+                    continue
+
+    def rewrite(self, records):
+        """Atomically replace the journal's contents with records.
+
+        The caller must keep other writers out (e.g. with a FileLock) while
+        the journal is compacted.
+        """
+        lines = (json.dumps(record, separators=(",", ":")) + "\n" for record in records)
+        self.close()
+        write_atomic(self.path, lines, fsync=False)
+        self._open()
@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+"""Advisory cross-process locks on lock files (fcntl.flock).
+
+Writers sharing a vault lock only what they touch: one lock per index and
+one per note, where notes hash onto a fixed set of lock stripes so the
+lock directory stays small however large the vault grows. flock locks
+belong to an open file, so they are released when the holder exits, even
+if it crashes. On platforms without fcntl the locks are no-ops.
+"""
+
+import hashlib
+import os
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+NOTE_LOCK_STRIPES = 256
+
+
+class LockBusyError(Exception):
+    """A non-blocking lock is held by another process."""
+
+
+class FileLock:
+    """Exclusive (or shared) flock on path, as a context manager."""
+
+    def __init__(self, path, shared=False, blocking=True):
+        self.path = path
+        self.shared = shared
+        self.blocking = blocking
+        self._fd = None
+
+    def __enter__(self):
+        self.acquire()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.release()
+
+    def acquire(self):
+        """Take the lock; raises LockBusyError if non-blocking and it is held."""
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        self._fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644)
+        if fcntl is None:
+            return
+        operation = fcntl.LOCK_SH if self.shared else fcntl.LOCK_EX
+        if not self.blocking:
+            operation |= fcntl.LOCK_NB
+        try:
+            fcntl.flock(self._fd, operation)
+        except BlockingIOError as e:
+            self.release()
+            raise LockBusyError(self.path) from e
+        except BaseException:
+            self.release()
+            raise
+
+    def release(self):
+        if self._fd is not None:
+            os.close(self._fd)
+            self._fd = None
+
+
+def stripe(key, stripes=NOTE_LOCK_STRIPES):
+    """Lock stripe (0 <= n < stripes) that key hashes to."""
+    digest = hashlib.blake2b(key.encode(), digest_size=8).digest()
+    return int.from_bytes(digest, "little") % stripes
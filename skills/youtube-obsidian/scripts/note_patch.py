@@ -0,0 +1,143 @@
+#!/usr/bin/env python3
+"""Section-level updates of existing notes.
+
+A note's sections are found by their "## " headings, scanning only up to
+the Full Transcript heading, so locating them never reads the transcript.
+Patching replaces just the targeted section bodies (and frontmatter
+lines): everything else, including hand edits in other sections and the
+transcript, is copied over byte for byte, and the result replaces the note
+atomically.
+"""
+
+from note_writer import READ_SIZE, write_atomic
+
+# Section headings of a note in the order they are rendered, with the keys
+# parse_obsidian_note and patch_note use for them.
+NOTE_SECTIONS = {
+    "Summary": "summary",
+    "Notes/Comments": "comments",
+    "Related": "related",
+    "Description": "description",
+    "Full Transcript": "transcript",
+}
+HEADINGS = {f"## {name}\n".encode(): name for name in NOTE_SECTIONS}
+TRANSCRIPT_HEADING = b"## Full Transcript\n"
+
+
+def _scan_frontmatter(f):
+    """Read the frontmatter of an open note file.
+
+    Returns ({key: (line offset, line end)}, offset just past the closing
+    "---" line). Raises ValueError if the note has no frontmatter.
+    """
+    if f.readline() != b"---\n":
+        raise ValueError("Note has no frontmatter")
+    fields = {}
+    offset = f.tell()
+    for line in f:
+        if line == b"---\n":
+            return fields, offset + len(line)
+        key, sep, _ = line.partition(b":")
+        if sep:
+            fields.setdefault(key.strip().decode(), (offset, offset + len(line)))
+        offset += len(line)
+    raise ValueError("Note frontmatter is not closed")
+
+
+def find_sections(path):
+    """Return {section key: (heading offset, body start, body end)}.
+
+    Offsets are byte positions in the file. A body runs up to the next
+    section heading, so it includes the blank line separating the two.
+    Like parse_obsidian_note, only the first occurrence of each heading
+    after the previous section counts; user text may contain look-alikes.
+    Raises ValueError if the note has no frontmatter.
+    """
+    headings = []
+    with open(path, "rb") as f:
+        _, offset = _scan_frontmatter(f)
+        for line in f:
+            if line in HEADINGS:
+                headings.append((HEADINGS[line], offset, offset + len(line)))
+                if line == TRANSCRIPT_HEADING:
+                    break
+            offset += len(line)
+        end = f.seek(0, 2)
+
+    found = []
+    search_from = 0
+    for name in NOTE_SECTIONS:
+        for heading_name, start, body in headings:
+            if heading_name == name and start >= search_from:
+                found.append((name, start, body))
+                search_from = body
+                break
+    sections = {}
+    for i, (name, start, body) in enumerate(found):
+        stop = found[i + 1][1] if i + 1 < len(found) else end
+        sections[NOTE_SECTIONS[name]] = (start, body, stop)
+    return sections
+
+
+def _read_range(f, start, stop):
+    f.seek(start)
+    while start < stop:
+        block = f.read(min(READ_SIZE, stop - start))
+        if not block:
+            break
+        start += len(block)
+        yield block
+
+
+def patch_note(path, sections, fsync=True, fields=None):
+    """Replace the bodies of the given sections of the note at path.
+
+    sections maps section keys ("summary", "comments", "related",
+    "description") to their new text. A section the note lacks is inserted
+    where the renderer would have put it. fields maps frontmatter keys to
+    their new values; their lines are replaced, or added at the end of the
+    frontmatter. Returns False (leaving the file untouched) when every
+    section and field already holds its new text.
+    """
+    if "transcript" in sections:
+        raise ValueError("The transcript section can't be patched")
+    keys = list(NOTE_SECTIONS.values())
+    found = find_sections(path)
+    edits = []
+    with open(path, "rb") as f:
+        lines, end = _scan_frontmatter(f)
+        for key, value in (fields or {}).items():
+            new = f"{key}: {value}\n".encode()
+            if key in lines:
+                start, stop = lines[key]
+                if b"".join(_read_range(f, start, stop)) != new:
+                    edits.append((start, stop, new))
+            else:
+                closing = end - len(b"---\n")
+                edits.append((closing, closing, new))
+        for key, text in sections.items():
+            new = f"{text}\n\n".encode()
+            if key in found:
+                _, body, stop = found[key]
+                if b"".join(_read_range(f, body, stop)) != new:
+                    edits.append((body, stop, new))
+                continue
+            following = [found[k][0] for k in keys[keys.index(key) + 1 :] if k in found]
+            if not following:
+                raise ValueError(f"Note has no section to put {key} before")
+            name = next(name for name, k in NOTE_SECTIONS.items() if k == key)
+            edits.append((following[0], following[0], f"## {name}\n".encode() + new))
+        if not edits:
+            return False
+        edits.sort(key=lambda edit: edit[:2])
+
+        def chunks():
+            position = 0
+            for start, stop, new in edits:
+                yield from _read_range(f, position, start)
+                yield new
+                position = stop
+            yield from _read_range(f, position, f.seek(0, 2))
+
+        write_atomic(path, chunks(), fsync=fsync)
+    return True
@@ -0,0 +1,242 @@
+#!/usr/bin/env python3
+"""Crash-safe note writes that leave unchanged notes alone.
+
+A note is written to a hidden temp file next to it and renamed over the
+target with os.replace, so a reader (or Obsidian Sync) sees either the old
+note or the complete new one, never a truncated file, even when the writer
+is killed mid-write.
+
+The content is hashed while it streams to the temp file. If the digest
+matches the note already on disk, the temp file is dropped and the note
+keeps its mtime, so re-running the skill does not trigger sync uploads.
+The on-disk digest comes from the vault index when the file's stat still
+matches what was recorded, and from streaming the file otherwise.
+
+Surviving a power loss additionally needs fsync, of the note's data before
+the rename and of its directory after it. NoteWriter can batch that: it
+writes sync_every notes to temp files, fsyncs them, renames them all into
+place and then fsyncs their directories once, so a bulk import pays one
+round of syncs per batch instead of two per note. Until its batch is
+synced a note stays in its temp file; work that must only be recorded once
+notes are safely on disk is deferred with when_synced.
+"""
+
+import hashlib
+import os
+import tempfile
+
+FSYNC_EVERY = 1
+READ_SIZE = 1 << 16
+
+
+def _current_umask():
+    umask = os.umask(0)
+    os.umask(umask)
+    return umask
+
+
+UMASK = _current_umask()
+
+
+def _fsync_path(path, flags=os.O_RDONLY):
+    fd = os.open(path, flags)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+def _hasher():
+    return hashlib.blake2b(digest_size=16)
+
+
+def file_digest(path):
+    """Return the content digest of the file at path, or None if missing."""
+    digest = _hasher()
+    try:
+        with open(path, "rb") as f:
+            while block := f.read(READ_SIZE):
+                digest.update(block)
+    except FileNotFoundError:
+        return None
+    return digest.digest()
+
+
+def _write_temp(path, chunks, fsync, old_digest):
+    """Stream chunks to a temp file next to path.
+
+    Returns (digest, temp path), or (digest, None) with the temp file
+    already removed when the digest equals old_digest.
+    """
+    directory = os.path.dirname(path) or "."
+    fd, temp_path = tempfile.mkstemp(
+        dir=directory, prefix=f".{os.path.basename(path)}.", suffix=".tmp"
+    )
+    digest = _hasher()
+    try:
+        with open(fd, "wb") as f:
+            for chunk in chunks:
+                data = chunk if isinstance(chunk, bytes) else chunk.encode("utf-8")
+                digest.update(data)
+                f.write(data)
+            unchanged = digest.digest() == old_digest
+            if fsync and not unchanged:
+                f.flush()
+                os.fsync(f.fileno())
+        if unchanged:
+            os.unlink(temp_path)
+            return digest.digest(), None
+    except BaseException:
+        _discard(temp_path)
+        raise
+    return digest.digest(), temp_path
+
+
+def _discard(temp_path):
+    try:
+        os.unlink(temp_path)
+    except FileNotFoundError:
+        pass
+
+
+def _replace(temp_path, path):
+    """Rename a temp file over path, keeping the permissions of path."""
+    try:
+        try:
+            mode = os.stat(path).st_mode & 0o7777
+        except FileNotFoundError:
+            mode = 0o666 & ~UMASK
+        os.chmod(temp_path, mode)
+        os.replace(temp_path, path)
+    except BaseException:
+        _discard(temp_path)
+        raise
+
+
+def write_atomic(path, chunks, fsync=True, old_digest=None):
+    """Write text (or bytes) chunks to path via a temp file and os.replace.
+
+    Returns (digest, written). When the new content's digest equals
+    old_digest, path is left untouched and written is False. The file
+    keeps the permissions of the note it replaces (new notes get the usual
+    umask-based ones). With fsync, the data is flushed to disk before the
+    rename.
+    """
+    digest, temp_path = _write_temp(path, chunks, fsync, old_digest)
+    if temp_path is None:
+        return digest, False
+    _replace(temp_path, path)
+    return digest, True
+
+
+class NoteWriter:
+    """Atomic note writer with fsyncs batched every sync_every notes.
+
+    sync_every=1 syncs each note as it is written; 0 never syncs (writes
+    are still atomic). With a larger sync_every, notes reach their paths
+    when their batch is synced. With a VaultIndex, digests are recorded
+    under paths relative to root so unchanged notes are recognized without
+    reading them.
+    """
+
+    def __init__(self, sync_every=FSYNC_EVERY, index=None, root="."):
+        self.sync_every = sync_every
+        self.index = index
+        self.root = root
+        # (temp path or None if already in place, path) per unsynced note.
+        self._pending = []
+        self._callbacks = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def close(self):
+        self.sync()
+        if self.index is not None:
+            self.index.commit()
+
+    def _current_digest(self, path, key):
+        try:
+            stat = os.stat(path)
+        except FileNotFoundError:
+            return None
+        if self.index is not None:
+            digest = self.index.file_digest(key, stat)
+            if digest is not None:
+                return digest
+        return file_digest(path)
+
+    @property
+    def pending(self):
+        """Number of written notes not synced yet."""
+        return len(self._pending)
+
+    def _record(self, path, digest):
+        if self.index is not None:
+            key = os.path.relpath(path, self.root)
+            self.index.put_file(key, digest, os.stat(path))
+
+    def write(self, path, chunks):
+        """Atomically replace path with the chunks' text.
+
+        Returns False (and leaves the file alone) if it already holds
+        exactly that text.
+        """
+        old_digest = self._current_digest(path, os.path.relpath(path, self.root))
+        if self.sync_every > 1:
+            # Renamed into place by sync(), once its data is on disk.
+            digest, temp_path = _write_temp(path, chunks, False, old_digest)
+            if temp_path is None:
+                self._record(path, digest)
+                return False
+            self._pending.append((temp_path, path, digest))
+        else:
+            digest, written = write_atomic(
+                path, chunks, fsync=self.sync_every == 1, old_digest=old_digest
+            )
+            self._record(path, digest)
+            if not written:
+                return False
+            if self.sync_every:
+                self._pending.append((None, path, digest))
+        if self.sync_every and len(self._pending) >= self.sync_every:
+            self.sync()
+        return True
+
+    def when_synced(self, callback):
+        """Call callback() once every note written so far is on disk."""
+        if self._pending:
+            self._callbacks.append(callback)
+        else:
+            callback()
+
+    def sync(self):
+        """Put pending notes in place and flush them and their directories.
+
+        Temp files are fsynced before any is renamed, and directories once
+        after all renames, so a power loss leaves each note either old or
+        complete. Then the when_synced callbacks run.
+        """
+        pending, self._pending = self._pending, []
+        try:
+            for temp_path, _, _ in pending:
+                if temp_path is not None:
+                    _fsync_path(temp_path)
+            for temp_path, path, digest in pending:
+                if temp_path is not None:
+                    _replace(temp_path, path)
+                    self._record(path, digest)
+        except BaseException:
+            for temp_path, _, _ in pending:
+                if temp_path is not None:
+                    _discard(temp_path)
+            raise
+        directories = {os.path.dirname(path) or "." for _, path, _ in pending}
+        for directory in sorted(directories):
+            _fsync_path(directory, os.O_RDONLY | getattr(os, "O_DIRECTORY", 0))
+        callbacks, self._callbacks = self._callbacks, []
+        for callback in callbacks:
+            callback()
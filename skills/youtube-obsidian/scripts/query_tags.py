@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+"""Query the vault's tag index without reading any notes.
+
+query_tags.py kubernetes docker     notes tagged with every listed tag
+query_tags.py --suggest kubernetes  tags most often used alongside
+query_tags.py --counts              number of notes per tag
+"""
+
+import argparse
+import os
+import sys
+
+from get_youtube_data import tag_index_path
+from tag_index import SUGGESTED_TAGS, TagIndex
+
+
+def build_parser():
+    """Command line interface for tag queries."""
+    parser = argparse.ArgumentParser(
+        description="Find notes by tag using the vault's tag index."
+    )
+    parser.add_argument("tags", nargs="*", help="Tags every listed note must have")
+    parser.add_argument(
+        "--vault",
+        default=os.environ.get("VAULT_PATH") or os.environ.get("OBSIDIAN_VAULT_PATH"),
+        help="Vault to query (defaults to VAULT_PATH / OBSIDIAN_VAULT_PATH)",
+    )
+    parser.add_argument(
+        "--suggest",
+        action="store_true",
+        help="List tags often used together with the given ones instead",
+    )
+    parser.add_argument(
+        "--limit",
+        type=int,
+        default=SUGGESTED_TAGS,
+        help=f"Number of suggestions (default: {SUGGESTED_TAGS})",
+    )
+    parser.add_argument(
+        "--counts",
+        action="store_true",
+        help="List how many notes carry each tag",
+    )
+    return parser
+
+
+def main():
+    parser = build_parser()
+    args = parser.parse_args()
+
+    if not args.vault:
+        print("Error: VAULT_PATH or OBSIDIAN_VAULT_PATH environment variable not set")
+        sys.exit(1)
+    path = tag_index_path(args.vault)
+    if not os.path.exists(path):
+        print(f"Error: no tag index in vault: {args.vault}")
+        sys.exit(1)
+    if not args.tags and not args.counts:
+        parser.print_usage()
+        sys.exit(1)
+
+    with TagIndex(path) as index:
+        if args.counts:
+            counts = index.tag_counts(args.tags or None)
+            for tag, count in sorted(counts.items(), key=lambda t: (-t[1], t[0])):
+                print(f"{count:6d}  {tag}")
+        elif args.suggest:
+            for tag, count in index.suggest(args.tags, args.limit):
+                print(f"{tag} ({count})")
+        else:
+            for note, video_id in index.notes_with(args.tags):
+                print(f"[[{note}]] ({video_id})")
+
+
+if __name__ == "__main__":
+    main()
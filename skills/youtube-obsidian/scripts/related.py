@@ -0,0 +1,166 @@
+#!/usr/bin/env python3
+"""Related-note lookup over a sparse TF-IDF index of transcripts and tags.
+
+Every note is stored as a short sparse vector: its MAX_DOC_TERMS highest
+TF-IDF terms, L2-normalized, written to an inverted index (term -> notes
+and weights) in a SQLite file. Adding a note only touches its own postings
+and the document frequencies of its terms, so the index grows note by note
+without rebuild passes. Stored weights keep the IDF from when the note was
+indexed, which drifts slowly as the vault grows.
+
+A lookup walks the posting lists of the query's terms only, accumulating
+cosine scores, so it never compares against notes sharing no rare term.
+Terms found in more than MAX_DF_RATIO of the notes (and in more than
+MIN_DF_CUTOFF notes) are skipped: they say little about relatedness and
+have the longest posting lists.
+"""
+
+import heapq
+import math
+import os
+import re
+import sqlite3
+from collections import Counter
+
+from summarize import STOPWORDS
+
+RELATED_NOTES = 5
+MAX_DOC_TERMS = 100
+MAX_DF_RATIO = 0.2
+MIN_DF_CUTOFF = 100
+# Tags are few but chosen on purpose, so they count as several mentions.
+TAG_WEIGHT = 3
+
+TERM = re.compile(r"[a-z][a-z0-9']{2,}")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS notes (
+    video_id TEXT PRIMARY KEY,
+    note TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS terms (
+    term TEXT PRIMARY KEY,
+    df INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS postings (
+    term TEXT NOT NULL,
+    video_id TEXT NOT NULL,
+    weight REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS postings_by_term ON postings (term);
+CREATE INDEX IF NOT EXISTS postings_by_video ON postings (video_id);
+"""
+
+
+def term_counts(text, tags=()):
+    """Count index terms in text plus tags (as "#tag" terms)."""
+    counts = Counter(
+        term for term in TERM.findall(str(text).lower()) if term not in STOPWORDS
+    )
+    for tag in tags:
+        counts[f"#{tag.lower()}"] += TAG_WEIGHT
+    return counts
+
+
+class RelatedIndex:
+    """Incremental inverted TF-IDF index of the notes in a vault."""
+
+    def __init__(self, path):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self.connection = sqlite3.connect(path)
+        self.connection.executescript(SCHEMA)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def close(self):
+        self.connection.close()
+
+    def __len__(self):
+        (count,) = self.connection.execute("SELECT COUNT(*) FROM notes").fetchone()
+        return count
+
+    def _document_frequencies(self, terms):
+        frequencies = {}
+        terms = list(terms)
+        # Stay well below SQLite's bound-parameter limit.
+        for start in range(0, len(terms), 500):
+            batch = terms[start : start + 500]
+            frequencies.update(
+                self.connection.execute(
+                    "SELECT term, df FROM terms WHERE term IN "
+                    f"({', '.join('?' * len(batch))})",
+                    batch,
+                )
+            )
+        return frequencies
+
+    def vector(self, counts, frequencies=None):
+        """Return the normalized top-MAX_DOC_TERMS TF-IDF vector of counts."""
+        total = len(self) + 1
+        if frequencies is None:
+            frequencies = self._document_frequencies(counts)
+        weights = {
+            term: (1 + math.log(count))
+            * (math.log((1 + total) / (1 + frequencies.get(term, 0))) + 1)
+            for term, count in counts.items()
+        }
+        top = heapq.nlargest(MAX_DOC_TERMS, weights.items(), key=lambda t: t[1])
+        norm = math.sqrt(sum(weight * weight for _, weight in top)) or 1.0
+        return {term: weight / norm for term, weight in top}
+
+    def add(self, video_id, note, counts):
+        """Index (or re-index) a note from its term counts."""
+        vector = self.vector(counts)
+        with self.connection:
+            known = self.connection.execute(
+                "SELECT 1 FROM notes WHERE video_id = ?", (video_id,)
+            ).fetchone()
+            if not known:
+                self.connection.executemany(
+                    "INSERT INTO terms VALUES (?, 1) "
+                    "ON CONFLICT (term) DO UPDATE SET df = df + 1",
+                    ((term,) for term in counts),
+                )
+            self.connection.execute(
+                "INSERT OR REPLACE INTO notes VALUES (?, ?)", (video_id, note)
+            )
+            self.connection.execute(
+                "DELETE FROM postings WHERE video_id = ?", (video_id,)
+            )
+            self.connection.executemany(
+                "INSERT INTO postings VALUES (?, ?, ?)",
+                ((term, video_id, weight) for term, weight in vector.items()),
+            )
+
+    def related(self, counts, k=RELATED_NOTES, exclude=None):
+        """Return up to k [(score, video_id, note)] most similar notes."""
+        total = len(self)
+        if not total or k <= 0:
+            return []
+        frequencies = self._document_frequencies(counts)
+        vector = self.vector(counts, frequencies)
+        max_df = max(MIN_DF_CUTOFF, MAX_DF_RATIO * total)
+
+        scores = Counter()
+        for term, weight in vector.items():
+            if frequencies.get(term, 0) > max_df:
+                continue
+            for video_id, posting in self.connection.execute(
+                "SELECT video_id, weight FROM postings WHERE term = ?", (term,)
+            ):
+                scores[video_id] += weight * posting
+        scores.pop(exclude, None)
+
+        best = heapq.nlargest(k, scores.items(), key=lambda item: (item[1], item[0]))
+        notes = dict(
+            self.connection.execute(
+                "SELECT video_id, note FROM notes WHERE video_id IN "
+                f"({', '.join('?' * len(best))})",
+                [video_id for video_id, _ in best],
+            )
+        )
+        return [(score, video_id, notes[video_id]) for video_id, score in best]
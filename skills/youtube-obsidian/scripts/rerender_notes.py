@@ -0,0 +1,325 @@
+#!/usr/bin/env python3
+"""Re-tag and re-render existing YouTube notes in an Obsidian vault.
+
+Notes are parsed back into their parts and run through the current tagging
+rules and note template without touching the YouTube APIs. Only files whose
+rendered output differs are rewritten. The render hash each note was last
+checked against is kept in the vault state directory, so later runs skip
+notes that are already up to date. Notes that were rewritten are refreshed
+in the vault's tag index.
+"""
+
+import argparse
+import json
+import os
+import re
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+
+from get_youtube_data import (
+    DEFAULT_MAX_NOTE_SIZE,
+    STATE_DIR,
+    check_note_owner,
+    file_owner,
+    find_notes,
+    iter_note_files,
+    load_transcript,
+    note_lock,
+    parse_obsidian_note,
+    render_hash,
+    tag_index_path,
+    transcript_archive,
+    transcript_part_name,
+    vault_index_path,
+    vault_lock,
+    video_store_path,
+)
+from note_writer import NoteWriter, write_atomic
+from tag_index import TagIndex
+from vault_index import VaultIndex
+from video_store import VideoStore
+
+MANIFEST_NAME = "rerender.json"
+STORED_METADATA = (
+    "title",
+    "description",
+    "tags",
+    "transcript_language",
+    "transcript_kind",
+)
+WIKILINK = re.compile(r"\[\[([^\]]+)\]\]")
+
+
+def load_manifest(vault_path):
+    """Load the {relative_path: [render_hash, mtime_ns]} manifest."""
+    path = os.path.join(vault_path, STATE_DIR, MANIFEST_NAME)
+    try:
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def save_manifest(vault_path, manifest):
+    """Write the render manifest into the vault state directory."""
+    state_dir = os.path.join(vault_path, STATE_DIR)
+    os.makedirs(state_dir, exist_ok=True)
+    write_atomic(
+        os.path.join(state_dir, MANIFEST_NAME),
+        [json.dumps(manifest, sort_keys=True)],
+        fsync=False,
+    )
+
+
+def _read_note(path):
+    """Parse a YouTube main note, or return None for anything else.
+
+    The frontmatter is read first, so transcript part notes and other
+    notes are turned down without reading the rest of the file.
+    """
+    with open(path, encoding="utf-8") as f:
+        head = f.readline()
+        if head != "---\n":
+            return None
+        for line in f:
+            head += line
+            if line == "---\n":
+                break
+        try:
+            frontmatter = parse_obsidian_note(head)
+        except ValueError:
+            return None
+        if not frontmatter.get("youtube_id") or frontmatter.get("transcript_part"):
+            return None
+        return parse_obsidian_note(head + f.read())
+
+
+def _version(path):
+    stat = os.stat(path)
+    return stat.st_ino, stat.st_size, stat.st_mtime_ns
+
+
+def _rerender(path, note, vault_path, max_size):
+    """Re-render a parsed note; the caller holds its note lock."""
+    metadata = {
+        "title": note.get("title", ""),
+        "description": note.get("description", ""),
+        # Notes written before youtube_tags was recorded only have the
+        # merged tag list, which is the best seed available for them.
+        "tags": note.get("youtube_tags", note.get("tags", [])),
+        "transcript_language": note.get("transcript_language", ""),
+        "transcript_kind": note.get("transcript_kind", ""),
+        "related": WIKILINK.findall(note.get("related", "")),
+    }
+    # Fetched data comes from the video store when the video is in it;
+    # the note is only authoritative for what the user writes.
+    with VideoStore(video_store_path(vault_path)) as store:
+        stored = store.get(note["youtube_id"])
+    if stored:
+        for key in STORED_METADATA:
+            metadata[key] = stored[key]
+    stem = os.path.basename(path).removesuffix(".md")
+    timestamps = note.get("transcript_format") == "timestamped"
+    transcript = load_transcript(vault_path, note["youtube_id"])
+    if transcript is None:
+        if timestamps or note.get("transcript_parts"):
+            raise ValueError("No stored transcript for a timestamped/split note")
+        transcript = note.get("transcript", "")
+
+    directory = os.path.dirname(path)
+    note_files = iter_note_files(
+        stem,
+        note["youtube_id"],
+        note.get("youtube_url", ""),
+        metadata,
+        transcript,
+        note.get("summary", ""),
+        note.get("comments"),
+        timestamps=timestamps,
+        max_size=max_size,
+    )
+    changed = False
+    files = 0
+    # Notes are streamed to disk (never joined in memory) and their digests
+    # recorded in the vault index, like process_video's writes.
+    with (
+        VaultIndex(vault_index_path(vault_path)) as index,
+        NoteWriter(0, index, vault_path) as writer,
+    ):
+        for name, chunks in note_files:
+            target = os.path.join(directory, f"{name}.md")
+            check_note_owner(
+                vault_path,
+                index,
+                os.path.relpath(target, vault_path),
+                note["youtube_id"],
+            )
+            changed |= writer.write(target, chunks)
+            files += 1
+
+        # Drop part notes left over from a split that now needs fewer parts.
+        old_parts = int(note.get("transcript_parts") or 0)
+        for number in range(files, old_parts + 1):
+            name = f"{transcript_part_name(stem, number)}.md"
+            stale = os.path.relpath(os.path.join(directory, name), vault_path)
+            if file_owner(vault_path, index, stale) == note["youtube_id"]:
+                os.remove(os.path.join(vault_path, stale))
+                index.remove_file(stale)
+                changed = True
+    return "updated" if changed else "unchanged"
+
+
+def rerender_note(path, vault_path, max_size=DEFAULT_MAX_NOTE_SIZE):
+    """Re-render one note (and its transcript part notes) in place.
+
+    The archived transcript is used when present, since timestamped,
+    chaptered and split notes no longer hold the plain text. It is required
+    for timestamped and split notes.
+
+    Returns a status string: "updated", "unchanged", "ignored" (not a
+    YouTube note, or a transcript part rendered via its main note) or
+    "failed: <reason>".
+    """
+    try:
+        # The note is read unlocked to find its video; if a writer changed
+        # it before the lock was taken, it is read again under the lock.
+        version = _version(path)
+        note = _read_note(path)
+        if note is None:
+            return "ignored"
+        with note_lock(vault_path, note["youtube_id"]):
+            if _version(path) != version:
+                note = _read_note(path)
+                if note is None:
+                    return "ignored"
+            return _rerender(path, note, vault_path, max_size)
+    except Exception as e:
+        return f"failed: {e}"
+
+
+def reindex_tags(vault_path, paths):
+    """Refresh the tag index entries of re-rendered notes."""
+    with vault_lock(vault_path, "tags"), TagIndex(tag_index_path(vault_path)) as index:
+        for path in paths:
+            with open(path, encoding="utf-8") as f:
+                note = parse_obsidian_note(f.read())
+            stem = os.path.basename(path).removesuffix(".md")
+            index.set_tags(note["youtube_id"], stem, note.get("tags", []))
+
+
+def rerender_vault(
+    vault_path, workers=None, force=False, max_size=DEFAULT_MAX_NOTE_SIZE
+):
+    """Re-render every out-of-date note in the vault.
+
+    Files whose manifest entry matches the current render hash and whose
+    mtime is unchanged are skipped without being read, whether they were
+    re-rendered or ignored last time. The rest are spread
+    over a process pool (or handled inline when workers == 1).
+
+    Returns a dict of status counts.
+    """
+    current = render_hash()
+    manifest = {} if force else load_manifest(vault_path)
+    counts = {"updated": 0, "unchanged": 0, "skipped": 0, "ignored": 0, "failed": 0}
+
+    pending = []
+    updated = []
+    for path in find_notes(vault_path):
+        rel = os.path.relpath(path, vault_path)
+        entry = manifest.get(rel)
+        if entry and entry == [current, os.stat(path).st_mtime_ns]:
+            counts["skipped"] += 1
+        else:
+            pending.append(path)
+
+    worker = partial(rerender_note, vault_path=vault_path, max_size=max_size)
+    if workers == 1:
+        results = map(worker, pending)
+        executor = None
+    else:
+        executor = ProcessPoolExecutor(max_workers=workers)
+        results = executor.map(worker, pending, chunksize=16)
+
+    try:
+        for path, status in zip(pending, results):
+            rel = os.path.relpath(path, vault_path)
+            if status.startswith("failed"):
+                counts["failed"] += 1
+                print(f"Error: {rel}: {status[len('failed: ') :]}")
+                continue
+            counts[status] += 1
+            if status == "updated":
+                updated.append(path)
+            # Ignored files (transcript parts, other notes) are recorded
+            # too, so they are skipped until they change.
+            manifest[rel] = [current, os.stat(path).st_mtime_ns]
+    finally:
+        if executor is not None:
+            executor.shutdown()
+
+    reindex_tags(vault_path, updated)
+    save_manifest(vault_path, manifest)
+    return counts
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Re-tag and re-render existing YouTube notes in the vault."
+    )
+    parser.add_argument(
+        "vault_path",
+        nargs="?",
+        default=os.environ.get("VAULT_PATH") or os.environ.get("OBSIDIAN_VAULT_PATH"),
+        help="Vault to process (defaults to VAULT_PATH / OBSIDIAN_VAULT_PATH)",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=None,
+        help="Number of worker processes (default: CPU count)",
+    )
+    parser.add_argument(
+        "--force",
+        action="store_true",
+        help="Re-render every note even if its render hash is current",
+    )
+    parser.add_argument(
+        "--max-note-size",
+        type=int,
+        default=DEFAULT_MAX_NOTE_SIZE,
+        help="Transcript size above which notes are split into part notes",
+    )
+    args = parser.parse_args()
+
+    if not args.vault_path:
+        print("Error: VAULT_PATH or OBSIDIAN_VAULT_PATH environment variable not set")
+        sys.exit(1)
+    if not os.path.isdir(args.vault_path):
+        print(f"Error: vault path does not exist: {args.vault_path}")
+        sys.exit(1)
+
+    counts = rerender_vault(
+        args.vault_path,
+        workers=args.workers,
+        force=args.force,
+        max_size=args.max_note_size,
+    )
+    print(
+        f"✅ Re-render complete: {counts['updated']} updated, "
+        f"{counts['unchanged']} unchanged, {counts['skipped']} skipped, "
+        f"{counts['failed']} failed"
+    )
+    # Transcripts replaced by --refetch-transcript leave their old records
+    # behind in the archive until it is compacted.
+    with transcript_archive(args.vault_path) as archive:
+        freed = archive.compact()
+    if freed:
+        print(f"Compacted the transcript archive: {freed} bytes freed")
+    if counts["failed"]:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
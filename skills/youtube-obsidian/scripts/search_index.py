@@ -0,0 +1,260 @@
+#!/usr/bin/env python3
+"""Full-text search over note titles, descriptions and transcripts.
+
+Notes are indexed into an SQLite FTS5 table when they are written: one row
+per video, keyed by the rowid of its entry in the notes table, so searching
+never reads the vault and re-indexing a note touches only its own row.
+Results are ranked with BM25, weighting title matches above description
+matches above transcript matches, and come with a highlighted snippet.
+
+Transcripts with segment timing are also indexed in short timed windows
+(a second FTS5 table), so a search can say where in a video a phrase is
+said. Window rows get rowid = note id << SEGMENT_BITS | window number, which
+keeps a note's windows contiguous: replacing them is one rowid range query
+and a hit's note is found from its rowid alone.
+
+Both FTS5 tables are external-content tables, so the text is stored once:
+the notes table keeps each transcript zlib-compressed and the windows table
+keeps only each window's start time and character range in it. Views that
+inflate the transcript feed snippet() and the FTS5 'delete' commands, which
+need the indexed text back to remove a row.
+"""
+
+import os
+import sqlite3
+import zlib
+
+from transcript import Transcript
+
+SEARCH_RESULTS = 20
+SNIPPET_WORDS = 16
+# BM25 column weights: title, description, transcript.
+COLUMN_WEIGHTS = (10.0, 2.0, 1.0)
+# Windows are cut like timestamped paragraphs, just shorter, so hits point
+# close to where a phrase is said while phrases rarely straddle two rows.
+SEGMENT_SECONDS = 30.0
+SEGMENT_PAUSE_SECONDS = 2.0
+SEGMENT_BITS = 20
+
+SCHEMA = f"""
+CREATE TABLE IF NOT EXISTS notes (
+    id INTEGER PRIMARY KEY,
+    video_id TEXT NOT NULL UNIQUE,
+    path TEXT NOT NULL,
+    title TEXT NOT NULL,
+    description TEXT NOT NULL,
+    transcript BLOB NOT NULL
+);
+CREATE TABLE IF NOT EXISTS windows (
+    id INTEGER PRIMARY KEY,
+    start REAL NOT NULL,
+    offset INTEGER NOT NULL,
+    length INTEGER NOT NULL
+);
+CREATE VIEW IF NOT EXISTS document_content AS
+    SELECT id, title, description, inflate(transcript) AS transcript FROM notes;
+CREATE VIEW IF NOT EXISTS segment_content AS
+    SELECT windows.id AS id,
+        substr(inflate(notes.transcript), windows.offset + 1, windows.length)
+            AS text,
+        windows.start AS start
+    FROM windows JOIN notes ON notes.id = windows.id >> {SEGMENT_BITS};
+CREATE VIRTUAL TABLE IF NOT EXISTS documents USING fts5 (
+    title,
+    description,
+    transcript,
+    content = 'document_content',
+    content_rowid = 'id',
+    tokenize = 'unicode61 remove_diacritics 2'
+);
+CREATE VIRTUAL TABLE IF NOT EXISTS segments USING fts5 (
+    text,
+    start UNINDEXED,
+    content = 'segment_content',
+    content_rowid = 'id',
+    tokenize = 'unicode61 remove_diacritics 2'
+);
+"""
+
+
+def _inflater():
+    """Return an SQL function decompressing transcripts, caching the last one.
+
+    The windows of a note all slice the same transcript, so deleting or
+    snippeting them back to back inflates it once.
+    """
+    last = [None, ""]
+
+    def inflate(blob):
+        if blob != last[0]:
+            last[:] = [blob, zlib.decompress(blob).decode("utf-8")]
+        return last[1]
+
+    return inflate
+
+
+class SearchIndex:
+    """FTS5 index of the notes in a vault."""
+
+    def __init__(self, path):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self.connection = sqlite3.connect(path)
+        self.connection.create_function("inflate", 1, _inflater(), deterministic=True)
+        self.connection.executescript(SCHEMA)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def close(self):
+        self.connection.close()
+
+    def __len__(self):
+        (count,) = self.connection.execute("SELECT COUNT(*) FROM notes").fetchone()
+        return count
+
+    def add(self, video_id, path, title, description, transcript, commit=True):
+        """Index (or re-index) one note; path is relative to the vault.
+
+        transcript is a str or a Transcript; only a Transcript has the
+        timing needed for segment search. Pass commit=False to batch many
+        adds into one transaction and call commit() afterwards.
+        """
+        text = str(transcript)
+        compressed = zlib.compress(text.encode("utf-8"))
+        row = self.connection.execute(
+            "SELECT id FROM notes WHERE video_id = ?", (video_id,)
+        ).fetchone()
+        if row:
+            (rowid,) = row
+            self._delete_rows(rowid)
+            self.connection.execute(
+                "UPDATE notes SET path = ?, title = ?, description = ?, "
+                "transcript = ? WHERE id = ?",
+                (path, title, description, compressed, rowid),
+            )
+        else:
+            rowid = self.connection.execute(
+                "INSERT INTO notes (video_id, path, title, description, transcript) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (video_id, path, title, description, compressed),
+            ).lastrowid
+        self.connection.execute(
+            "INSERT INTO documents (rowid, title, description, transcript) "
+            "VALUES (?, ?, ?, ?)",
+            (rowid, title, description, text),
+        )
+        if isinstance(transcript, Transcript):
+            windows = []
+            offset = 0
+            paragraphs = transcript.paragraphs(SEGMENT_SECONDS, SEGMENT_PAUSE_SECONDS)
+            for number, (start, window) in enumerate(paragraphs):
+                windows.append(
+                    ((rowid << SEGMENT_BITS) + number, start, offset, window)
+                )
+                # Windows are consecutive slices joined by one separator.
+                offset += len(window) + 1
+            self.connection.executemany(
+                "INSERT INTO windows (id, start, offset, length) VALUES (?, ?, ?, ?)",
+                (
+                    (id_, start, offset, len(window))
+                    for id_, start, offset, window in windows
+                ),
+            )
+            self.connection.executemany(
+                "INSERT INTO segments (rowid, text, start) VALUES (?, ?, ?)",
+                ((id_, window, start) for id_, start, _, window in windows),
+            )
+        if commit:
+            self.commit()
+
+    def commit(self):
+        self.connection.commit()
+
+    def _delete_rows(self, rowid):
+        """Remove a note's FTS rows and windows, keeping its notes row.
+
+        External-content rows are deleted by handing FTS5 the indexed text
+        again, read back through the content views.
+        """
+        self.connection.execute(
+            "INSERT INTO documents (documents, rowid, title, description, "
+            "transcript) SELECT 'delete', id, title, description, transcript "
+            "FROM document_content WHERE id = ?",
+            (rowid,),
+        )
+        window_range = (rowid << SEGMENT_BITS, (rowid + 1) << SEGMENT_BITS)
+        self.connection.execute(
+            "INSERT INTO segments (segments, rowid, text, start) "
+            "SELECT 'delete', id, text, start FROM segment_content "
+            "WHERE id >= ? AND id < ?",
+            window_range,
+        )
+        self.connection.execute(
+            "DELETE FROM windows WHERE id >= ? AND id < ?", window_range
+        )
+
+    def remove(self, video_id):
+        """Drop a note from the index."""
+        row = self.connection.execute(
+            "SELECT id FROM notes WHERE video_id = ?", (video_id,)
+        ).fetchone()
+        if not row:
+            return
+        with self.connection:
+            self._delete_rows(row[0])
+            self.connection.execute("DELETE FROM notes WHERE id = ?", row)
+
+    def clear(self):
+        """Drop every note from the index."""
+        with self.connection:
+            self.connection.execute(
+                "INSERT INTO documents (documents) VALUES ('delete-all')"
+            )
+            self.connection.execute(
+                "INSERT INTO segments (segments) VALUES ('delete-all')"
+            )
+            self.connection.execute("DELETE FROM windows")
+            self.connection.execute("DELETE FROM notes")
+
+    def search(self, query, limit=SEARCH_RESULTS):
+        """Return [(path, title, snippet)] for the best matches of query.
+
+        query uses the FTS5 query syntax: words, "quoted phrases", AND / OR
+        / NOT, prefix* and column filters such as title:docker. Raises
+        ValueError for a malformed query.
+        """
+        weights = ", ".join(str(weight) for weight in COLUMN_WEIGHTS)
+        try:
+            rows = self.connection.execute(
+                "SELECT notes.path, documents.title, "
+                f"snippet(documents, -1, '**', '**', '…', {SNIPPET_WORDS}) "
+                "FROM documents JOIN notes ON notes.id = documents.rowid "
+                f"WHERE documents MATCH ? ORDER BY bm25(documents, {weights}) "
+                "LIMIT ?",
+                (query, limit),
+            )
+            return rows.fetchall()
+        except sqlite3.OperationalError as e:
+            raise ValueError(f"Invalid search query: {e}") from e
+
+    def search_segments(self, query, limit=SEARCH_RESULTS):
+        """Return [(video_id, path, start_seconds, snippet)] for query.
+
+        Same query syntax as search(), matched against the timed transcript
+        windows; "quoted phrases" must occur within one window.
+        """
+        try:
+            rows = self.connection.execute(
+                "SELECT notes.video_id, notes.path, segments.start, "
+                f"snippet(segments, 0, '**', '**', '…', {SNIPPET_WORDS}) "
+                "FROM segments JOIN notes "
+                f"ON notes.id = segments.rowid >> {SEGMENT_BITS} "
+                "WHERE segments MATCH ? ORDER BY rank LIMIT ?",
+                (query, limit),
+            )
+            return rows.fetchall()
+        except sqlite3.OperationalError as e:
+            raise ValueError(f"Invalid search query: {e}") from e
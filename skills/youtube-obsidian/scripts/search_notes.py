@@ -0,0 +1,169 @@
+#!/usr/bin/env python3
+"""Search the vault's notes through the full-text index.
+
+    search_notes.py 'kubernetes operator'     ranked note paths + snippets
+    search_notes.py --segments 'operator'     where in each video it's said
+    search_notes.py --rebuild                 re-index every note in the vault
+
+Rebuilding reads and parses notes across a process pool; the index itself
+is written from the main process in a single transaction.
+"""
+
+import argparse
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+
+from get_youtube_data import (
+    find_notes,
+    load_transcript,
+    parse_obsidian_note,
+    search_index_path,
+    timestamp_url,
+)
+from search_index import SEARCH_RESULTS, SearchIndex
+from transcript import format_timestamp
+
+
+def read_note(path, vault_path):
+    """Return (video_id, relpath, title, description, transcript) or None.
+
+    The archived transcript is preferred over the note body, which may hold
+    timestamp links, chapter headings or only links to part notes, and is
+    the only source of segment timing.
+    """
+    with open(path, encoding="utf-8") as f:
+        try:
+            note = parse_obsidian_note(f.read())
+        except ValueError:
+            return None
+    if not note.get("youtube_id") or note.get("transcript_part"):
+        return None
+    transcript = load_transcript(vault_path, note["youtube_id"])
+    if transcript is None:
+        transcript = note.get("transcript", "")
+    return (
+        note["youtube_id"],
+        os.path.relpath(path, vault_path),
+        note.get("title", ""),
+        note.get("description", ""),
+        transcript,
+    )
+
+
+def rebuild_index(vault_path, workers=None):
+    """Re-index every YouTube note in the vault; returns the note count."""
+    paths = list(find_notes(vault_path))
+    reader = partial(read_note, vault_path=vault_path)
+    with SearchIndex(search_index_path(vault_path)) as index:
+        index.clear()
+        if workers == 1:
+            documents = map(reader, paths)
+            executor = None
+        else:
+            executor = ProcessPoolExecutor(max_workers=workers)
+            documents = executor.map(reader, paths, chunksize=16)
+        try:
+            for document in documents:
+                if document is not None:
+                    index.add(*document, commit=False)
+        finally:
+            if executor is not None:
+                executor.shutdown()
+        index.commit()
+        return len(index)
+
+
+def build_parser():
+    """Command line interface for searching notes."""
+    parser = argparse.ArgumentParser(
+        description="Full-text search over the vault's YouTube notes."
+    )
+    parser.add_argument(
+        "query",
+        nargs="?",
+        help='FTS5 query: words, "phrases", AND/OR/NOT, prefix*, title:word',
+    )
+    parser.add_argument(
+        "--vault",
+        default=os.environ.get("VAULT_PATH") or os.environ.get("OBSIDIAN_VAULT_PATH"),
+        help="Vault to search (defaults to VAULT_PATH / OBSIDIAN_VAULT_PATH)",
+    )
+    parser.add_argument(
+        "--limit",
+        type=int,
+        default=SEARCH_RESULTS,
+        help=f"Maximum number of results (default: {SEARCH_RESULTS})",
+    )
+    parser.add_argument(
+        "--segments",
+        action="store_true",
+        help="Search timed transcript windows and print deep links",
+    )
+    parser.add_argument(
+        "--rebuild",
+        action="store_true",
+        help="Rebuild the index from the notes in the vault first",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=None,
+        help="Worker processes for --rebuild (default: CPU count)",
+    )
+    return parser
+
+
+def main():
+    parser = build_parser()
+    args = parser.parse_args()
+
+    if not args.vault:
+        print("Error: VAULT_PATH or OBSIDIAN_VAULT_PATH environment variable not set")
+        sys.exit(1)
+    if not os.path.isdir(args.vault):
+        print(f"Error: vault path does not exist: {args.vault}")
+        sys.exit(1)
+    if not args.query and not args.rebuild:
+        parser.print_usage()
+        sys.exit(1)
+
+    if args.rebuild:
+        count = rebuild_index(args.vault, workers=args.workers)
+        print(f"✅ Indexed {count} notes")
+    if not args.query:
+        return
+
+    path = search_index_path(args.vault)
+    if not os.path.exists(path):
+        print("Error: no search index in vault (run with --rebuild)")
+        sys.exit(1)
+    try:
+        with SearchIndex(path) as index:
+            if args.segments:
+                results = [
+                    (
+                        f"{note_path} [{format_timestamp(start)}] "
+                        f"{timestamp_url(video_id, start)}",
+                        snippet,
+                    )
+                    for video_id, note_path, start, snippet in index.search_segments(
+                        args.query, args.limit
+                    )
+                ]
+            else:
+                results = [
+                    (note_path, snippet)
+                    for note_path, _, snippet in index.search(args.query, args.limit)
+                ]
+    except ValueError as e:
+        print(f"Error: {e}")
+        sys.exit(1)
+    for heading, snippet in results:
+        print(heading)
+        print(f"    {' '.join(snippet.split())}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,135 @@
+#!/usr/bin/env python3
+"""Local extractive summaries of transcripts (TF-IDF + TextRank).
+
+Sentences are turned into TF-IDF vectors over a capped vocabulary, ranked
+with TextRank (PageRank over the cosine-similarity graph) and the best ones
+are returned in transcript order. Auto-generated captions have no
+punctuation, so transcripts without usable sentence breaks are cut into
+fixed-size word windows instead.
+
+Needs NumPy (pip install numpy); everything else in the skill works without
+it.
+"""
+
+import re
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+# Inputs are capped so the similarity matrix stays bounded in memory:
+# MAX_SENTENCES² + MAX_SENTENCES * MAX_TERMS float32 values (~25 MB).
+MAX_SENTENCES = 1500
+MAX_TERMS = 2000
+WINDOW_WORDS = 25
+MAX_SENTENCE_WORDS = 60
+DAMPING = 0.85
+MAX_ITERATIONS = 50
+TOLERANCE = 1e-6
+
+SENTENCE_BREAK = re.compile(r"(?<=[.!?])\s+")
+WORD = re.compile(r"[a-z0-9']+")
+STOPWORDS = frozenset(
+    """a about all also an and any are as at be because been but by can could
+    do does for from get go going got had has have he her here him his how i
+    if in into is it its just know like me more my no not now of on one or our
+    out really right say see she so some that the their them then there these
+    they this to um uh up us very was we well were what when where which who
+    will with would yeah you your""".split()
+)
+
+
+def split_sentences(text):
+    """Split text into sentences, or word windows if it lacks punctuation."""
+    sentences = [s.strip() for s in SENTENCE_BREAK.split(text) if s.strip()]
+    words = text.split()
+    if sentences and len(words) / len(sentences) <= MAX_SENTENCE_WORDS:
+        return sentences
+    return [
+        " ".join(words[i : i + WINDOW_WORDS])
+        for i in range(0, len(words), WINDOW_WORDS)
+    ]
+
+
+def _merge_adjacent(sentences, limit):
+    """Join neighbouring sentences until there are at most limit of them."""
+    if len(sentences) <= limit:
+        return sentences
+    group = -(-len(sentences) // limit)
+    return [" ".join(sentences[i : i + group]) for i in range(0, len(sentences), group)]
+
+
+def _tfidf_matrix(sentences):
+    """Row-normalized float32 TF-IDF matrix (sentences x capped vocabulary)."""
+    tokenized = [
+        [w for w in WORD.findall(s.lower()) if w not in STOPWORDS] for s in sentences
+    ]
+    document_frequency = {}
+    for tokens in tokenized:
+        for token in set(tokens):
+            document_frequency[token] = document_frequency.get(token, 0) + 1
+    vocabulary = sorted(document_frequency, key=document_frequency.get, reverse=True)
+    term_ids = {term: i for i, term in enumerate(vocabulary[:MAX_TERMS])}
+
+    rows, cols = [], []
+    for row, tokens in enumerate(tokenized):
+        for token in tokens:
+            col = term_ids.get(token)
+            if col is not None:
+                rows.append(row)
+                cols.append(col)
+
+    shape = (len(sentences), max(len(term_ids), 1))
+    flat = np.asarray(rows, dtype=np.int64) * shape[1] + np.asarray(cols, np.int64)
+    counts = np.bincount(flat, minlength=shape[0] * shape[1]).reshape(shape)
+    matrix = np.log1p(counts.astype(np.float32))
+
+    df = (counts > 0).sum(axis=0)
+    idf = np.log((1 + len(sentences)) / (1 + df)).astype(np.float32) + 1
+    matrix *= idf
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    norms[norms == 0] = 1
+    return matrix / norms
+
+
+def textrank(matrix):
+    """PageRank scores over the cosine-similarity graph of matrix rows."""
+    similarity = matrix @ matrix.T
+    np.fill_diagonal(similarity, 0)
+    out_weight = similarity.sum(axis=1, keepdims=True)
+    out_weight[out_weight == 0] = 1
+    transition = (similarity / out_weight).T
+
+    n = len(matrix)
+    scores = np.full(n, 1 / n, dtype=np.float32)
+    for _ in range(MAX_ITERATIONS):
+        updated = (1 - DAMPING) / n + DAMPING * (transition @ scores)
+        if np.abs(updated - scores).sum() < TOLERANCE:
+            return updated
+        scores = updated
+    return scores
+
+
+def summarize(text, sentence_count=5):
+    """Return the sentence_count most central sentences of text, in order.
+
+    Raises ImportError if NumPy is not installed.
+    """
+    if np is None:
+        raise ImportError(
+            "numpy not found (needed for --auto-summary). "
+            "Install with: pip install numpy"
+        )
+    sentences = _merge_adjacent(split_sentences(str(text)), MAX_SENTENCES)
+    if len(sentences) <= sentence_count:
+        return sentences
+
+    scores = textrank(_tfidf_matrix(sentences))
+    best = np.argsort(-scores, kind="stable")[:sentence_count]
+    return [sentences[i] for i in sorted(best)]
+
+
+def format_summary(sentences):
+    """Render summary sentences as a markdown bullet list."""
+    return "\n".join(f"- {sentence}" for sentence in sentences)
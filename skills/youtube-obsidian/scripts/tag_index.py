@@ -0,0 +1,144 @@
+#!/usr/bin/env python3
+"""Persistent tag index: tag -> notes, plus tag co-occurrence counts.
+
+The index is a SQLite file kept next to the other vault indexes. Each note
+is stored once with its tags; updating a note applies only the difference
+from its previous tags, both to the posting table and to the pair counts.
+Queries ("every note tagged kubernetes and docker", "tags that go with
+kubernetes") are answered from the indexed tables without reading notes.
+"""
+
+import os
+import sqlite3
+from itertools import permutations
+
+SUGGESTED_TAGS = 5
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS notes (
+    video_id TEXT PRIMARY KEY,
+    note TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS note_tags (
+    tag TEXT NOT NULL,
+    video_id TEXT NOT NULL,
+    PRIMARY KEY (tag, video_id)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS note_tags_by_video ON note_tags (video_id);
+CREATE TABLE IF NOT EXISTS cooccurrence (
+    tag TEXT NOT NULL,
+    other TEXT NOT NULL,
+    count INTEGER NOT NULL,
+    PRIMARY KEY (tag, other)
+) WITHOUT ROWID;
+"""
+
+
+def _placeholders(values):
+    return ", ".join("?" * len(values))
+
+
+class TagIndex:
+    """Inverted tag index of the notes in a vault."""
+
+    def __init__(self, path):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self.connection = sqlite3.connect(path)
+        self.connection.executescript(SCHEMA)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def close(self):
+        self.connection.close()
+
+    def tags_of(self, video_id):
+        """Return the set of tags a note is indexed under."""
+        rows = self.connection.execute(
+            "SELECT tag FROM note_tags WHERE video_id = ?", (video_id,)
+        )
+        return {tag for (tag,) in rows}
+
+    def set_tags(self, video_id, note, tags):
+        """Index a note under tags, replacing whatever it had before."""
+        new = set(tags)
+        with self.connection:
+            old = self.tags_of(video_id)
+            self.connection.execute(
+                "INSERT OR REPLACE INTO notes VALUES (?, ?)", (video_id, note)
+            )
+            self.connection.executemany(
+                "DELETE FROM note_tags WHERE tag = ? AND video_id = ?",
+                ((tag, video_id) for tag in old - new),
+            )
+            self.connection.executemany(
+                "INSERT INTO note_tags VALUES (?, ?)",
+                ((tag, video_id) for tag in new - old),
+            )
+            # Pairs that only existed with the old tags lose one count,
+            # pairs that only exist with the new ones gain one.
+            old_pairs = set(permutations(old, 2))
+            new_pairs = set(permutations(new, 2))
+            self.connection.executemany(
+                "UPDATE cooccurrence SET count = count - 1 WHERE tag = ? AND other = ?",
+                old_pairs - new_pairs,
+            )
+            self.connection.execute("DELETE FROM cooccurrence WHERE count <= 0")
+            self.connection.executemany(
+                "INSERT INTO cooccurrence VALUES (?, ?, 1) "
+                "ON CONFLICT (tag, other) DO UPDATE SET count = count + 1",
+                new_pairs - old_pairs,
+            )
+
+    def remove(self, video_id):
+        """Drop a note from the index."""
+        self.set_tags(video_id, "", ())
+        with self.connection:
+            self.connection.execute("DELETE FROM notes WHERE video_id = ?", (video_id,))
+
+    def notes_with(self, tags):
+        """Return sorted [(note, video_id)] for notes carrying every tag."""
+        tags = sorted(set(tags))
+        if not tags:
+            return []
+        rows = self.connection.execute(
+            "SELECT n.note, n.video_id FROM notes n JOIN ("
+            "  SELECT video_id FROM note_tags"
+            f"  WHERE tag IN ({_placeholders(tags)})"
+            "  GROUP BY video_id HAVING COUNT(*) = ?"
+            ") USING (video_id) ORDER BY n.note, n.video_id",
+            [*tags, len(tags)],
+        )
+        return rows.fetchall()
+
+    def tag_counts(self, tags=None):
+        """Return {tag: number of notes}, for all tags or just the given ones."""
+        if tags is None:
+            rows = self.connection.execute(
+                "SELECT tag, COUNT(*) FROM note_tags GROUP BY tag"
+            )
+        else:
+            tags = list(tags)
+            rows = self.connection.execute(
+                "SELECT tag, COUNT(*) FROM note_tags "
+                f"WHERE tag IN ({_placeholders(tags)}) GROUP BY tag",
+                tags,
+            )
+        return dict(rows)
+
+    def suggest(self, tags, k=SUGGESTED_TAGS):
+        """Return up to k [(tag, count)] most often seen alongside tags."""
+        tags = sorted(set(tags))
+        if not tags or k <= 0:
+            return []
+        rows = self.connection.execute(
+            "SELECT other, SUM(count) AS total FROM cooccurrence "
+            f"WHERE tag IN ({_placeholders(tags)}) "
+            f"AND other NOT IN ({_placeholders(tags)}) "
+            "GROUP BY other ORDER BY total DESC, other LIMIT ?",
+            [*tags, *tags, k],
+        )
+        return rows.fetchall()
@@ -0,0 +1,150 @@
+#!/usr/bin/env python3
+"""
+Tests for the append-only transcript archive in archive.py.
+"""
+
+import os
+
+import archive
+import pytest
+from archive import TranscriptArchive
+from test_helpers import create_mock_transcript_list
+from transcript import Transcript
+
+
+def make_transcript(*texts):
+    return Transcript.from_entries(
+        create_mock_transcript_list(
+            list(texts), starts=[float(i) for i in range(len(texts))]
+        )
+    )
+
+
+class TestTranscriptArchive:
+    """Tests for storing and reading transcripts (P1)."""
+
+    @pytest.mark.p1
+    @pytest.mark.unit
+    def test_round_trip(self, tmp_path):
+        transcript = make_transcript("Hello", "World 🎉")
+        with TranscriptArchive(str(tmp_path)) as store:
+            store.put("dQw4w9WgXcQ", transcript)
+            loaded = store.get("dQw4w9WgXcQ")
+
+        assert loaded.text == transcript.text
+        assert loaded.starts == transcript.starts
+        assert loaded.offsets == transcript.offsets
+
+    @pytest.mark.p1
+    @pytest.mark.unit
+    def test_persists_across_opens(self, tmp_path):
+        with TranscriptArchive(str(tmp_path)) as store:
+            store.put("a", make_transcript("first"))
+        with TranscriptArchive(str(tmp_path)) as store:
+            assert store.get("a").text == "first"
+            assert "a" in store
+            assert "b" not in store
+            assert store.get("b") is None
+            assert len(store) == 1
+
+    @pytest.mark.p1
+    @pytest.mark.unit
+    def test_put_again_appends_and_repoints(self, tmp_path):
+        with TranscriptArchive(str(tmp_path)) as store:
+            store.put("a", make_transcript("old"))
+            size = os.path.getsize(store.data_path)
+            store.put("a", make_transcript("new"))
+
+            assert os.path.getsize(store.data_path) > size
+            assert store.get("a").text == "new"
+            assert len(store) == 1
+
+    @pytest.mark.p1
+    @pytest.mark.unit
+    def test_raw_is_a_view_of_the_map(self, tmp_path):
+        with TranscriptArchive(str(tmp_path)) as store:
+            store.put("a", make_transcript("text"))
+            view = store.raw("a")
+            assert isinstance(view, memoryview)
+            assert view.readonly
+            view.release()
+
+    @pytest.mark.p2
+    @pytest.mark.unit
+    def test_index_grows(self, tmp_path, monkeypatch):
+        monkeypatch.setattr(archive, "INITIAL_SLOTS", 4)
+        ids = [f"video{i:06d}" for i in range(20)]
+        with TranscriptArchive(str(tmp_path)) as store:
+            for video_id in ids:
+                store.put(video_id, make_transcript(video_id))
+            assert store.slots >= 40
+        with TranscriptArchive(str(tmp_path)) as store:
+            assert sorted(store.video_ids()) == ids
+            assert all(store.get(video_id).text == video_id for video_id in ids)
+
+    @pytest.mark.p2
+    @pytest.mark.unit
+    def test_compact_drops_stale_records(self, tmp_path):
+        with TranscriptArchive(str(tmp_path)) as store:
+            store.put("a", make_transcript("x" * 1000))
+            store.put("a", make_transcript("short"))
+            store.put("b", make_transcript("other"))
+            before = os.path.getsize(store.data_path)
+            assert store.compact() > 0
+
+            assert os.path.getsize(store.data_path) < before
+            assert store.compact() == 0
+            assert store.get("a").text == "short"
+            assert store.get("b").text == "other"
+
+    @pytest.mark.p2
+    @pytest.mark.unit
+    def test_invalid_video_id(self, tmp_path):
+        with TranscriptArchive(str(tmp_path)) as store:
+            with pytest.raises(ValueError, match="Invalid video ID"):
+                store.put("x" * 17, make_transcript("text"))
+
+    @pytest.mark.p2
+    @pytest.mark.unit
+    def test_foreign_index_rejected(self, tmp_path):
+        (tmp_path / "transcripts.idx").write_bytes(bytes(64))
+        with pytest.raises(ValueError, match="Not a transcript archive"):
+            TranscriptArchive(str(tmp_path))
+
+
+def _put_many(directory, prefix, count):
+    with TranscriptArchive(directory) as store:
+        for number in range(count):
+            store.put(f"{prefix}{number:04d}", make_transcript(f"{prefix} {number}"))
+
+
+class TestSharedArchive:
+    """Tests for archives shared between writers (P2)."""
+
+    @pytest.mark.p2
+    @pytest.mark.unit
+    def test_sees_growth_by_other_writer(self, tmp_path, monkeypatch):
+        monkeypatch.setattr(archive, "INITIAL_SLOTS", 4)
+        with TranscriptArchive(str(tmp_path)) as reader:
+            _put_many(str(tmp_path), "vid", 10)
+            assert len(reader) == 10
+            assert reader.get("vid0009").text == "vid 9"
+            assert sorted(reader.video_ids())[0] == "vid0000"
+
+    @pytest.mark.p2
+    @pytest.mark.slow
+    def test_concurrent_writers(self, tmp_path):
+        from concurrent.futures import ProcessPoolExecutor
+
+        with ProcessPoolExecutor(max_workers=4) as executor:
+            futures = [
+                executor.submit(_put_many, str(tmp_path), prefix, 100)
+                for prefix in ("aa", "bb", "cc", "dd")
+            ]
+            for future in futures:
+                future.result()
+
+        with TranscriptArchive(str(tmp_path)) as store:
+            assert len(store) == 400
+            for prefix in ("aa", "bb", "cc", "dd"):
+                assert store.get(f"{prefix}0099").text == f"{prefix} 99"
@@ -0,0 +1,44 @@
+#!/usr/bin/env python3
+"""
+Tests for the run time budget in deadline.py.
+"""
+
+import pytest
+from deadline import Deadline, DeadlineExceededError, stage_timeout
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 100.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestDeadline:
+    """Tests for time left and stage timeouts (P1)."""
+
+    @pytest.mark.p1
+    @pytest.mark.unit
+    def test_timeout_is_time_left(self):
+        clock = FakeClock()
+        deadline = Deadline(30, clock)
+        clock.now += 10
+        assert deadline.timeout("metadata") == 20
+        assert not deadline.expired
+
+    @pytest.mark.p1
+    @pytest.mark.unit
+    def test_expired_deadline_cancels_stage(self):
+        clock = FakeClock()
+        deadline = Deadline(30, clock)
+        clock.now += 31
+        assert deadline.remaining() == 0
+        assert deadline.expired
+        with pytest.raises(DeadlineExceededError, match="before transcript"):
+            deadline.timeout("transcript")
+
+    @pytest.mark.p2
+    @pytest.mark.unit
+    def test_no_deadline_no_timeout(self):
+        assert stage_timeout(None, "metadata") is None
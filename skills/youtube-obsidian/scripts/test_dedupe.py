@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+"""
+Tests for near-duplicate transcript detection in dedupe.py.
+"""
+
+import os
+import random
+import subprocess
+import sys
+
+import pytest
+from dedupe import (
+    SIGNATURE_SIZE,
+    DuplicateIndex,
+    band_keys,
+    minhash_signature,
+    shingle_hashes,
+    similarity,
+)
+
+
+def random_text(seed, words=3000):
+    rnd = random.Random(seed)
+    return " ".join(f"w{rnd.randrange(5000)}" for _ in range(words))
+
+
+class TestMinhashSignature:
+    """Tests for signature computation (P1)."""
+
+    @pytest.mark.p1
+    @pytest.mark.unit
+    def test_signature_is_deterministic(self):
+        text = random_text(0)
+        assert minhash_signature(text) == minhash_signature(text)
+        assert len(minhash_signature(text)) == SIGNATURE_SIZE
+
+    @pytest.mark.p1
+    @pytest.mark.unit
+    def test_near_duplicate_scores_high(self):
+        text = random_text(0)
+        words = text.split()
+        clipped = " ".join(words[:2800] + ["intro", "outro"])
+
+        score = similarity(minhash_signature(text), minhash_signature(clipped))
+        assert score > 0.8
+
+    @pytest.mark.p1
+    @pytest.mark.unit
+    def test_unrelated_texts_score_low(self):
+        score = similarity(
+            minhash_signature(random_text(0)), minhash_signature(random_text(1))
+        )
+        assert score < 0.1
+
+    @pytest.mark.p1
+    @pytest.mark.unit
+    def test_signature_stable_across_hash_seeds(self):
+        # Signatures are stored on disk, so they must not depend on the
+        # per-process str hash seed.
+        code = (
+            "from dedupe import shingle_hashes; "
+            "print(list(shingle_hashes('a b c d e f')))"
+        )
+        outputs = {
+            subprocess.run(
+                [sys.executable, "-c", code],
+                capture_output=True,
+                text=True,
+                check=True,
+                cwd=os.path.dirname(os.path.abspath(__file__)),
+                env={**os.environ, "PYTHONHASHSEED": seed},
+            ).stdout
+            for seed in ("1", "2")
+        }
+        assert outputs == {f"{list(shingle_hashes('a b c d e f'))}\n"}
+
+    @pytest.mark.p2
+    @pytest.mark.unit
+    def test_case_and_punctuation_ignored(self):
+        assert minhash_signature("Hello, World! How are you?") == minhash_signature(
+            "hello world how are you"
+        )
+
+    @pytest.mark.p2
+    @pytest.mark.unit
+    def test_empty_text(self):
+        assert minhash_signature("") is None
+        assert list(shingle_hashes("")) == []
+
+    @pytest.mark.p2
+    @pytest.mark.unit
+    def test_short_text_gets_one_shingle(self):
+        assert len(list(shingle_hashes("two words"))) == 1
+        assert minhash_signature("two words") is not None
+
+    @pytest.mark.p2
+    @pytest.mark.unit
+    def test_band_keys(self):
+        keys = band_keys(minhash_signature(random_text(0)))
+        assert len(keys) == 16
+        assert all(-(1 << 63) <= key < 1 << 63 for key in keys)
+
+
+class TestDuplicateIndex:
+    """Tests for the on-disk LSH index (P1)."""
+
+    @pytest.mark.p1
+    @pytest.mark.unit
+    def test_finds_near_duplicates_only(self, tmp_path):
+        text = random_text(0)
+        with DuplicateIndex(str(tmp_path / "state" / "dup.sqlite")) as index:
+            index.add("orig", "Original Talk", minhash_signature(text))
+            index.add("other", "Other Talk", minhash_signature(random_text(1)))
+
+            mirror = minhash_signature(text + " thanks for watching")
+            matches = index.find(mirror)
+
+        assert [(video_id, note) for _, video_id, note in matches] == [
+            ("orig", "Original Talk")
+        ]
+        assert matches[0][0] > 0.9
+
+    @pytest.mark.p1
+    @pytest.mark.unit
+    def test_persists_and_replaces(self, tmp_path):
+        path = str(tmp_path / "dup.sqlite")
+        signature = minhash_signature(random_text(0))
+        with DuplicateIndex(path) as index:
+            index.add("orig", "Old Title", signature)
+            index.add("orig", "New Title", signature)
+
+        with DuplicateIndex(path) as index:
+            assert len(index) == 1
+            assert index.find(signature) == [(1.0, "orig", "New Title")]
+            assert index.find(signature, exclude="orig") == []
+            index.remove("orig")
+            assert index.find(signature) == []
@@ -286,3 +286,29 @@ class TestGenerateTagsOrdering:
         # Should be sorted and limited
         assert tags == sorted(tags)
         assert len(tags) <= 15
+
+
+class TestGenerateTagsBoundaries:
+    """Tests for phrases spanning the description/transcript join (P2)."""
+
+    @pytest.mark.p2
+    @pytest.mark.unit
+    def test_keyword_spans_description_and_transcript(self):
+        """Test capitalized phrases continue across the join like before."""
+        tags = generate_tags("", "Intro To", "Machine Learning rocks", [])
+        assert "intro to machine learning" in tags
+
+    @pytest.mark.p2
+    @pytest.mark.unit
+    def test_tech_term_spans_description_and_transcript(self):
+        """Test multi-word tech terms are found across the join."""
+        tags = generate_tags("", "about machine", "learning today", [])
+        assert "machine learning" in tags
+
+    @pytest.mark.p2
+    @pytest.mark.unit
+    def test_tech_term_spans_transcript_chunks(self, mocker):
+        """Test tech terms split across scanning windows are found."""
+        mocker.patch("get_youtube_data.TRANSCRIPT_CHUNK_SIZE", 5)
+        tags = generate_tags("", "", "we follow best practices here", [])
+        assert "best practices" in tags
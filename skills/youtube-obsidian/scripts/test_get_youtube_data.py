@@ -1,6 +1,8 @@
 #!/usr/bin/env python3
 import os
 import sys
+import time
+from types import SimpleNamespace
 
 sys.path.insert(
     0,
@@ -14,13 +16,26 @@ sys.path.insert(
 
 import pytest
 from get_youtube_data import (
+    TRANSCRIPT_SESSION,
     create_obsidian_note,
+    extract_playlist_id,
     extract_video_id,
+    fetch_transcript,
     generate_tags,
+    get_playlist_video_ids,
     get_transcript,
     get_video_metadata,
+    iter_note_files,
+    note_directory,
+    parse_chapters,
+    parse_obsidian_note,
+    render_obsidian_note,
     sanitize_filename,
+    select_transcript,
 )
+from search_index import SearchIndex
+from tag_index import TagIndex
+from transcript import Transcript
 
 
 class TestExtractVideoId:
@@ -191,6 +206,275 @@ class TestCreateObsidianNote:
         assert "This is a test description" in note
 
 
+class TestParseChapters:
+    def test_parses_chapter_list(self):
+        description = (
+            "Great talk.\n\n"
+            "00:00 Intro\n"
+            "(02:30) - Setup: tools\n"
+            "- 1:02:03 Q&A\n"
+            "Links below"
+        )
+        assert parse_chapters(description) == [
+            (0, "Intro"),
+            (150, "Setup: tools"),
+            (3723, "Q&A"),
+        ]
+
+    def test_requires_start_at_zero(self):
+        assert parse_chapters("0:10 A\n0:20 B\n0:30 C") == []
+
+    def test_requires_ascending_order(self):
+        assert parse_chapters("0:00 A\n0:20 B\n0:10 C") == []
+
+    def test_requires_minimum_count(self):
+        assert parse_chapters("0:00 A\n0:20 B") == []
+        assert parse_chapters("No chapters here") == []
+
+
+class TestRenderObsidianNote:
+    def test_chunks_match_create_obsidian_note(self):
+        metadata = {"title": "Test", "description": "Desc", "tags": ["a"]}
+        args = ("test123", "url", metadata, "Words " * 10, "Summary", "Comments")
+        chunks = list(render_obsidian_note(*args))
+        note, _ = create_obsidian_note(*args)
+        assert "".join(chunks) == note
+
+    def test_transcript_is_streamed_in_slices(self, mocker):
+        mocker.patch("get_youtube_data.TRANSCRIPT_CHUNK_SIZE", 4)
+        metadata = {"title": "Test", "description": "Desc", "tags": []}
+        chunks = list(render_obsidian_note("id", "url", metadata, "abcdefghij", ""))
+        assert chunks[-4:] == ["abcd", "efgh", "ij", "\n"]
+
+    def test_timestamped_paragraphs(self):
+        transcript = Transcript.from_entries(
+            [
+                MockTranscriptEntry("Hello", 0.0, 1.0),
+                MockTranscriptEntry("there", 1.0, 1.0),
+                MockTranscriptEntry("Later", 75.0, 1.0),
+            ]
+        )
+        metadata = {"title": "Test", "description": "Desc", "tags": []}
+        note, _ = create_obsidian_note(
+            "id", "https://youtu.be/id", metadata, transcript, "", timestamps=True
+        )
+        assert "transcript_format: timestamped\n" in note
+        assert note.endswith(
+            "## Full Transcript\n"
+            "[00:00](https://www.youtube.com/watch?v=id&t=0s) Hello there\n\n"
+            "[01:15](https://www.youtube.com/watch?v=id&t=75s) Later\n\n"
+        )
+
+    def test_timestamp_links_use_video_id(self):
+        transcript = Transcript.from_entries([MockTranscriptEntry("Later", 75.0, 1.0)])
+        metadata = {"title": "Test", "description": "Desc", "tags": []}
+        for url in ("dQw4w9WgXcQ", "https://www.youtube.com/watch?v=dQw4w9WgXcQ&t=30s"):
+            note, _ = create_obsidian_note(
+                "dQw4w9WgXcQ", url, metadata, transcript, "", timestamps=True
+            )
+            assert note.endswith(
+                "[01:15](https://www.youtube.com/watch?v=dQw4w9WgXcQ&t=75s) Later\n\n"
+            )
+
+    def test_timestamps_need_segment_timing(self):
+        metadata = {"title": "Test", "description": "Desc", "tags": []}
+        note, _ = create_obsidian_note(
+            "id", "url", metadata, "plain text", "", timestamps=True
+        )
+        assert "transcript_format" not in note
+        assert note.endswith("## Full Transcript\nplain text\n")
+
+    def test_chapters_split_transcript(self):
+        transcript = Transcript.from_entries(
+            [
+                MockTranscriptEntry("Hi", 0.0, 1.0),
+                MockTranscriptEntry("setup", 65.0, 1.0),
+                MockTranscriptEntry("more", 66.0, 1.0),
+                MockTranscriptEntry("bye", 130.0, 1.0),
+            ]
+        )
+        metadata = {
+            "title": "Test",
+            "description": "0:00 Intro\n1:00 Setup\n2:00 Outro",
+            "tags": [],
+        }
+        note, _ = create_obsidian_note(
+            "id", "https://youtu.be/id", metadata, transcript, ""
+        )
+        assert note.endswith(
+            "## Full Transcript\n"
+            "### [00:00](https://www.youtube.com/watch?v=id&t=0s) Intro\nHi\n\n"
+            "### [01:00](https://www.youtube.com/watch?v=id&t=60s) Setup\n"
+            "setup more\n\n"
+            "### [02:00](https://www.youtube.com/watch?v=id&t=120s) Outro\nbye\n\n"
+        )
+
+        note, _ = create_obsidian_note(
+            "id", "https://youtu.be/id", metadata, transcript, "", timestamps=True
+        )
+        assert (
+            "### [01:00](https://www.youtube.com/watch?v=id&t=60s) Setup\n"
+            "[01:05](https://www.youtube.com/watch?v=id&t=65s) setup more\n\n"
+        ) in note
+
+    def test_records_transcript_track(self):
+        metadata = {
+            "title": "Test",
+            "description": "Desc",
+            "tags": [],
+            "transcript_language": "de",
+            "transcript_kind": "translated",
+        }
+        note, _ = create_obsidian_note("id", "url", metadata, "Text", "")
+        parsed = parse_obsidian_note(note)
+        assert parsed["transcript_language"] == "de"
+        assert parsed["transcript_kind"] == "translated"
+
+
+class TestNoteDirectory:
+    def test_flat(self):
+        assert note_directory("flat", "dQw4w9WgXcQ", {}) == ""
+
+    def test_channel(self):
+        metadata = {"channel": "Tech: Talks"}
+        assert note_directory("channel", "dQw4w9WgXcQ", metadata) == "Tech Talks"
+        assert note_directory("channel", "dQw4w9WgXcQ", {}) == "Unknown channel"
+
+    def test_channel_stays_inside_vault(self):
+        for channel, directory in (
+            ("..", "Unknown channel"),
+            (".", "Unknown channel"),
+            (".hidden", "hidden"),
+            ("... Dots", "Dots"),
+        ):
+            metadata = {"channel": channel}
+            assert note_directory("channel", "dQw4w9WgXcQ", metadata) == directory
+
+    def test_date(self):
+        metadata = {"published_at": "2024-03-01T12:00:00Z"}
+        assert note_directory("date", "dQw4w9WgXcQ", metadata) == "2024/03"
+        assert note_directory("date", "dQw4w9WgXcQ", {}) == "Undated"
+
+    def test_hash_is_stable_two_hex_digits(self):
+        shard = note_directory("hash", "dQw4w9WgXcQ", {})
+        assert len(shard) == 2
+        assert int(shard, 16) >= 0
+        assert note_directory("hash", "dQw4w9WgXcQ", {}) == shard
+
+    def test_unknown_layout(self):
+        with pytest.raises(ValueError, match="Unknown vault layout"):
+            note_directory("nested", "dQw4w9WgXcQ", {})
+
+
+class TestIterNoteFiles:
+    def make_transcript(self):
+        return Transcript.from_entries(
+            [MockTranscriptEntry(f"word{i:02d}", float(i), 1.0) for i in range(20)]
+        )
+
+    def test_small_note_is_single_file(self):
+        metadata = {"title": "Test", "description": "Desc", "tags": []}
+        transcript = self.make_transcript()
+        files = [
+            (name, "".join(chunks))
+            for name, chunks in iter_note_files(
+                "Test", "id", "url", metadata, transcript, "Sum", max_size=1000
+            )
+        ]
+        note, _ = create_obsidian_note("id", "url", metadata, transcript, "Sum")
+        assert files == [("Test", note)]
+
+    def test_large_note_is_split_into_parts(self, mocker):
+        mocker.patch("get_youtube_data.TRANSCRIPT_CHUNK_SIZE", 16)
+        metadata = {"title": "Test", "description": "Desc", "tags": []}
+        files = [
+            (name, "".join(chunks))
+            for name, chunks in iter_note_files(
+                "Test",
+                "id",
+                "url",
+                metadata,
+                self.make_transcript(),
+                "Sum",
+                max_size=60,
+            )
+        ]
+        names = [name for name, _ in files]
+        assert names[-1] == "Test"
+        assert names[:-1] == [f"Test (Transcript {i})" for i in range(1, len(names))]
+
+        main_note = parse_obsidian_note(files[-1][1])
+        assert main_note["summary"] == "Sum"
+        assert main_note["transcript_parts"] == str(len(names) - 1)
+        assert "- [[Test (Transcript 1)]]" in main_note["transcript"]
+
+        bodies = []
+        for _, content in files[:-1]:
+            assert "transcript_part: " in content
+            assert "Back to [[Test]]" in content
+            bodies.append(content.split("Back to [[Test]]\n\n", 1)[1])
+        assert "".join(bodies) == self.make_transcript().text + "\n"
+        assert all(body.split()[0].startswith("word") for body in bodies)
+        assert all(len(body) <= 60 for body in bodies)
+
+
+class TestParseObsidianNote:
+    def test_round_trip(self):
+        metadata = {
+            "title": "Test: Video",
+            "description": "Line 1\n\nLine 2",
+            "tags": ["python"],
+        }
+        note, _ = create_obsidian_note(
+            "test123",
+            "https://youtube.com/watch?v=test123",
+            metadata,
+            "Test transcript",
+            "## Key Points\n- Point 1",
+            "My comments",
+        )
+        result = parse_obsidian_note(note)
+        assert result["title"] == "Test: Video"
+        assert result["youtube_id"] == "test123"
+        assert result["youtube_url"] == "https://youtube.com/watch?v=test123"
+        assert result["youtube_tags"] == ["python"]
+        assert "python" in result["tags"]
+        assert result["summary"] == "## Key Points\n- Point 1"
+        assert result["comments"] == "My comments"
+        assert result["description"] == "Line 1\n\nLine 2"
+        assert result["transcript"] == "Test transcript"
+
+    def test_without_comments_and_empty_summary(self):
+        metadata = {"title": "Test", "description": "Desc", "tags": []}
+        note, _ = create_obsidian_note("test123", "url", metadata, "Words", "")
+        result = parse_obsidian_note(note)
+        assert result["summary"] == ""
+        assert "comments" not in result
+        assert result["description"] == "Desc"
+        assert result["transcript"] == "Words"
+
+    def test_related_section(self):
+        metadata = {
+            "title": "Test",
+            "description": "Desc",
+            "tags": [],
+            "related": ["Other Talk", "Third"],
+        }
+        note, _ = create_obsidian_note("test123", "url", metadata, "Words", "S")
+        assert "## Related\n- [[Other Talk]]\n- [[Third]]\n\n## Description" in note
+        result = parse_obsidian_note(note)
+        assert result["related"] == "- [[Other Talk]]\n- [[Third]]"
+        assert result["description"] == "Desc"
+
+    def test_missing_frontmatter(self):
+        with pytest.raises(ValueError, match="no frontmatter"):
+            parse_obsidian_note("# Just a note\n")
+
+    def test_unclosed_frontmatter(self):
+        with pytest.raises(ValueError, match="not closed"):
+            parse_obsidian_note("---\ntitle: x\n")
+
+
 class TestGetVideoMetadata:
     def test_fetch_metadata_success(self, requests_mock):
         mock_response = {
@@ -212,6 +496,29 @@ class TestGetVideoMetadata:
         assert result["description"] == "Test Description"
         assert result["tags"] == ["test", "video"]
 
+    def test_timeout(self, requests_mock):
+        requests_mock.get(
+            "https://www.googleapis.com/youtube/v3/videos",
+            json={"items": [{"snippet": {"title": "T"}}]},
+        )
+        get_video_metadata("test123", "fake_api_key", timeout=7.0)
+        assert requests_mock.last_request.timeout == 7.0
+
+    def test_conditional_request_with_etag(self, requests_mock):
+        requests_mock.get(
+            "https://www.googleapis.com/youtube/v3/videos",
+            json={"etag": '"new"', "items": [{"snippet": {"title": "T"}}]},
+        )
+        result = get_video_metadata("test123", "fake_api_key", etag='"old"')
+        assert requests_mock.last_request.headers["If-None-Match"] == '"old"'
+        assert result["etag"] == '"new"'
+
+    def test_not_modified_returns_none(self, requests_mock):
+        requests_mock.get(
+            "https://www.googleapis.com/youtube/v3/videos", status_code=304
+        )
+        assert get_video_metadata("test123", "fake_api_key", etag='"old"') is None
+
     def test_video_not_found(self, requests_mock):
         mock_response = {"items": []}
         requests_mock.get(
@@ -228,6 +535,30 @@ class TestGetVideoMetadata:
             get_video_metadata("test123", "fake_api_key")
 
 
+class TestPlaylists:
+    def test_extract_playlist_id(self):
+        url = "https://www.youtube.com/playlist?list=PLabc_-1"
+        assert extract_playlist_id(url) == "PLabc_-1"
+        assert extract_playlist_id("https://youtu.be/dQw4w9WgXcQ") is None
+
+    def test_follows_pages(self, requests_mock):
+        url = "https://www.googleapis.com/youtube/v3/playlistItems"
+        requests_mock.get(
+            url,
+            [
+                {
+                    "json": {
+                        "nextPageToken": "page2",
+                        "items": [{"contentDetails": {"videoId": "a"}}],
+                    }
+                },
+                {"json": {"items": [{"contentDetails": {"videoId": "b"}}]}},
+            ],
+        )
+        assert get_playlist_video_ids("PLabc", "fake_api_key") == ["a", "b"]
+        assert requests_mock.last_request.qs["pagetoken"] == ["page2"]
+
+
 class MockTranscriptEntry:
     def __init__(self, text, start, duration):
         self.text = text
@@ -235,6 +566,56 @@ class MockTranscriptEntry:
         self.duration = duration
 
 
+class MockTrack:
+    def __init__(self, language_code, is_generated, entries=None, translatable=()):
+        self.language_code = language_code
+        self.is_generated = is_generated
+        self.is_translatable = bool(translatable)
+        self.translation_languages = [
+            SimpleNamespace(language_code=code) for code in translatable
+        ]
+        self.entries = entries or [MockTranscriptEntry("Hi", 0.0, 1.0)]
+
+    def fetch(self):
+        return self.entries
+
+    def translate(self, language_code):
+        return MockTrack(language_code, True, self.entries)
+
+
+class TestSelectTranscript:
+    def test_prefers_manual_over_generated(self):
+        tracks = [MockTrack("de", False), MockTrack("en", True)]
+        track, kind = select_transcript(tracks, ("en", "de"))
+        assert (track.language_code, kind) == ("de", "manual")
+
+    def test_prefers_language_order_within_kind(self):
+        tracks = [MockTrack("de", False), MockTrack("en", False)]
+        track, kind = select_transcript(tracks, ("en", "de"))
+        assert (track.language_code, kind) == ("en", "manual")
+
+    def test_generated_when_no_manual_match(self):
+        tracks = [MockTrack("fr", False), MockTrack("de", True)]
+        track, kind = select_transcript(tracks, ("en", "de"))
+        assert (track.language_code, kind) == ("de", "generated")
+
+    def test_translates_when_no_language_matches(self):
+        tracks = [
+            MockTrack("fr", True, translatable=["en"]),
+            MockTrack("es", False, translatable=["de", "en"]),
+        ]
+        track, kind = select_transcript(tracks, ("en", "de"))
+        assert (track.language_code, kind) == ("en", "translated")
+
+    def test_falls_back_to_any_track(self):
+        track, kind = select_transcript([MockTrack("ja", True)], ("en",))
+        assert (track.language_code, kind) == ("ja", "generated")
+
+    def test_no_tracks(self):
+        with pytest.raises(ValueError, match="No transcripts available"):
+            select_transcript([], ("en",))
+
+
 class TestGetTranscript:
     def test_fetch_transcript_success(self, mocker):
         mock_transcript_list = [
@@ -247,6 +628,75 @@ class TestGetTranscript:
         result = get_transcript("test123")
         assert result == "Hello World"
 
+    def test_fetch_transcript_keeps_timing(self, mocker):
+        track = MockTrack(
+            "en",
+            False,
+            [
+                MockTranscriptEntry("Hello", 0.0, 1.5),
+                MockTranscriptEntry("World", 1.5, 2.0),
+            ],
+        )
+        mock_api = mocker.patch("get_youtube_data.YouTubeTranscriptApi")
+        mock_api.return_value.list.return_value = [track]
+
+        result = fetch_transcript("test123")
+        assert result.text == "Hello World"
+        assert list(result) == [(0.0, 1.5, "Hello"), (1.5, 2.0, "World")]
+        assert (result.language, result.kind) == ("en", "manual")
+
+    def test_fetch_transcript_deadline(self, mocker):
+        deadline = mocker.Mock()
+        deadline.timeout.side_effect = [12.5, 4.0]
+        request = mocker.patch("requests.Session.request")
+        track = MockTrack("en", False)
+
+        # Each request, including the track fetch from the cached list, gets
+        # the time left when it starts.
+        def list_tracks(video_id):
+            TRANSCRIPT_SESSION.request("GET", "https://www.youtube.com/watch")
+            return [track]
+
+        def fetch():
+            TRANSCRIPT_SESSION.request("GET", "https://www.youtube.com/api/timedtext")
+            return track.entries
+
+        mock_api = mocker.patch("get_youtube_data.YouTubeTranscriptApi")
+        mock_api.return_value.list.side_effect = list_tracks
+        mocker.patch.object(track, "fetch", side_effect=fetch)
+
+        fetch_transcript("test123", deadline=deadline)
+        assert [c.kwargs["timeout"] for c in request.call_args_list] == [12.5, 4.0]
+        assert mock_api.call_args.kwargs["http_client"] is TRANSCRIPT_SESSION
+
+        TRANSCRIPT_SESSION.request("GET", "https://www.youtube.com/watch")
+        assert "timeout" not in request.call_args.kwargs
+
+    def test_fetch_transcript_cleans_generated_captions(self, mocker):
+        track = MockTrack(
+            "en",
+            True,
+            [
+                MockTranscriptEntry("[Music] welcome back to", 0.0, 1.0),
+                MockTranscriptEntry("back to the  channel", 1.0, 1.0),
+            ],
+        )
+        mock_api = mocker.patch("get_youtube_data.YouTubeTranscriptApi")
+        mock_api.return_value.list.return_value = [track]
+
+        assert fetch_transcript("test123").text == "welcome back to the channel"
+        assert fetch_transcript("test123", clean=False).text == (
+            "[Music] welcome back to back to the  channel"
+        )
+
+    def test_transcript_list_is_fetched_once_per_video(self, mocker):
+        mock_api = mocker.patch("get_youtube_data.YouTubeTranscriptApi")
+        mock_api.return_value.list.return_value = [MockTrack("en", False)]
+
+        fetch_transcript("test123")
+        fetch_transcript("test123", languages=("de", "en"))
+        assert mock_api.return_value.list.call_count == 1
+
     def test_transcript_not_available(self, mocker):
         mock_api = mocker.patch("get_youtube_data.YouTubeTranscriptApi")
         mock_api.return_value.fetch.side_effect = Exception("No transcript available")
@@ -323,17 +773,779 @@ class TestMainFunction:
             "get_youtube_data.get_video_metadata",
             return_value={"title": "Test", "description": "Desc", "tags": []},
         )
-        mocker.patch("get_youtube_data.get_transcript", return_value="Transcript text")
         mocker.patch(
-            "get_youtube_data.create_obsidian_note",
-            return_value=("Note content", "test_note"),
+            "get_youtube_data.fetch_transcript",
+            return_value=Transcript.from_entries(
+                [
+                    MockTranscriptEntry("Transcript", 0.0, 1.0),
+                    MockTranscriptEntry("text", 1.0, 1.0),
+                ]
+            ),
         )
 
         import get_youtube_data
 
         get_youtube_data.main()
 
-        assert (tmp_path / "test_note.md").exists()
+        note = (tmp_path / "Test.md").read_text(encoding="utf-8")
+        assert note.startswith("---\ntitle: Test\n")
+        assert note.endswith("## Full Transcript\nTranscript text\n")
+        stored = get_youtube_data.load_transcript(str(tmp_path), "test123")
+        assert stored.starts.tolist() == [0.0, 1.0]
+
+    def test_main_reuses_stored_video(self, mocker, monkeypatch, tmp_path):
+        mocker.patch(
+            "sys.argv", ["get_youtube_data.py", "https://youtube.com/watch?v=test123"]
+        )
+        monkeypatch.setenv("YOUTUBE_API_KEY", "fake_key")
+        monkeypatch.setenv("VAULT_PATH", str(tmp_path))
+        mocker.patch("get_youtube_data.extract_video_id", return_value="test123")
+        mock_metadata = mocker.patch(
+            "get_youtube_data.get_video_metadata",
+            side_effect=[
+                {"title": "Test", "description": "Desc", "tags": [], "etag": "e1"},
+                None,
+            ],
+        )
+        mock_fetch = mocker.patch(
+            "get_youtube_data.fetch_transcript",
+            return_value=Transcript.from_entries(
+                [MockTranscriptEntry("Transcript text", 0.0, 1.0)]
+            ),
+        )
+
+        import get_youtube_data
+
+        get_youtube_data.main()
+        (tmp_path / "Test.md").unlink()
+        get_youtube_data.main()
+
+        assert mock_metadata.call_args.kwargs["etag"] == "e1"
+        assert mock_fetch.call_count == 1
+        note = (tmp_path / "Test.md").read_text(encoding="utf-8")
+        assert note.endswith("## Full Transcript\nTranscript text\n")
+        with get_youtube_data.VideoStore(
+            get_youtube_data.video_store_path(str(tmp_path))
+        ) as store:
+            assert store.by_note("Test") == "test123"
+
+    def test_main_batch(self, mocker, monkeypatch, tmp_path, capsys):
+        batch = tmp_path / "urls.txt"
+        batch.write_text(
+            "# backfill\nhttps://youtu.be/aaaaaaaaaaa\n\nbbbbbbbbbbb\nbad\n",
+            encoding="utf-8",
+        )
+        vault = tmp_path / "vault"
+        vault.mkdir()
+        # No related links, which would change once both notes exist.
+        mocker.patch(
+            "sys.argv",
+            ["get_youtube_data.py", "--batch", str(batch), "--related", "0"],
+        )
+        monkeypatch.setenv("YOUTUBE_API_KEY", "fake_key")
+        monkeypatch.setenv("VAULT_PATH", str(vault))
+        mocker.patch(
+            "get_youtube_data.get_video_metadata",
+            side_effect=lambda video_id, api_key, etag=None, timeout=None: {
+                "title": f"Video {video_id}",
+                "description": "Desc",
+                "tags": [],
+            },
+        )
+        mocker.patch(
+            "get_youtube_data.fetch_transcript",
+            return_value=Transcript.from_entries(
+                [MockTranscriptEntry("Transcript", 0.0, 1.0)]
+            ),
+        )
+
+        import get_youtube_data
+
+        with pytest.raises(SystemExit) as exc_info:
+            get_youtube_data.main()
+
+        assert exc_info.value.code == 1
+        assert (vault / "Video aaaaaaaaaaa.md").exists()
+        assert (vault / "Video bbbbbbbbbbb.md").exists()
+        output = capsys.readouterr().out
+        assert "Error: bad:" in output
+        assert "Batch done: 2 written, 0 unchanged, 0 skipped, 1 failed" in output
+
+        mtime = os.stat(vault / "Video aaaaaaaaaaa.md").st_mtime_ns
+        with pytest.raises(SystemExit):
+            get_youtube_data.main()
+        assert os.stat(vault / "Video aaaaaaaaaaa.md").st_mtime_ns == mtime
+        output = capsys.readouterr().out
+        assert "Batch done: 0 written, 2 unchanged, 0 skipped, 1 failed" in output
+
+    def test_main_batch_resume(self, mocker, monkeypatch, tmp_path, capsys):
+        batch = tmp_path / "urls.txt"
+        batch.write_text("aaaaaaaaaaa\nbbbbbbbbbbb\nccccccccccc\n", encoding="utf-8")
+        vault = tmp_path / "vault"
+        vault.mkdir()
+        mocker.patch(
+            "sys.argv",
+            ["get_youtube_data.py", "--batch", str(batch), "--related", "0"],
+        )
+        monkeypatch.setenv("YOUTUBE_API_KEY", "fake_key")
+        monkeypatch.setenv("VAULT_PATH", str(vault))
+        mocker.patch(
+            "get_youtube_data.get_video_metadata",
+            side_effect=lambda video_id, api_key, etag=None, timeout=None: {
+                "title": f"Video {video_id}",
+                "description": "Desc",
+                "tags": [],
+            },
+        )
+        transcript = Transcript.from_entries(
+            [MockTranscriptEntry("Transcript", 0.0, 1.0)]
+        )
+        # The run dies (e.g. Ctrl-C) while fetching the second transcript.
+        fetch = mocker.patch(
+            "get_youtube_data.fetch_transcript",
+            side_effect=[transcript, KeyboardInterrupt, transcript, transcript],
+        )
+
+        import get_youtube_data
+
+        with pytest.raises(KeyboardInterrupt):
+            get_youtube_data.main()
+        capsys.readouterr()
+
+        sys.argv.append("--resume")
+        get_youtube_data.main()
+
+        assert [c.args[0] for c in fetch.call_args_list] == [
+            "aaaaaaaaaaa",
+            "bbbbbbbbbbb",
+            "bbbbbbbbbbb",
+            "ccccccccccc",
+        ]
+        output = capsys.readouterr().out
+        assert "Resuming after stage: metadata" in output
+        assert "Skipped 1 video(s) finished by an earlier run" in output
+        assert "Batch done: 2 written, 0 unchanged, 0 skipped, 0 failed" in output
+        urls = ["aaaaaaaaaaa", "bbbbbbbbbbb", "ccccccccccc"]
+        journal = get_youtube_data.batch_journal_path(str(vault), urls)
+        with open(journal, encoding="utf-8") as f:
+            assert f.read().splitlines() == [
+                f'{{"url":"{url}","status":"written"}}' for url in urls
+            ]
+
+    def test_main_deadline_writes_partial_note(
+        self, mocker, monkeypatch, tmp_path, capsys
+    ):
+        mocker.patch(
+            "sys.argv",
+            ["get_youtube_data.py", "dQw4w9WgXcQ", "Mine", "--deadline", "0.2"],
+        )
+        monkeypatch.setenv("YOUTUBE_API_KEY", "fake_key")
+        monkeypatch.setenv("VAULT_PATH", str(tmp_path))
+        mocker.patch(
+            "get_youtube_data.get_video_metadata",
+            return_value={"title": "Slow", "description": "Desc", "tags": []},
+        )
+
+        def stuck_fetch(video_id, clean, languages, deadline):
+            assert 0 < deadline.remaining() <= 0.2
+            time.sleep(0.3)
+            raise ValueError("Could not fetch transcript: read timed out")
+
+        fetch = mocker.patch(
+            "get_youtube_data.fetch_transcript", side_effect=stuck_fetch
+        )
+
+        import get_youtube_data
+
+        get_youtube_data.main()
+
+        note = (tmp_path / "Slow.md").read_text(encoding="utf-8")
+        assert "## Description\nDesc\n" in note
+        assert note.endswith("## Full Transcript\n\n")
+        assert "Deadline reached" in capsys.readouterr().out
+
+        # The next run fetches the transcript and completes the note, even
+        # with --update, keeping the summary.
+        sys.argv[2:] = ["--update"]
+        fetch.side_effect = None
+        fetch.return_value = Transcript.from_entries(
+            [MockTranscriptEntry("Transcript", 0.0, 1.0)]
+        )
+        get_youtube_data.main()
+        note = (tmp_path / "Slow.md").read_text(encoding="utf-8")
+        assert note.endswith("## Full Transcript\nTranscript\n")
+        assert "## Summary\nMine\n" in note
+
+    def test_main_batch_deadline_cancels_rest(
+        self, mocker, monkeypatch, tmp_path, capsys
+    ):
+        batch = tmp_path / "urls.txt"
+        batch.write_text("aaaaaaaaaaa\nbbbbbbbbbbb\n", encoding="utf-8")
+        vault = tmp_path / "vault"
+        vault.mkdir()
+        mocker.patch(
+            "sys.argv",
+            ["get_youtube_data.py", "--batch", str(batch), "--deadline", "0.2"],
+        )
+        monkeypatch.setenv("YOUTUBE_API_KEY", "fake_key")
+        monkeypatch.setenv("VAULT_PATH", str(vault))
+        mocker.patch(
+            "get_youtube_data.get_video_metadata",
+            return_value={"title": "Slow", "description": "Desc", "tags": []},
+        )
+
+        def stuck_fetch(*args, **kwargs):
+            time.sleep(0.3)
+            raise ValueError("Could not fetch transcript: read timed out")
+
+        mocker.patch("get_youtube_data.fetch_transcript", side_effect=stuck_fetch)
+
+        import get_youtube_data
+
+        with pytest.raises(SystemExit) as exc_info:
+            get_youtube_data.main()
+
+        assert exc_info.value.code == 1
+        output = capsys.readouterr().out
+        assert "Batch done: 0 written, 0 unchanged, 0 skipped, 0 failed" in output
+        assert "1 note(s) written without transcript" in output
+        assert "Deadline reached: 1 video(s) not started" in output
+        assert (vault / "Slow.md").exists()
+
+    def test_main_resume_needs_batch(self, mocker, capsys):
+        mocker.patch("sys.argv", ["get_youtube_data.py", "dQw4w9WgXcQ", "--resume"])
+
+        import get_youtube_data
+
+        with pytest.raises(SystemExit):
+            get_youtube_data.main()
+        assert "--resume only applies to --batch" in capsys.readouterr().out
+
+    def test_main_batch_rejects_url(self, mocker, capsys):
+        mocker.patch(
+            "sys.argv", ["get_youtube_data.py", "dQw4w9WgXcQ", "--batch", "urls.txt"]
+        )
+
+        import get_youtube_data
+
+        with pytest.raises(SystemExit):
+            get_youtube_data.main()
+        assert (
+            "one of a YouTube URL, --batch FILE or --worker" in capsys.readouterr().out
+        )
+
+    def test_main_worker_drains_queue(self, mocker, monkeypatch, tmp_path, capsys):
+        import get_youtube_data
+
+        vault = str(tmp_path)
+        with get_youtube_data.JobQueue(get_youtube_data.job_queue_path(vault)) as queue:
+            queue.enqueue([("aaaaaaaaaaa", "aaaaaaaaaaa"), ("bad", "bad")])
+        mocker.patch("sys.argv", ["get_youtube_data.py", "--worker"])
+        monkeypatch.setenv("YOUTUBE_API_KEY", "fake_key")
+        monkeypatch.setenv("VAULT_PATH", vault)
+        mocker.patch(
+            "get_youtube_data.get_video_metadata",
+            return_value={"title": "Queued", "description": "", "tags": []},
+        )
+        mocker.patch(
+            "get_youtube_data.fetch_transcript",
+            return_value=Transcript.from_entries(
+                [MockTranscriptEntry("Transcript", 0.0, 1.0)]
+            ),
+        )
+
+        with pytest.raises(SystemExit) as exc_info:
+            get_youtube_data.main()
+
+        assert exc_info.value.code == 1
+        assert (tmp_path / "Queued.md").exists()
+        output = capsys.readouterr().out
+        assert "Worker done: 1 written, 0 unchanged, 0 skipped, 3 failed" in output
+        with get_youtube_data.JobQueue(get_youtube_data.job_queue_path(vault)) as queue:
+            assert queue.counts() == {"done": 1, "failed": 1}
+            assert "Could not extract video ID" in queue.failures()[0][1]
+
+    def test_main_worker_reports_lost_lease(
+        self, mocker, monkeypatch, tmp_path, capsys
+    ):
+        import get_youtube_data
+
+        path = get_youtube_data.job_queue_path(str(tmp_path))
+        with get_youtube_data.JobQueue(path) as queue:
+            queue.enqueue([("aaaaaaaaaaa", "aaaaaaaaaaa")])
+        mocker.patch("sys.argv", ["get_youtube_data.py", "--worker"])
+        monkeypatch.setenv("YOUTUBE_API_KEY", "fake_key")
+        monkeypatch.setenv("VAULT_PATH", str(tmp_path))
+
+        def slow_process(*args, **kwargs):
+            # The lease runs out and another worker takes the job over.
+            with get_youtube_data.JobQueue(path) as queue:
+                queue.connection.execute("UPDATE jobs SET lease_expires = 0")
+                queue.connection.commit()
+                queue.lease("other:1")
+            return "written"
+
+        mocker.patch("get_youtube_data.process_video", side_effect=slow_process)
+
+        get_youtube_data.main()
+
+        assert "lost the lease on job 1 (aaaaaaaaaaa)" in capsys.readouterr().out
+
+    def test_main_worker_keeps_lease_until_synced(
+        self, mocker, monkeypatch, tmp_path, capsys
+    ):
+        import get_youtube_data
+
+        vault = str(tmp_path)
+        with get_youtube_data.JobQueue(get_youtube_data.job_queue_path(vault)) as queue:
+            queue.enqueue(
+                [("aaaaaaaaaaa", "aaaaaaaaaaa"), ("bbbbbbbbbbb", "bbbbbbbbbbb")]
+            )
+        mocker.patch(
+            "sys.argv", ["get_youtube_data.py", "--worker", "--fsync-every", "5"]
+        )
+        monkeypatch.setenv("YOUTUBE_API_KEY", "fake_key")
+        monkeypatch.setenv("VAULT_PATH", vault)
+        mocker.patch("get_youtube_data.LEASE_SECONDS", 0.6)
+        mocker.patch(
+            "get_youtube_data.get_video_metadata",
+            side_effect=lambda video_id, api_key, etag=None, timeout=None: {
+                "title": video_id,
+                "description": "",
+                "tags": [],
+            },
+        )
+
+        def slow_fetch(*args, **kwargs):
+            # Longer than the lease: the first job's note waits unsynced.
+            time.sleep(0.8)
+            return Transcript.from_entries(
+                [MockTranscriptEntry("Transcript", 0.0, 1.0)]
+            )
+
+        fetch = mocker.patch(
+            "get_youtube_data.fetch_transcript", side_effect=slow_fetch
+        )
+
+        get_youtube_data.main()
+
+        assert fetch.call_count == 2
+        assert "lost the lease" not in capsys.readouterr().out
+        with get_youtube_data.JobQueue(get_youtube_data.job_queue_path(vault)) as queue:
+            assert queue.counts() == {"done": 2}
+
+    def test_main_update_keeps_hand_edits(self, mocker, monkeypatch, tmp_path):
+        monkeypatch.setenv("YOUTUBE_API_KEY", "fake_key")
+        monkeypatch.setenv("VAULT_PATH", str(tmp_path))
+        mocker.patch(
+            "get_youtube_data.get_video_metadata",
+            side_effect=[
+                {"title": "Test", "description": "Desc", "tags": []},
+                {"title": "Test", "description": "New desc", "tags": ["newtag"]},
+            ],
+        )
+        mocker.patch(
+            "get_youtube_data.fetch_transcript",
+            return_value=Transcript.from_entries(
+                [MockTranscriptEntry("Transcript", 0.0, 1.0)]
+            ),
+        )
+
+        import get_youtube_data
+
+        mocker.patch("sys.argv", ["get_youtube_data.py", "dQw4w9WgXcQ", "First"])
+        get_youtube_data.main()
+        path = tmp_path / "Test.md"
+        path.write_text(
+            path.read_text(encoding="utf-8").replace(
+                "\nTranscript\n", "\nFixed by hand\n"
+            ),
+            encoding="utf-8",
+        )
+        mocker.patch(
+            "sys.argv",
+            ["get_youtube_data.py", "dQw4w9WgXcQ", "Second", "--update"],
+        )
+        get_youtube_data.main()
+
+        note = get_youtube_data.parse_obsidian_note(path.read_text(encoding="utf-8"))
+        assert note["summary"] == "Second"
+        assert note["description"] == "New desc"
+        assert note["transcript"] == "Fixed by hand"
+        # The frontmatter tags are patched to match the indexes.
+        assert note["youtube_tags"] == ["newtag"]
+        assert "newtag" in note["tags"]
+        with TagIndex(get_youtube_data.tag_index_path(str(tmp_path))) as index:
+            assert index.notes_with(note["tags"]) == [("Test", "dQw4w9WgXcQ")]
+
+    def test_main_layout_and_known_location(self, mocker, monkeypatch, tmp_path):
+        monkeypatch.setenv("YOUTUBE_API_KEY", "fake_key")
+        monkeypatch.setenv("VAULT_PATH", str(tmp_path))
+        mocker.patch(
+            "get_youtube_data.get_video_metadata",
+            return_value={
+                "title": "Test",
+                "description": "Desc",
+                "tags": [],
+                "published_at": "2024-03-01T12:00:00Z",
+            },
+        )
+        mocker.patch(
+            "get_youtube_data.fetch_transcript",
+            return_value=Transcript.from_entries(
+                [MockTranscriptEntry("Transcript", 0.0, 1.0)]
+            ),
+        )
+
+        import get_youtube_data
+
+        mocker.patch(
+            "sys.argv", ["get_youtube_data.py", "dQw4w9WgXcQ", "--layout", "date"]
+        )
+        get_youtube_data.main()
+        assert (tmp_path / "2024" / "03" / "Test.md").exists()
+
+        mocker.patch(
+            "sys.argv", ["get_youtube_data.py", "dQw4w9WgXcQ", "--layout", "flat"]
+        )
+        get_youtube_data.main()
+        assert not (tmp_path / "Test.md").exists()
+        with get_youtube_data.VaultIndex(
+            get_youtube_data.vault_index_path(str(tmp_path))
+        ) as index:
+            assert index.note_path("dQw4w9WgXcQ") == os.path.join(
+                "2024", "03", "Test.md"
+            )
+        with SearchIndex(get_youtube_data.search_index_path(str(tmp_path))) as index:
+            assert index.search("Test")[0][0] == os.path.join("2024", "03", "Test.md")
+
+    def test_main_same_title_gets_distinct_notes(self, mocker, monkeypatch, tmp_path):
+        batch = tmp_path / "urls.txt"
+        batch.write_text("aaaaaaaaaaa\nbbbbbbbbbbb\n", encoding="utf-8")
+        vault = tmp_path / "vault"
+        vault.mkdir()
+        mocker.patch("sys.argv", ["get_youtube_data.py", "--batch", str(batch)])
+        monkeypatch.setenv("YOUTUBE_API_KEY", "fake_key")
+        monkeypatch.setenv("VAULT_PATH", str(vault))
+        mocker.patch(
+            "get_youtube_data.get_video_metadata",
+            return_value={"title": "Episode", "description": "Desc", "tags": []},
+        )
+        mocker.patch(
+            "get_youtube_data.fetch_transcript",
+            return_value=Transcript.from_entries(
+                [MockTranscriptEntry("Transcript", 0.0, 1.0)]
+            ),
+        )
+
+        import get_youtube_data
+
+        get_youtube_data.main()
+
+        assert "youtube_id: aaaaaaaaaaa" in (vault / "Episode.md").read_text()
+        second = vault / "Episode (bbbbbb).md"
+        assert "youtube_id: bbbbbbbbbbb" in second.read_text()
+
+    def test_main_keeps_hand_written_notes(self, mocker, monkeypatch, tmp_path, capsys):
+        mine = "---\ntitle: My Video\nyoutube_id: OLDOLDOLD01\n---\n\nMine\n"
+        (tmp_path / "My Video.md").write_text(mine, encoding="utf-8")
+        (tmp_path / "Talk (Transcript 1).md").write_text("Notes", encoding="utf-8")
+        mocker.patch("sys.argv", ["get_youtube_data.py", "newvideo001"])
+        monkeypatch.setenv("YOUTUBE_API_KEY", "fake_key")
+        monkeypatch.setenv("VAULT_PATH", str(tmp_path))
+        metadata = mocker.patch(
+            "get_youtube_data.get_video_metadata",
+            return_value={"title": "My Video", "description": "Desc", "tags": []},
+        )
+        mocker.patch(
+            "get_youtube_data.fetch_transcript",
+            return_value=Transcript.from_entries(
+                [MockTranscriptEntry("x" * 20, 0.0, 1.0)]
+            ),
+        )
+
+        import get_youtube_data
+
+        # The vault's names are registered when the registry is created.
+        get_youtube_data.main()
+        assert (tmp_path / "My Video.md").read_text() == mine
+        assert "newvideo001" in (tmp_path / "My Video (newvid).md").read_text()
+
+        # Part note names are claimed as well.
+        metadata.return_value = {"title": "Talk", "description": "", "tags": []}
+        mocker.patch(
+            "sys.argv",
+            ["get_youtube_data.py", "talkvideo01", "--max-note-size", "10"],
+        )
+        with pytest.raises(SystemExit):
+            get_youtube_data.main()
+        assert "Not overwriting" in capsys.readouterr().out
+        assert (tmp_path / "Talk (Transcript 1).md").read_text() == "Notes"
+
+        # Notes written by hand after that are never overwritten, and their
+        # names stay taken.
+        (tmp_path / "Shared.md").write_text("Mine", encoding="utf-8")
+        metadata.return_value = {"title": "Shared", "description": "", "tags": []}
+        mocker.patch("sys.argv", ["get_youtube_data.py", "sharedvideo"])
+        for _ in range(2):
+            get_youtube_data.main()
+            assert (tmp_path / "Shared.md").read_text() == "Mine"
+            assert "sharedvideo" in (tmp_path / "Shared (shared).md").read_text()
+
+    def test_main_finishes_interrupted_index_update(
+        self, mocker, monkeypatch, tmp_path, capsys
+    ):
+        monkeypatch.setenv("YOUTUBE_API_KEY", "fake_key")
+        monkeypatch.setenv("VAULT_PATH", str(tmp_path))
+        mocker.patch(
+            "get_youtube_data.get_video_metadata",
+            side_effect=lambda video_id, api_key, etag=None, timeout=None: {
+                "title": f"Video {video_id}",
+                "description": "Desc",
+                "tags": ["yt"],
+            },
+        )
+        mocker.patch(
+            "get_youtube_data.fetch_transcript",
+            return_value=Transcript.from_entries(
+                [MockTranscriptEntry("Transcript", 0.0, 1.0)]
+            ),
+        )
+
+        import get_youtube_data
+
+        # The first run dies after writing its note, before indexing it.
+        mocker.patch("get_youtube_data.update_indexes", side_effect=KeyboardInterrupt)
+        mocker.patch("sys.argv", ["get_youtube_data.py", "aaaaaaaaaaa"])
+        with pytest.raises(KeyboardInterrupt):
+            get_youtube_data.main()
+        mocker.stopall()
+        mocker.patch(
+            "get_youtube_data.get_video_metadata",
+            return_value={"title": "Other", "description": "Desc", "tags": []},
+        )
+        mocker.patch(
+            "get_youtube_data.fetch_transcript",
+            return_value=Transcript.from_entries(
+                [MockTranscriptEntry("Transcript", 0.0, 1.0)]
+            ),
+        )
+        mocker.patch("sys.argv", ["get_youtube_data.py", "bbbbbbbbbbb"])
+        get_youtube_data.main()
+
+        assert "Finished 1 interrupted index update(s)" in capsys.readouterr().out
+        with TagIndex(get_youtube_data.tag_index_path(str(tmp_path))) as index:
+            assert ("Video aaaaaaaaaaa", "aaaaaaaaaaa") in index.notes_with(["yt"])
+        # Compacted again once the second run's own update was done.
+        journal = get_youtube_data.Journal(
+            get_youtube_data.index_journal_path(str(tmp_path))
+        )
+        with journal:
+            assert list(journal.records()) == []
+
+    def test_main_compacts_index_journal(self, mocker, monkeypatch, tmp_path):
+        monkeypatch.setenv("YOUTUBE_API_KEY", "fake_key")
+        monkeypatch.setenv("VAULT_PATH", str(tmp_path))
+        mocker.patch(
+            "get_youtube_data.get_video_metadata",
+            return_value={"title": "Test", "description": "Desc", "tags": []},
+        )
+        mocker.patch(
+            "get_youtube_data.fetch_transcript",
+            return_value=Transcript.from_entries(
+                [MockTranscriptEntry("Transcript", 0.0, 1.0)]
+            ),
+        )
+        mocker.patch("sys.argv", ["get_youtube_data.py", "aaaaaaaaaaa"])
+
+        import get_youtube_data
+
+        vault = str(tmp_path)
+        journal = get_youtube_data.Journal(get_youtube_data.index_journal_path(vault))
+        # Another run is writing: the journal is left to it.
+        with get_youtube_data.vault_lock(vault, "journal", shared=True):
+            get_youtube_data.main()
+        with journal:
+            assert [r["op"] for r in journal.records()] == ["index", "done"]
+            journal.append(op="index", video_id="bbbbbbbbbbb", note="B", path="B.md")
+
+        # Finished updates go once no other run is writing; unfinished stay.
+        assert get_youtube_data.compact_index_journal(vault)
+        with journal:
+            assert [r["video_id"] for r in journal.records()] == ["bbbbbbbbbbb"]
+
+    def test_main_splits_large_notes(self, mocker, monkeypatch, tmp_path):
+        mocker.patch(
+            "sys.argv",
+            [
+                "get_youtube_data.py",
+                "https://youtube.com/watch?v=test123",
+                "--max-note-size",
+                "10",
+            ],
+        )
+        monkeypatch.setenv("YOUTUBE_API_KEY", "fake_key")
+        monkeypatch.setenv("VAULT_PATH", str(tmp_path))
+        mocker.patch(
+            "get_youtube_data.get_video_metadata",
+            return_value={"title": "Test", "description": "Desc", "tags": []},
+        )
+        mocker.patch(
+            "get_youtube_data.fetch_transcript",
+            return_value=Transcript.from_entries(
+                [MockTranscriptEntry("x" * 20, 0.0, 1.0)]
+            ),
+        )
+
+        import get_youtube_data
+
+        get_youtube_data.main()
+
+        assert (tmp_path / "Test (Transcript 1).md").exists()
+        assert "[[Test (Transcript 1)]]" in (tmp_path / "Test.md").read_text()
+
+        # Unsplit on re-import: the old part note goes too.
+        sys.argv[-1] = "0"
+        get_youtube_data.main()
+        assert sorted(p.name for p in tmp_path.glob("*.md")) == ["Test.md"]
+        assert "Transcript 1" not in (tmp_path / "Test.md").read_text()
+
+    def test_main_timestamps_flag(self, mocker, monkeypatch, tmp_path):
+        mocker.patch(
+            "sys.argv",
+            [
+                "get_youtube_data.py",
+                "https://youtube.com/watch?v=test123",
+                "--timestamps",
+            ],
+        )
+        monkeypatch.setenv("YOUTUBE_API_KEY", "fake_key")
+        monkeypatch.setenv("VAULT_PATH", str(tmp_path))
+        mocker.patch(
+            "get_youtube_data.get_video_metadata",
+            return_value={"title": "Test", "description": "Desc", "tags": []},
+        )
+        mocker.patch(
+            "get_youtube_data.fetch_transcript",
+            return_value=Transcript.from_entries(
+                [MockTranscriptEntry("Transcript", 65.0, 1.0)]
+            ),
+        )
+
+        import get_youtube_data
+
+        get_youtube_data.main()
+
+        note = (tmp_path / "Test.md").read_text(encoding="utf-8")
+        assert (
+            "[01:05](https://www.youtube.com/watch?v=test123&t=65s) Transcript" in note
+        )
+
+    def test_main_auto_summary_flag(self, mocker, monkeypatch, tmp_path):
+        mocker.patch(
+            "sys.argv",
+            [
+                "get_youtube_data.py",
+                "https://youtube.com/watch?v=test123",
+                "--auto-summary",
+            ],
+        )
+        monkeypatch.setenv("YOUTUBE_API_KEY", "fake_key")
+        monkeypatch.setenv("VAULT_PATH", str(tmp_path))
+        mocker.patch(
+            "get_youtube_data.get_video_metadata",
+            return_value={"title": "Test", "description": "Desc", "tags": []},
+        )
+        mocker.patch(
+            "get_youtube_data.fetch_transcript",
+            return_value=Transcript.from_entries(
+                [MockTranscriptEntry("Transcript", 0.0, 1.0)]
+            ),
+        )
+        mock_summarize = mocker.patch(
+            "get_youtube_data.summarize", return_value=["Key point."]
+        )
+
+        import get_youtube_data
+
+        get_youtube_data.main()
+
+        mock_summarize.assert_called_once()
+        note = (tmp_path / "Test.md").read_text(encoding="utf-8")
+        assert "## Summary\n- Key point.\n" in note
+
+    def test_main_flags_and_skips_duplicates(
+        self, capsys, mocker, monkeypatch, tmp_path
+    ):
+        monkeypatch.setenv("YOUTUBE_API_KEY", "fake_key")
+        monkeypatch.setenv("VAULT_PATH", str(tmp_path))
+        words = " ".join(f"word{i}" for i in range(200))
+        mocker.patch(
+            "get_youtube_data.fetch_transcript",
+            return_value=Transcript.from_entries(
+                [MockTranscriptEntry(words, 0.0, 1.0)]
+            ),
+        )
+
+        import get_youtube_data
+
+        for video_id, title in [("first123456", "Original"), ("second12345", "Mirror")]:
+            mocker.patch(
+                "sys.argv",
+                ["get_youtube_data.py", video_id, "--skip-duplicates"],
+            )
+            mocker.patch(
+                "get_youtube_data.get_video_metadata",
+                return_value={"title": title, "description": "", "tags": []},
+            )
+            get_youtube_data.main()
+
+        assert (tmp_path / "Original.md").exists()
+        assert not (tmp_path / "Mirror.md").exists()
+        output = capsys.readouterr().out
+        assert "Possible duplicate of [[Original]] (first123456, 100%)" in output
+
+    def test_main_links_related_notes(self, mocker, monkeypatch, tmp_path):
+        monkeypatch.setenv("YOUTUBE_API_KEY", "fake_key")
+        monkeypatch.setenv("VAULT_PATH", str(tmp_path))
+
+        import get_youtube_data
+
+        videos = [
+            ("rustvideo01", "Rust Ownership", "rust borrow checker ownership"),
+            ("pastavideo1", "Pasta Night", "pasta tomato basil"),
+            ("rustvideo02", "Rust Lifetimes", "rust lifetimes borrow checker"),
+        ]
+        for video_id, title, text in videos:
+            mocker.patch("sys.argv", ["get_youtube_data.py", video_id])
+            mocker.patch(
+                "get_youtube_data.get_video_metadata",
+                return_value={"title": title, "description": "", "tags": []},
+            )
+            mocker.patch(
+                "get_youtube_data.fetch_transcript",
+                return_value=Transcript.from_entries(
+                    [MockTranscriptEntry(text, 0.0, 1.0)]
+                ),
+            )
+            get_youtube_data.main()
+
+        assert "## Related" not in (tmp_path / "Rust Ownership.md").read_text()
+        with TagIndex(get_youtube_data.tag_index_path(str(tmp_path))) as index:
+            assert index.notes_with(["rust ownership"]) == [
+                ("Rust Ownership", "rustvideo01")
+            ]
+        with SearchIndex(get_youtube_data.search_index_path(str(tmp_path))) as index:
+            assert [path for path, _, _ in index.search("lifetimes")] == [
+                "Rust Lifetimes.md"
+            ]
+            assert index.search_segments("pasta")[0][:3] == (
+                "pastavideo1",
+                "Pasta Night.md",
+                0.0,
+            )
+        note = (tmp_path / "Rust Lifetimes.md").read_text()
+        assert "## Related\n- [[Rust Ownership]]\n\n" in note
 
     def test_main_exception_handling(self, capsys, mocker, monkeypatch, tmp_path):
         """Test that main() handles exceptions gracefully (P1)."""
@@ -0,0 +1,144 @@
+#!/usr/bin/env python3
+"""
+Tests for the job queue in job_queue.py and enqueue_videos.py.
+"""
+
+import time
+
+import pytest
+from enqueue_videos import main
+from get_youtube_data import job_queue_path
+from job_queue import MAX_ATTEMPTS, Heartbeat, JobQueue
+
+
+@pytest.fixture
+def queue(tmp_path):
+    with JobQueue(str(tmp_path / "queue.sqlite")) as queue:
+        yield queue
+
+
+class TestJobQueue:
+    """Tests for leasing, completing and failing jobs (P1)."""
+
+    @pytest.mark.p1
+    @pytest.mark.unit
+    def test_enqueue_skips_queued_videos(self, queue):
+        assert queue.enqueue([("a", "https://youtu.be/a"), ("b", "b")]) == {"added": 2}
+        assert queue.enqueue([("a", "a"), ("c", "c")]) == {"added": 1, "queued": 1}
+        assert queue.counts() == {"queued": 3}
+
+    @pytest.mark.p1
+    @pytest.mark.unit
+    def test_enqueue_reports_finished_videos(self, queue):
+        queue.enqueue([("a", "a"), ("b", "b")])
+        queue.complete(queue.lease("w1")[0], "w1")
+        for _ in range(MAX_ATTEMPTS):
+            queue.fail(queue.lease("w1")[0], "w1", "Video not found: b")
+        assert queue.enqueue([("a", "a"), ("b", "b")]) == {"done": 1, "failed": 1}
+        assert queue.lease("w1") is None
+
+    @pytest.mark.p1
+    @pytest.mark.unit
+    def test_lease_in_order_and_once(self, queue, tmp_path):
+        queue.enqueue([("a", "url a"), ("b", "url b")])
+        with JobQueue(str(tmp_path / "queue.sqlite")) as other:
+            first = queue.lease("w1")
+            second = other.lease("w2")
+            assert first[1:] == ("a", "url a")
+            assert second[1:] == ("b", "url b")
+            assert other.lease("w2") is None
+
+        assert queue.complete(first[0], "w1")
+        assert not queue.complete(second[0], "w1")
+        assert queue.counts() == {"done": 1, "leased": 1}
+
+    @pytest.mark.p1
+    @pytest.mark.unit
+    def test_expired_lease_is_taken_over(self, queue):
+        queue.enqueue([("a", "a")])
+        job_id, _, _ = queue.lease("w1", seconds=-1)
+        assert queue.lease("w2")[0] == job_id
+        assert not queue.heartbeat(job_id, "w1")
+        assert not queue.complete(job_id, "w1")
+        assert queue.heartbeat(job_id, "w2")
+        assert queue.complete(job_id, "w2")
+
+    @pytest.mark.p1
+    @pytest.mark.unit
+    def test_failures_are_retried_then_kept(self, queue):
+        queue.enqueue([("a", "a")])
+        for _ in range(MAX_ATTEMPTS):
+            job_id, _, _ = queue.lease("w1")
+            assert queue.fail(job_id, "w1", "Video not found: a")
+        assert queue.lease("w1") is None
+        assert queue.failures() == [("a", "Video not found: a")]
+
+        assert queue.retry_failed() == 1
+        assert queue.lease("w1") is not None
+
+    @pytest.mark.p2
+    @pytest.mark.unit
+    def test_repeatedly_expired_lease_fails(self, queue):
+        queue.enqueue([("a", "a")])
+        for _ in range(MAX_ATTEMPTS):
+            queue.lease("w1", seconds=-1)
+        assert queue.lease("w1") is None
+        assert queue.failures() == [("a", "lease expired")]
+
+    @pytest.mark.p2
+    @pytest.mark.unit
+    def test_heartbeat_thread_extends_lease(self, queue):
+        queue.enqueue([("a", "a")])
+        job_id, _, _ = queue.lease("w1", seconds=0.6)
+        with Heartbeat(queue.path, job_id, "w1", seconds=0.6):
+            time.sleep(0.9)
+            assert queue.lease("w2") is None
+        assert queue.complete(job_id, "w1")
+
+
+class TestMain:
+    """Tests for the enqueue_videos command line (P2)."""
+
+    @pytest.mark.p2
+    @pytest.mark.unit
+    def test_enqueues_videos_and_playlists(self, tmp_path, mocker, capsys):
+        playlist = mocker.patch(
+            "enqueue_videos.get_playlist_video_ids",
+            return_value=["aaaaaaaaaaa", "bbbbbbbbbbb"],
+        )
+        mocker.patch.dict("os.environ", {"YOUTUBE_API_KEY": "fake_key"})
+        mocker.patch(
+            "sys.argv",
+            [
+                "enqueue_videos.py",
+                "--vault",
+                str(tmp_path),
+                "https://youtu.be/bbbbbbbbbbb",
+                "https://www.youtube.com/playlist?list=PLtest",
+                "--status",
+            ],
+        )
+        main()
+
+        playlist.assert_called_once_with("PLtest", "fake_key")
+        output = capsys.readouterr().out
+        assert "Queued 2 video(s)\n1 already queued\n" in output
+        assert "     2  queued\n" in output
+        with JobQueue(job_queue_path(str(tmp_path))) as queue:
+            assert queue.lease("w1")[1:] == (
+                "bbbbbbbbbbb",
+                "https://youtu.be/bbbbbbbbbbb",
+            )
+
+    @pytest.mark.p2
+    @pytest.mark.unit
+    def test_playlist_needs_api_key(self, tmp_path, mocker, capsys):
+        mocker.patch.dict("os.environ", {}, clear=True)
+        mocker.patch(
+            "sys.argv",
+            ["enqueue_videos.py", "--vault", str(tmp_path), "x?list=PLtest"],
+        )
+        with pytest.raises(SystemExit) as exc_info:
+            main()
+        assert exc_info.value.code == 1
+        assert "YOUTUBE_API_KEY" in capsys.readouterr().out
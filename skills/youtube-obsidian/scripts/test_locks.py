@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+"""
+Tests for the cross-process locks in locks.py and the journal in journal.py.
+"""
+
+import pytest
+from journal import Journal
+from locks import FileLock, LockBusyError, stripe
+
+
+class TestFileLock:
+    """Tests for exclusive and shared flocks (P1)."""
+
+    @pytest.mark.p1
+    @pytest.mark.unit
+    def test_exclusive_lock_excludes(self, tmp_path):
+        path = str(tmp_path / "locks" / "index.lock")
+        with FileLock(path):
+            with pytest.raises(LockBusyError):
+                FileLock(path, blocking=False).acquire()
+        with FileLock(path, blocking=False):
+            pass
+
+    @pytest.mark.p1
+    @pytest.mark.unit
+    def test_shared_locks_coexist(self, tmp_path):
+        path = str(tmp_path / "journal.lock")
+        with FileLock(path, shared=True), FileLock(path, shared=True, blocking=False):
+            with pytest.raises(LockBusyError):
+                FileLock(path, blocking=False).acquire()
+
+    @pytest.mark.p2
+    @pytest.mark.unit
+    def test_stripes(self):
+        assert stripe("dQw4w9WgXcQ") == stripe("dQw4w9WgXcQ")
+        assert all(0 <= stripe(f"video{n}", 8) < 8 for n in range(100))
+        assert len({stripe(f"video{n}") for n in range(1000)}) > 200
+
+
+class TestJournal:
+    """Tests for the append-only journal (P1)."""
+
+    @pytest.mark.p1
+    @pytest.mark.unit
+    def test_append_and_read(self, tmp_path):
+        with Journal(str(tmp_path / "index.journal")) as journal:
+            journal.append(op="index", video_id="a")
+            journal.append(op="done", video_id="a")
+            assert list(journal.records()) == [
+                {"op": "index", "video_id": "a"},
+                {"op": "done", "video_id": "a"},
+            ]
+
+    @pytest.mark.p1
+    @pytest.mark.unit
+    def test_torn_line_is_skipped(self, tmp_path):
+        path = tmp_path / "index.journal"
+        path.write_text('{"op":"index","video_id":"a"}\n{"op":"do', encoding="utf-8")
+        with Journal(str(path)) as journal:
+            journal.append(op="index", video_id="b")
+            assert [r["video_id"] for r in journal.records()] == ["a", "b"]
+
+    @pytest.mark.p2
+    @pytest.mark.unit
+    def test_rewrite(self, tmp_path):
+        with Journal(str(tmp_path / "index.journal")) as journal:
+            journal.append(op="index", video_id="a")
+            journal.rewrite([{"op": "index", "video_id": "b"}])
+            journal.append(op="done", video_id="b")
+            assert [r["op"] for r in journal.records()] == ["index", "done"]
@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""
+Tests for section-level note updates in note_patch.py.
+"""
+
+import os
+
+import pytest
+from get_youtube_data import create_obsidian_note, parse_obsidian_note
+from note_patch import find_sections, patch_note
+from test_helpers import create_video_metadata
+
+
+@pytest.fixture
+def note(tmp_path):
+    metadata = create_video_metadata(description="Old description")
+    content, _ = create_obsidian_note(
+        "test123", "url", metadata, "Transcript words", "Old summary", "My notes"
+    )
+    path = tmp_path / "note.md"
+    path.write_text(content, encoding="utf-8")
+    return path
+
+
+def read(path):
+    return parse_obsidian_note(path.read_text(encoding="utf-8"))
+
+
+class TestFindSections:
+    """Tests for locating sections by heading (P1)."""
+
+    @pytest.mark.p1
+    @pytest.mark.unit
+    def test_offsets_match_parser(self, note):
+        data = note.read_bytes()
+        sections = find_sections(str(note))
+        assert list(sections) == ["summary", "comments", "description", "transcript"]
+        start, body, stop = sections["summary"]
+        assert data[start:body] == b"## Summary\n"
+        assert data[body:stop] == b"Old summary\n\n"
+
+    @pytest.mark.p1
+    @pytest.mark.unit
+    def test_requires_frontmatter(self, tmp_path):
+        path = tmp_path / "plain.md"
+        path.write_text("# Plain note\n", encoding="utf-8")
+        with pytest.raises(ValueError, match="frontmatter"):
+            find_sections(str(path))
+
+
+class TestPatchNote:
+    """Tests for rewriting only targeted sections (P1)."""
+
+    @pytest.mark.p1
+    @pytest.mark.unit
+    def test_replaces_only_given_sections(self, note):
+        content = note.read_text(encoding="utf-8")
+        edited = content.replace("My notes", "My notes, edited by hand")
+        note.write_text(edited, encoding="utf-8")
+
+        assert patch_note(str(note), {"summary": "New summary\n\n## Key points"})
+        patched = read(note)
+        assert patched["summary"] == "New summary\n\n## Key points"
+        assert patched["comments"] == "My notes, edited by hand"
+        assert patched["transcript"] == "Transcript words"
+        new_content = note.read_text(encoding="utf-8")
+        assert (
+            new_content.replace("New summary\n\n## Key points", "Old summary") == edited
+        )
+
+    @pytest.mark.p1
+    @pytest.mark.unit
+    def test_unchanged_sections_leave_file_alone(self, note):
+        os.utime(note, ns=(0, 0))
+        assert not patch_note(
+            str(note), {"summary": "Old summary", "description": "Old description"}
+        )
+        assert os.stat(note).st_mtime_ns == 0
+
+    @pytest.mark.p1
+    @pytest.mark.unit
+    def test_frontmatter_fields(self, note):
+        fields = {"tags": '["new"]', "transcript_format": "timestamped"}
+        assert patch_note(str(note), {}, fields=fields)
+        patched = read(note)
+        assert patched["tags"] == ["new"]
+        assert patched["transcript_format"] == "timestamped"
+        assert patched["summary"] == "Old summary"
+        assert not patch_note(str(note), {}, fields=fields)
+
+    @pytest.mark.p1
+    @pytest.mark.unit
+    def test_missing_section_is_inserted_in_order(self, note):
+        assert patch_note(str(note), {"related": "- [[Other]]"})
+        content = note.read_text(encoding="utf-8")
+        assert "My notes\n\n## Related\n- [[Other]]\n\n## Description\n" in content
+        assert read(note)["related"] == "- [[Other]]"
+
+    @pytest.mark.p2
+    @pytest.mark.unit
+    def test_transcript_is_not_patchable(self, note):
+        with pytest.raises(ValueError, match="transcript"):
+            patch_note(str(note), {"transcript": "x"})
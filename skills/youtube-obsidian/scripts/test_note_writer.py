@@ -0,0 +1,142 @@
+#!/usr/bin/env python3
+"""
+Tests for the crash-safe note writer in note_writer.py.
+"""
+
+import os
+
+import note_writer
+import pytest
+from note_writer import NoteWriter, file_digest, write_atomic
+from vault_index import VaultIndex
+
+
+class TestWriteAtomic:
+    """Tests for temp file + rename writes (P1)."""
+
+    @pytest.mark.p1
+    @pytest.mark.unit
+    def test_writes_chunks(self, tmp_path):
+        path = tmp_path / "note.md"
+        write_atomic(str(path), ["---\n", "title: x\n", "---\n"])
+        assert path.read_text(encoding="utf-8") == "---\ntitle: x\n---\n"
+        assert os.listdir(tmp_path) == ["note.md"]
+
+    @pytest.mark.p1
+    @pytest.mark.unit
+    def test_failed_write_keeps_old_note(self, tmp_path):
+        path = tmp_path / "note.md"
+        path.write_text("old", encoding="utf-8")
+
+        def chunks():
+            yield "partial"
+            raise RuntimeError("killed")
+
+        with pytest.raises(RuntimeError):
+            write_atomic(str(path), chunks())
+        assert path.read_text(encoding="utf-8") == "old"
+        assert os.listdir(tmp_path) == ["note.md"]
+
+    @pytest.mark.p1
+    @pytest.mark.unit
+    def test_keeps_permissions(self, tmp_path):
+        path = tmp_path / "note.md"
+        path.write_text("old", encoding="utf-8")
+        os.chmod(path, 0o640)
+        write_atomic(str(path), ["new"], fsync=False)
+        assert os.stat(path).st_mode & 0o777 == 0o640
+
+    @pytest.mark.p1
+    @pytest.mark.unit
+    def test_same_content_is_not_rewritten(self, tmp_path):
+        path = tmp_path / "note.md"
+        path.write_text("same", encoding="utf-8")
+        os.utime(path, ns=(0, 0))
+        digest, written = write_atomic(
+            str(path), ["sa", "me"], fsync=False, old_digest=file_digest(str(path))
+        )
+        assert not written
+        assert digest == file_digest(str(path))
+        assert os.stat(path).st_mtime_ns == 0
+        assert os.listdir(tmp_path) == ["note.md"]
+
+
+class TestNoteWriter:
+    """Tests for batched fsyncs (P2)."""
+
+    @pytest.mark.p2
+    @pytest.mark.unit
+    def test_syncs_once_per_batch(self, tmp_path, mocker):
+        fsync = mocker.spy(note_writer, "_fsync_path")
+        with NoteWriter(sync_every=3) as writer:
+            for number in range(4):
+                writer.write(str(tmp_path / f"{number}.md"), ["x"])
+            # Three notes plus their directory after the third write.
+            assert fsync.call_count == 4
+        # The fourth note and the directory again on close.
+        assert fsync.call_count == 6
+        assert sorted(os.listdir(tmp_path)) == ["0.md", "1.md", "2.md", "3.md"]
+
+    @pytest.mark.p1
+    @pytest.mark.unit
+    def test_batched_notes_are_synced_before_rename(self, tmp_path, mocker):
+        events = []
+        mocker.patch.object(
+            note_writer, "_fsync_path", side_effect=lambda path, *a: events.append(path)
+        )
+        replace = os.replace
+        mocker.patch.object(
+            note_writer.os,
+            "replace",
+            side_effect=lambda src, dst: (events.append(dst), replace(src, dst)),
+        )
+        synced = []
+        with NoteWriter(sync_every=2) as writer:
+            writer.write(str(tmp_path / "a.md"), ["a"])
+            writer.when_synced(lambda: synced.append("a"))
+            assert not (tmp_path / "a.md").exists()
+            assert synced == []
+            writer.write(str(tmp_path / "b.md"), ["b"])
+        assert synced == ["a"]
+        # Both temp files, then both renames, then the directory once.
+        assert [os.path.basename(e)[:3] for e in events] == [
+            ".a.",
+            ".b.",
+            "a.m",
+            "b.m",
+            os.path.basename(str(tmp_path))[:3],
+        ]
+        assert sorted(os.listdir(tmp_path)) == ["a.md", "b.md"]
+
+    @pytest.mark.p2
+    @pytest.mark.unit
+    def test_sync_disabled(self, tmp_path, mocker):
+        fsync = mocker.spy(os, "fsync")
+        with NoteWriter(sync_every=0) as writer:
+            writer.write(str(tmp_path / "a.md"), ["x"])
+        assert fsync.call_count == 0
+
+    @pytest.mark.p2
+    @pytest.mark.unit
+    def test_index_avoids_reading_unchanged_notes(self, tmp_path, mocker):
+        path = str(tmp_path / "note.md")
+        with VaultIndex(str(tmp_path / "vault.sqlite")) as index:
+            writer = NoteWriter(0, index, str(tmp_path))
+            assert writer.write(path, ["text"])
+            read = mocker.spy(note_writer, "file_digest")
+            assert not writer.write(path, ["text"])
+            assert read.call_count == 0
+            assert writer.write(path, ["new text"])
+            assert index.file_digest("note.md", os.stat(path)) == file_digest(path)
+
+    @pytest.mark.p2
+    @pytest.mark.unit
+    def test_edited_note_is_read_back(self, tmp_path):
+        path = tmp_path / "note.md"
+        with VaultIndex(str(tmp_path / "vault.sqlite")) as index:
+            writer = NoteWriter(0, index, str(tmp_path))
+            writer.write(str(path), ["text"])
+            path.write_text("edited by hand", encoding="utf-8")
+            assert not writer.write(str(path), ["edited by hand"])
+            assert writer.write(str(path), ["text"])
+        assert path.read_text(encoding="utf-8") == "text"
@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+"""
+Tests for the related-notes TF-IDF index in related.py.
+"""
+
+import pytest
+import related
+from related import RelatedIndex, term_counts
+
+
+@pytest.fixture
+def index(tmp_path):
+    with RelatedIndex(str(tmp_path / "state" / "related.sqlite")) as index:
+        index.add("rust1", "Rust Ownership", term_counts("rust borrow checker"))
+        index.add("rust2", "Rust Lifetimes", term_counts("rust lifetimes borrow"))
+        index.add("cook1", "Pasta Night", term_counts("pasta tomato basil"))
+        yield index
+
+
+class TestTermCounts:
+    """Tests for term extraction (P1)."""
+
+    @pytest.mark.p1
+    @pytest.mark.unit
+    def test_stopwords_and_short_words_dropped(self):
+        assert term_counts("The Rust of it is rust") == {"rust": 2}
+
+    @pytest.mark.p2
+    @pytest.mark.unit
+    def test_tags_are_weighted_terms(self):
+        counts = term_counts("", ["Rust"])
+        assert counts == {"#rust": related.TAG_WEIGHT}
+
+
+class TestRelatedIndex:
+    """Tests for incremental indexing and top-k lookup (P1)."""
+
+    @pytest.mark.p1
+    @pytest.mark.unit
+    def test_ranks_by_shared_terms(self, index):
+        results = index.related(term_counts("borrow checker in rust"))
+        assert [video_id for _, video_id, _ in results] == ["rust1", "rust2"]
+        assert results[0][2] == "Rust Ownership"
+        assert results[0][0] > results[1][0]
+
+    @pytest.mark.p1
+    @pytest.mark.unit
+    def test_k_and_exclude(self, index):
+        results = index.related(term_counts("rust borrow"), k=1, exclude="rust1")
+        assert [video_id for _, video_id, _ in results] == ["rust2"]
+        assert index.related(term_counts("rust"), k=0) == []
+
+    @pytest.mark.p1
+    @pytest.mark.unit
+    def test_no_shared_terms(self, index):
+        assert index.related(term_counts("gardening")) == []
+
+    @pytest.mark.p2
+    @pytest.mark.unit
+    def test_reindexing_replaces_postings(self, index):
+        index.add("cook1", "Pasta Night", term_counts("rust borrow checker"))
+        assert len(index) == 3
+        results = index.related(term_counts("tomato"))
+        assert results == []
+
+    @pytest.mark.p2
+    @pytest.mark.unit
+    def test_common_terms_are_skipped(self, index, monkeypatch):
+        monkeypatch.setattr(related, "MIN_DF_CUTOFF", 1)
+        assert index.related(term_counts("rust")) == []
+
+    @pytest.mark.p2
+    @pytest.mark.unit
+    def test_vectors_are_capped_and_normalized(self, index, monkeypatch):
+        monkeypatch.setattr(related, "MAX_DOC_TERMS", 2)
+        vector = index.vector(term_counts("alpha beta gamma delta"))
+        assert len(vector) == 2
+        assert sum(w * w for w in vector.values()) == pytest.approx(1.0)
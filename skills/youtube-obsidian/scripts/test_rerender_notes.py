@@ -0,0 +1,290 @@
+#!/usr/bin/env python3
+"""
+Tests for the vault-wide re-render job in rerender_notes.py.
+"""
+
+import json
+import os
+
+import get_youtube_data
+import pytest
+import rerender_notes
+from get_youtube_data import STATE_DIR, create_obsidian_note, iter_note_files
+from note_writer import file_digest
+from rerender_notes import main, rerender_note, rerender_vault
+from tag_index import TagIndex
+from test_helpers import create_mock_transcript_list, create_video_metadata
+from transcript import Transcript
+from vault_index import VaultIndex
+from video_store import VideoStore
+
+
+def write_note(vault, name, title="Test Video", transcript="Python transcript"):
+    metadata = create_video_metadata(title=title, tags=["yt"])
+    content, _ = create_obsidian_note(
+        "test123", "https://youtube.com/watch?v=test123", metadata, transcript, "S"
+    )
+    path = os.path.join(vault, f"{name}.md")
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(content)
+    return path
+
+
+class TestRerenderNote:
+    """Tests for re-rendering a single note (P1)."""
+
+    @pytest.mark.p1
+    @pytest.mark.unit
+    def test_current_note_is_unchanged(self, tmp_path):
+        path = write_note(str(tmp_path), "note")
+        mtime = os.stat(path).st_mtime_ns
+        assert rerender_note(path, str(tmp_path)) == "unchanged"
+        assert os.stat(path).st_mtime_ns == mtime
+
+    @pytest.mark.p1
+    @pytest.mark.unit
+    def test_new_vocabulary_updates_tags(self, tmp_path, monkeypatch):
+        path = write_note(str(tmp_path), "note", transcript="all about zig")
+        monkeypatch.setattr(get_youtube_data, "COMMON_TECH_TERMS", ["zig"])
+
+        assert rerender_note(path, str(tmp_path)) == "updated"
+        with open(path, encoding="utf-8") as f:
+            note = get_youtube_data.parse_obsidian_note(f.read())
+        assert "zig" in note["tags"]
+        assert "yt" in note["tags"]
+        assert note["transcript"] == "all about zig"
+
+    @pytest.mark.p1
+    @pytest.mark.unit
+    def test_rewrite_is_streamed_and_indexed(self, tmp_path, monkeypatch, mocker):
+        path = write_note(str(tmp_path), "note", transcript="all about zig")
+        monkeypatch.setattr(get_youtube_data, "COMMON_TECH_TERMS", ["zig"])
+        write = mocker.spy(rerender_notes.NoteWriter, "write")
+
+        assert rerender_note(path, str(tmp_path)) == "updated"
+        assert not isinstance(write.call_args.args[2], str)
+        with VaultIndex(get_youtube_data.vault_index_path(str(tmp_path))) as index:
+            assert index.file_digest("note.md", os.stat(path)) == file_digest(path)
+
+    @pytest.mark.p1
+    @pytest.mark.unit
+    def test_related_links_are_kept(self, tmp_path):
+        metadata = create_video_metadata(title="Test Video", tags=["yt"])
+        metadata["related"] = ["Other Talk"]
+        content, _ = create_obsidian_note("test123", "url", metadata, "Words", "S")
+        path = tmp_path / "note.md"
+        path.write_text(content, encoding="utf-8")
+
+        assert rerender_note(str(path), str(tmp_path)) == "unchanged"
+
+    @pytest.mark.p1
+    @pytest.mark.unit
+    def test_stored_metadata_wins(self, tmp_path):
+        path = write_note(str(tmp_path), "note")
+        metadata = create_video_metadata(
+            title="Test Video", description="Fresh description", tags=["yt"]
+        )
+        with VideoStore(get_youtube_data.video_store_path(str(tmp_path))) as store:
+            store.put_metadata("test123", "url", metadata)
+
+        assert rerender_note(path, str(tmp_path)) == "updated"
+        with open(path, encoding="utf-8") as f:
+            note = get_youtube_data.parse_obsidian_note(f.read())
+        assert note["description"] == "Fresh description"
+        assert note["summary"] == "S"
+
+    @pytest.mark.p1
+    @pytest.mark.unit
+    def test_timestamped_note_uses_archive(self, tmp_path, monkeypatch):
+        vault = str(tmp_path)
+        transcript = Transcript.from_entries(
+            create_mock_transcript_list(["all about", "zig"], starts=[0.0, 90.0])
+        )
+        with get_youtube_data.transcript_archive(vault) as archive:
+            archive.put("test123", transcript)
+        content, _ = create_obsidian_note(
+            "test123",
+            "https://youtube.com/watch?v=test123",
+            create_video_metadata(),
+            transcript,
+            "S",
+            timestamps=True,
+        )
+        path = tmp_path / "note.md"
+        path.write_text(content, encoding="utf-8")
+        monkeypatch.setattr(get_youtube_data, "COMMON_TECH_TERMS", ["zig"])
+
+        assert rerender_note(str(path), vault) == "updated"
+        note = path.read_text(encoding="utf-8")
+        assert '"zig"' in note
+        assert "[01:30](https://www.youtube.com/watch?v=test123&t=90s) zig" in note
+
+    @pytest.mark.p1
+    @pytest.mark.unit
+    def test_split_note_is_rerendered_with_parts(self, tmp_path, monkeypatch):
+        monkeypatch.setattr(get_youtube_data, "TRANSCRIPT_CHUNK_SIZE", 16)
+        vault = str(tmp_path)
+        transcript = Transcript.from_entries(
+            create_mock_transcript_list([f"word{i}" for i in range(50)])
+        )
+        with get_youtube_data.transcript_archive(vault) as archive:
+            archive.put("test123", transcript)
+        for name, chunks in iter_note_files(
+            "note",
+            "test123",
+            "url",
+            create_video_metadata(),
+            transcript,
+            "S",
+            max_size=100,
+        ):
+            (tmp_path / f"{name}.md").write_text("".join(chunks), encoding="utf-8")
+        assert (tmp_path / "note (Transcript 2).md").exists()
+
+        path = str(tmp_path / "note.md")
+        assert rerender_note(path, vault, max_size=100) == "unchanged"
+        assert rerender_note(str(tmp_path / "note (Transcript 1).md"), vault) == (
+            "ignored"
+        )
+
+        # A larger budget needs fewer parts; the stale ones are removed.
+        assert rerender_note(path, vault, max_size=10_000) == "updated"
+        assert not (tmp_path / "note (Transcript 1).md").exists()
+        assert not (tmp_path / "note (Transcript 2).md").exists()
+        note = get_youtube_data.parse_obsidian_note((tmp_path / "note.md").read_text())
+        assert note["transcript"] == transcript.text
+
+    @pytest.mark.p2
+    @pytest.mark.unit
+    def test_timestamped_note_without_transcript_fails(self, tmp_path):
+        transcript = Transcript.from_entries(create_mock_transcript_list(["hi"]))
+        content, _ = create_obsidian_note(
+            "test123", "url", create_video_metadata(), transcript, "S", timestamps=True
+        )
+        path = tmp_path / "note.md"
+        path.write_text(content, encoding="utf-8")
+
+        assert rerender_note(str(path), str(tmp_path)) == (
+            "failed: No stored transcript for a timestamped/split note"
+        )
+
+    @pytest.mark.p2
+    @pytest.mark.unit
+    def test_non_youtube_notes_are_ignored(self, tmp_path):
+        plain = tmp_path / "plain.md"
+        plain.write_text("# Shopping list\n")
+        other = tmp_path / "other.md"
+        other.write_text("---\ntitle: Other\n---\n\nbody\n")
+        assert rerender_note(str(plain), str(tmp_path)) == "ignored"
+        assert rerender_note(str(other), str(tmp_path)) == "ignored"
+
+    @pytest.mark.p2
+    @pytest.mark.unit
+    def test_unreadable_note_fails(self, tmp_path):
+        assert rerender_note(str(tmp_path / "missing.md"), str(tmp_path)).startswith(
+            "failed: "
+        )
+
+
+class TestRerenderVault:
+    """Tests for the vault-wide job and its manifest (P1)."""
+
+    @pytest.mark.p1
+    @pytest.mark.unit
+    def test_second_run_skips_checked_notes(self, tmp_path):
+        vault = str(tmp_path)
+        write_note(vault, "a")
+        write_note(vault, "b")
+        (tmp_path / "plain.md").write_text("no frontmatter\n")
+        (tmp_path / "a (Transcript 1).md").write_text(
+            "---\nyoutube_id: test123\ntranscript_part: 1\n---\n\nwords\n"
+        )
+
+        first = rerender_vault(vault, workers=1)
+        assert first["unchanged"] == 2
+        assert first["ignored"] == 2
+
+        # Ignored files are skipped too until they change.
+        second = rerender_vault(vault, workers=1)
+        assert second["skipped"] == 4
+        assert second["unchanged"] == second["ignored"] == 0
+
+        manifest_path = tmp_path / STATE_DIR / "rerender.json"
+        assert set(json.loads(manifest_path.read_text())) == {
+            "a.md",
+            "b.md",
+            "plain.md",
+            "a (Transcript 1).md",
+        }
+
+    @pytest.mark.p1
+    @pytest.mark.unit
+    def test_hash_change_invalidates_manifest(self, tmp_path, monkeypatch):
+        vault = str(tmp_path)
+        write_note(vault, "a", transcript="all about zig")
+        rerender_vault(vault, workers=1)
+
+        monkeypatch.setattr(get_youtube_data, "COMMON_TECH_TERMS", ["zig"])
+        counts = rerender_vault(vault, workers=1)
+        assert counts["updated"] == 1
+        assert counts["skipped"] == 0
+
+    @pytest.mark.p2
+    @pytest.mark.unit
+    def test_force_ignores_manifest(self, tmp_path):
+        vault = str(tmp_path)
+        write_note(vault, "a")
+        rerender_vault(vault, workers=1)
+        assert rerender_vault(vault, workers=1, force=True)["unchanged"] == 1
+
+    @pytest.mark.p2
+    @pytest.mark.slow
+    def test_process_pool(self, tmp_path):
+        vault = str(tmp_path)
+        for i in range(3):
+            write_note(vault, f"note{i}")
+        assert rerender_vault(vault, workers=2)["unchanged"] == 3
+
+    @pytest.mark.p1
+    @pytest.mark.unit
+    def test_updated_notes_are_reindexed(self, tmp_path, monkeypatch):
+        write_note(str(tmp_path), "note", transcript="all about zig")
+        monkeypatch.setattr(get_youtube_data, "COMMON_TECH_TERMS", ["zig"])
+
+        rerender_vault(str(tmp_path), workers=1)
+        with TagIndex(get_youtube_data.tag_index_path(str(tmp_path))) as index:
+            assert index.notes_with(["zig", "yt"]) == [("note", "test123")]
+
+
+class TestMain:
+    """Tests for the command line entry point (P2)."""
+
+    @pytest.mark.p2
+    @pytest.mark.unit
+    def test_main_reports_counts(self, tmp_path, mocker, capsys):
+        write_note(str(tmp_path), "a")
+        mocker.patch("sys.argv", ["rerender_notes.py", str(tmp_path), "--workers", "1"])
+        main()
+        assert "1 unchanged" in capsys.readouterr().out
+
+    @pytest.mark.p2
+    @pytest.mark.unit
+    def test_main_compacts_transcript_archive(self, tmp_path, mocker, capsys):
+        with get_youtube_data.transcript_archive(str(tmp_path)) as archive:
+            archive.put("test123", Transcript("refetched transcript"))
+            archive.put("test123", Transcript("refetched"))
+        mocker.patch("sys.argv", ["rerender_notes.py", str(tmp_path), "--workers", "1"])
+        main()
+        assert "Compacted the transcript archive" in capsys.readouterr().out
+        with get_youtube_data.transcript_archive(str(tmp_path)) as archive:
+            assert archive.get("test123").text == "refetched"
+            assert archive.compact() == 0
+
+    @pytest.mark.p2
+    @pytest.mark.unit
+    def test_main_missing_vault(self, tmp_path, mocker, capsys):
+        mocker.patch("sys.argv", ["rerender_notes.py", str(tmp_path / "nope")])
+        with pytest.raises(SystemExit) as exc_info:
+            main()
+        assert exc_info.value.code == 1
+        assert "vault path does not exist" in capsys.readouterr().out
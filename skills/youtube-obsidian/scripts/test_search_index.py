@@ -0,0 +1,235 @@
+#!/usr/bin/env python3
+"""
+Tests for the full-text search index in search_index.py and search_notes.py.
+"""
+
+import os
+
+import pytest
+from get_youtube_data import (
+    create_obsidian_note,
+    search_index_path,
+    transcript_archive,
+)
+from search_index import SearchIndex
+from search_notes import main, read_note, rebuild_index
+from test_helpers import create_mock_transcript_list, create_video_metadata
+from transcript import Transcript
+
+
+@pytest.fixture
+def index(tmp_path):
+    with SearchIndex(search_index_path(str(tmp_path))) as index:
+        index.add("k8s", "K8s.md", "Kubernetes Basics", "Pods", "deploy with helm")
+        index.add("cook", "Pasta.md", "Pasta Night", "Dinner", "boil water for pasta")
+        yield index
+
+
+def write_note(vault, name, video_id, title, transcript):
+    content, _ = create_obsidian_note(
+        video_id, "url", create_video_metadata(title=title), transcript, ""
+    )
+    with open(os.path.join(vault, f"{name}.md"), "w", encoding="utf-8") as f:
+        f.write(content)
+
+
+class TestSearchIndex:
+    """Tests for indexing and ranked search (P1)."""
+
+    @pytest.mark.p1
+    @pytest.mark.unit
+    def test_returns_paths_and_snippets(self, index):
+        assert index.search("helm") == [
+            ("K8s.md", "Kubernetes Basics", "deploy with **helm**")
+        ]
+
+    @pytest.mark.p1
+    @pytest.mark.unit
+    def test_title_outranks_transcript(self, index):
+        index.add("boil", "Boil.md", "Boiling", "", "how long to boil")
+        results = index.search("boil*")
+        assert [path for path, _, _ in results] == ["Boil.md", "Pasta.md"]
+
+    @pytest.mark.p1
+    @pytest.mark.unit
+    def test_reindex_replaces_row(self, index):
+        index.add("k8s", "Moved/K8s.md", "Kubernetes Basics", "Pods", "no charts")
+        assert len(index) == 2
+        assert index.search("helm") == []
+        assert index.search("charts")[0][0] == "Moved/K8s.md"
+
+    @pytest.mark.p2
+    @pytest.mark.unit
+    def test_phrase_and_column_queries(self, index):
+        assert index.search('"boil water"')[0][0] == "Pasta.md"
+        assert index.search("title:pods") == []
+        assert index.search("description:pods")[0][0] == "K8s.md"
+
+    @pytest.mark.p2
+    @pytest.mark.unit
+    def test_remove(self, index):
+        index.remove("cook")
+        assert index.search("pasta") == []
+        assert len(index) == 1
+
+    @pytest.mark.p2
+    @pytest.mark.unit
+    def test_malformed_query(self, index):
+        with pytest.raises(ValueError, match="Invalid search query"):
+            index.search("AND (")
+
+
+class TestSegmentSearch:
+    """Tests for timed transcript window search (P1)."""
+
+    @pytest.fixture
+    def transcript(self):
+        return Transcript.from_entries(
+            create_mock_transcript_list(
+                ["welcome back", "the service mesh", "is great", "bye now"],
+                starts=[0.0, 40.0, 41.5, 95.0],
+            )
+        )
+
+    @pytest.mark.p1
+    @pytest.mark.unit
+    def test_phrase_hit_has_window_start(self, index, transcript):
+        index.add("mesh", "Mesh.md", "Mesh", "", transcript)
+        assert index.search_segments('"service mesh is great"') == [
+            ("mesh", "Mesh.md", 40.0, "the **service mesh is great**")
+        ]
+        assert index.search_segments("bye")[0][2] == 95.0
+
+    @pytest.mark.p1
+    @pytest.mark.unit
+    def test_plain_text_transcripts_have_no_windows(self, index):
+        assert index.search_segments("helm") == []
+
+    @pytest.mark.p2
+    @pytest.mark.unit
+    def test_reindex_and_remove_replace_windows(self, index, transcript):
+        index.add("mesh", "Mesh.md", "Mesh", "", transcript)
+        index.add("mesh", "Mesh.md", "Mesh", "", "plain text only")
+        assert index.search_segments("bye") == []
+
+        index.add("mesh", "Mesh.md", "Mesh", "", transcript)
+        index.remove("mesh")
+        assert index.search_segments("welcome") == []
+
+    @pytest.mark.p2
+    @pytest.mark.unit
+    def test_transcript_text_stored_once(self, index, transcript):
+        index.add("mesh", "Mesh.md", "Mesh", "", transcript)
+        index.add("mesh", "Mesh.md", "Mesh", "", transcript)
+        index.add("k8s", "K8s.md", "Kubernetes Basics", "Pods", "no charts")
+        connection = index.connection
+        tables = {
+            name
+            for (name,) in connection.execute(
+                "SELECT name FROM sqlite_master WHERE type = 'table'"
+            )
+        }
+        assert "documents_content" not in tables
+        assert "segments_content" not in tables
+        # FTS5 checks its index against the content views.
+        for table in ("documents", "segments"):
+            connection.execute(
+                f"INSERT INTO {table} ({table}) VALUES ('integrity-check')"
+            )
+        assert index.search_segments("bye") == [
+            ("mesh", "Mesh.md", 95.0, "**bye** now")
+        ]
+
+
+class TestRebuild:
+    """Tests for rebuilding the index from the vault (P1)."""
+
+    @pytest.mark.p1
+    @pytest.mark.unit
+    def test_rebuild_indexes_youtube_notes(self, tmp_path):
+        vault = str(tmp_path)
+        write_note(vault, "a", "vid00000001", "First Video", "talk about rust")
+        write_note(vault, "b", "vid00000002", "Second Video", "talk about go")
+        (tmp_path / "personal.md").write_text("# Not a YouTube note\n")
+
+        assert rebuild_index(vault, workers=1) == 2
+        with SearchIndex(search_index_path(vault)) as index:
+            assert [path for path, _, _ in index.search("rust")] == ["a.md"]
+
+    @pytest.mark.p2
+    @pytest.mark.unit
+    def test_archive_preferred_over_note_body(self, tmp_path):
+        vault = str(tmp_path)
+        write_note(vault, "a", "vid00000001", "First Video", "stale text")
+        with transcript_archive(vault) as archive:
+            archive.put(
+                "vid00000001",
+                Transcript.from_entries(create_mock_transcript_list(["fresh words"])),
+            )
+        document = read_note(str(tmp_path / "a.md"), vault)
+        assert document[:2] == ("vid00000001", "a.md")
+        assert str(document[4]) == "fresh words"
+
+    @pytest.mark.p2
+    @pytest.mark.slow
+    def test_rebuild_with_process_pool(self, tmp_path):
+        vault = str(tmp_path)
+        for i in range(3):
+            write_note(vault, f"n{i}", f"vid0000000{i}", f"Video {i}", "shared")
+        assert rebuild_index(vault, workers=2) == 3
+
+
+class TestMain:
+    """Tests for the search_notes command line (P2)."""
+
+    @pytest.mark.p2
+    @pytest.mark.unit
+    def test_search_prints_paths_and_snippets(self, index, tmp_path, mocker, capsys):
+        mocker.patch("sys.argv", ["search_notes.py", "--vault", str(tmp_path), "helm"])
+        main()
+        assert capsys.readouterr().out == "K8s.md\n    deploy with **helm**\n"
+
+    @pytest.mark.p2
+    @pytest.mark.unit
+    def test_rebuild_then_search(self, tmp_path, mocker, capsys):
+        write_note(str(tmp_path), "a", "vid00000001", "First Video", "about rust")
+        mocker.patch(
+            "sys.argv",
+            [
+                "search_notes.py",
+                "--vault",
+                str(tmp_path),
+                "--rebuild",
+                "--workers",
+                "1",
+            ],
+        )
+        main()
+        assert "Indexed 1 notes" in capsys.readouterr().out
+
+    @pytest.mark.p2
+    @pytest.mark.unit
+    def test_segment_search_prints_deep_links(self, tmp_path, mocker, capsys):
+        transcript = Transcript.from_entries(
+            create_mock_transcript_list(["intro", "deep dive"], starts=[0.0, 75.0])
+        )
+        with SearchIndex(search_index_path(str(tmp_path))) as index:
+            index.add("vid00000001", "A.md", "A", "", transcript)
+        mocker.patch(
+            "sys.argv",
+            ["search_notes.py", "--vault", str(tmp_path), "--segments", "dive"],
+        )
+        main()
+        assert capsys.readouterr().out == (
+            "A.md [01:15] https://www.youtube.com/watch?v=vid00000001&t=75s\n"
+            "    deep **dive**\n"
+        )
+
+    @pytest.mark.p2
+    @pytest.mark.unit
+    def test_bad_query_exits(self, index, tmp_path, mocker, capsys):
+        mocker.patch("sys.argv", ["search_notes.py", "--vault", str(tmp_path), "OR"])
+        with pytest.raises(SystemExit) as exc_info:
+            main()
+        assert exc_info.value.code == 1
+        assert "Invalid search query" in capsys.readouterr().out
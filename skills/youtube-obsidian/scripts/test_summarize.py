@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+"""
+Tests for the extractive transcript summaries in summarize.py.
+"""
+
+import random
+import time
+
+import pytest
+import summarize
+from summarize import format_summary, split_sentences
+
+np = pytest.importorskip("numpy")
+
+
+class TestSplitSentences:
+    """Tests for sentence splitting (P1)."""
+
+    @pytest.mark.p1
+    @pytest.mark.unit
+    def test_splits_on_punctuation(self):
+        assert split_sentences("One two. Three four! Five?") == [
+            "One two.",
+            "Three four!",
+            "Five?",
+        ]
+
+    @pytest.mark.p1
+    @pytest.mark.unit
+    def test_unpunctuated_text_uses_word_windows(self):
+        text = " ".join(f"w{i}" for i in range(80))
+        windows = split_sentences(text)
+        assert [len(w.split()) for w in windows] == [25, 25, 25, 5]
+
+    @pytest.mark.p2
+    @pytest.mark.unit
+    def test_empty_text(self):
+        assert split_sentences("") == []
+
+
+class TestSummarize:
+    """Tests for TextRank sentence selection (P1)."""
+
+    TEXT = (
+        "The cat sat. The dog ran. Cats and dogs play. Birds fly high. "
+        "The cat and dog sleep. Fish swim."
+    )
+
+    @pytest.mark.p1
+    @pytest.mark.unit
+    def test_returns_central_sentences_in_order(self):
+        assert summarize.summarize(self.TEXT, 2) == [
+            "The cat sat.",
+            "The cat and dog sleep.",
+        ]
+
+    @pytest.mark.p1
+    @pytest.mark.unit
+    def test_short_text_returned_whole(self):
+        assert summarize.summarize("Only one sentence.") == ["Only one sentence."]
+
+    @pytest.mark.p1
+    @pytest.mark.unit
+    def test_missing_numpy(self, monkeypatch):
+        monkeypatch.setattr(summarize, "np", None)
+        with pytest.raises(ImportError, match="pip install numpy"):
+            summarize.summarize(self.TEXT)
+
+    @pytest.mark.p2
+    @pytest.mark.unit
+    def test_long_transcript_is_bounded(self, monkeypatch):
+        """A two-hour caption dump is summarized quickly (P2)."""
+        rnd = random.Random(0)
+        vocabulary = [f"term{i}" for i in range(3000)]
+        text = " ".join(rnd.choice(vocabulary) for _ in range(20000))
+
+        started = time.perf_counter()
+        sentences = summarize.summarize(text)
+        assert time.perf_counter() - started < 2.0
+        assert len(sentences) == 5
+        assert all(len(s.split()) == summarize.WINDOW_WORDS for s in sentences)
+
+    @pytest.mark.p2
+    @pytest.mark.unit
+    def test_sentence_cap_merges_neighbours(self, monkeypatch):
+        monkeypatch.setattr(summarize, "MAX_SENTENCES", 3)
+        text = "A b. C d. E f. G h. I j. K l."
+        assert summarize.summarize(text, 3) == ["A b. C d.", "E f. G h.", "I j. K l."]
+
+
+class TestFormatSummary:
+    """Tests for markdown rendering (P2)."""
+
+    @pytest.mark.p2
+    @pytest.mark.unit
+    def test_bullets(self):
+        assert format_summary(["One.", "Two."]) == "- One.\n- Two."
@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""
+Tests for the tag index in tag_index.py and its query CLI.
+"""
+
+import pytest
+from get_youtube_data import tag_index_path
+from query_tags import main
+from tag_index import TagIndex
+
+
+@pytest.fixture
+def index(tmp_path):
+    with TagIndex(tag_index_path(str(tmp_path))) as index:
+        index.set_tags("k8s1", "Kubernetes Basics", ["kubernetes", "docker", "devops"])
+        index.set_tags("k8s2", "Helm Charts", ["kubernetes", "helm", "devops"])
+        index.set_tags("dock", "Docker Compose", ["docker", "devops"])
+        yield index
+
+
+class TestTagIndex:
+    """Tests for tag postings and co-occurrence (P1)."""
+
+    @pytest.mark.p1
+    @pytest.mark.unit
+    def test_and_query(self, index):
+        assert index.notes_with(["kubernetes", "docker"]) == [
+            ("Kubernetes Basics", "k8s1")
+        ]
+        assert index.notes_with(["devops"]) == [
+            ("Docker Compose", "dock"),
+            ("Helm Charts", "k8s2"),
+            ("Kubernetes Basics", "k8s1"),
+        ]
+        assert index.notes_with(["kubernetes", "missing"]) == []
+        assert index.notes_with([]) == []
+
+    @pytest.mark.p1
+    @pytest.mark.unit
+    def test_suggestions_from_cooccurrence(self, index):
+        assert index.suggest(["kubernetes"]) == [
+            ("devops", 2),
+            ("docker", 1),
+            ("helm", 1),
+        ]
+        assert index.suggest(["kubernetes"], k=1) == [("devops", 2)]
+
+    @pytest.mark.p1
+    @pytest.mark.unit
+    def test_retagging_applies_difference(self, index):
+        index.set_tags("k8s1", "Kubernetes Basics", ["kubernetes", "devops"])
+
+        assert index.tags_of("k8s1") == {"kubernetes", "devops"}
+        assert index.notes_with(["kubernetes", "docker"]) == []
+        assert index.suggest(["kubernetes"]) == [("devops", 2), ("helm", 1)]
+        assert index.tag_counts(["docker", "kubernetes"]) == {
+            "docker": 1,
+            "kubernetes": 2,
+        }
+
+    @pytest.mark.p2
+    @pytest.mark.unit
+    def test_remove(self, index):
+        index.remove("dock")
+        assert index.notes_with(["docker"]) == [("Kubernetes Basics", "k8s1")]
+        assert index.tag_counts()["devops"] == 2
+        assert ("docker", 1) in index.suggest(["devops"])
+
+
+class TestMain:
+    """Tests for the query_tags command line (P2)."""
+
+    @pytest.mark.p2
+    @pytest.mark.unit
+    def test_lists_matching_notes(self, index, tmp_path, mocker, capsys):
+        mocker.patch(
+            "sys.argv", ["query_tags.py", "--vault", str(tmp_path), "docker", "devops"]
+        )
+        main()
+        assert capsys.readouterr().out == (
+            "[[Docker Compose]] (dock)\n[[Kubernetes Basics]] (k8s1)\n"
+        )
+
+    @pytest.mark.p2
+    @pytest.mark.unit
+    def test_suggest_and_counts(self, index, tmp_path, mocker, capsys):
+        mocker.patch(
+            "sys.argv",
+            ["query_tags.py", "--vault", str(tmp_path), "--suggest", "helm"],
+        )
+        main()
+        mocker.patch(
+            "sys.argv", ["query_tags.py", "--vault", str(tmp_path), "--counts"]
+        )
+        main()
+        output = capsys.readouterr().out
+        assert output.startswith("devops (1)\nkubernetes (1)\n")
+        assert "     3  devops\n" in output
+
+    @pytest.mark.p2
+    @pytest.mark.unit
+    def test_missing_index(self, tmp_path, mocker, capsys):
+        mocker.patch("sys.argv", ["query_tags.py", "--vault", str(tmp_path), "x"])
+        with pytest.raises(SystemExit) as exc_info:
+            main()
+        assert exc_info.value.code == 1
+        assert "no tag index" in capsys.readouterr().out
@@ -0,0 +1,238 @@
+#!/usr/bin/env python3
+"""
+Tests for the compact Transcript representation in transcript.py.
+"""
+
+import sys
+
+import pytest
+from test_helpers import create_mock_transcript_list
+from transcript import Segment, Transcript, clean_segments, format_timestamp
+
+
+@pytest.fixture
+def transcript():
+    return Transcript.from_entries(
+        create_mock_transcript_list(
+            ["Hello", "World", "日本語 🎉"],
+            starts=[0.0, 1.5, 4.0],
+            durations=[1.5, 2.5, 1.0],
+        )
+    )
+
+
+class TestTranscriptSegments:
+    """Tests for segment access (P1)."""
+
+    @pytest.mark.p1
+    @pytest.mark.unit
+    def test_text_is_space_joined(self, transcript):
+        assert transcript.text == "Hello World 日本語 🎉"
+        assert str(transcript) == transcript.text
+        assert len(transcript) == 3
+
+    @pytest.mark.p1
+    @pytest.mark.unit
+    def test_segments_are_sliced_from_text(self, transcript):
+        assert transcript[0] == Segment(0.0, 1.5, "Hello")
+        assert transcript[-1] == Segment(4.0, 1.0, "日本語 🎉")
+        assert [s.text for s in transcript] == ["Hello", "World", "日本語 🎉"]
+
+    @pytest.mark.p1
+    @pytest.mark.unit
+    def test_index_out_of_range(self, transcript):
+        with pytest.raises(IndexError):
+            transcript[3]
+        with pytest.raises(IndexError):
+            transcript.segment_text(-4)
+
+    @pytest.mark.p2
+    @pytest.mark.unit
+    def test_empty_transcript(self):
+        transcript = Transcript.from_entries([])
+        assert transcript.text == ""
+        assert len(transcript) == 0
+        assert list(transcript) == []
+        assert transcript.index_at(10.0) == -1
+
+
+class TestTranscriptTimestampLookup:
+    """Tests for index_at (P1)."""
+
+    @pytest.mark.p1
+    @pytest.mark.unit
+    @pytest.mark.parametrize(
+        "seconds,expected", [(-1.0, -1), (0.0, 0), (1.4, 0), (1.5, 1), (99.0, 2)]
+    )
+    def test_index_at(self, transcript, seconds, expected):
+        assert transcript.index_at(seconds) == expected
+
+
+class TestTranscriptParagraphs:
+    """Tests for paragraph grouping (P1)."""
+
+    @pytest.mark.p1
+    @pytest.mark.unit
+    def test_breaks_on_pause(self, transcript):
+        # "World" ends at 4.0 and the next segment starts at 4.0: no pause.
+        paragraphs = list(transcript.paragraphs(max_seconds=60, pause_seconds=0.5))
+        assert paragraphs == [(0.0, "Hello World 日本語 🎉")]
+
+        entries = create_mock_transcript_list(
+            ["a", "b", "c"], starts=[0.0, 1.0, 10.0], durations=[1.0, 1.0, 1.0]
+        )
+        paragraphs = list(Transcript.from_entries(entries).paragraphs(60, 2.0))
+        assert paragraphs == [(0.0, "a b"), (10.0, "c")]
+
+    @pytest.mark.p1
+    @pytest.mark.unit
+    def test_breaks_on_window(self):
+        entries = create_mock_transcript_list(
+            [f"s{i}" for i in range(5)], starts=[0.0, 20.0, 40.0, 60.0, 80.0]
+        )
+        paragraphs = list(Transcript.from_entries(entries).paragraphs(50, 100))
+        assert paragraphs == [(0.0, "s0 s1 s2"), (60.0, "s3 s4")]
+
+    @pytest.mark.p2
+    @pytest.mark.unit
+    def test_empty(self):
+        assert list(Transcript.from_entries([]).paragraphs()) == []
+
+    @pytest.mark.p2
+    @pytest.mark.unit
+    @pytest.mark.parametrize(
+        "seconds,expected",
+        [(0, "00:00"), (75.9, "01:15"), (3599, "59:59"), (3723, "1:02:03")],
+    )
+    def test_format_timestamp(self, seconds, expected):
+        assert format_timestamp(seconds) == expected
+
+
+class TestTranscriptSplitAt:
+    """Tests for chapter bucketing (P1)."""
+
+    @pytest.mark.p1
+    @pytest.mark.unit
+    def test_buckets_by_boundary(self):
+        entries = create_mock_transcript_list(
+            ["a", "b", "c", "d"], starts=[0.0, 5.0, 10.0, 30.0]
+        )
+        transcript = Transcript.from_entries(entries)
+        ranges = list(transcript.split_at([0, 10, 20, 30]))
+        assert ranges == [(0, 2), (2, 3), (3, 3), (3, 4)]
+        assert transcript.text_between(0, 2) == "a b"
+        assert transcript.text_between(3, 3) == ""
+
+    @pytest.mark.p1
+    @pytest.mark.unit
+    def test_paragraphs_within_range(self):
+        entries = create_mock_transcript_list(["a", "b", "c", "d"])
+        transcript = Transcript.from_entries(entries)
+        paragraphs = list(transcript.paragraphs(60, 5, first=1, stop=3))
+        assert paragraphs == [(1.0, "b c")]
+
+
+class TestCleanSegments:
+    """Tests for caption cleanup (P1)."""
+
+    @pytest.mark.p1
+    @pytest.mark.unit
+    def test_strips_noise_and_whitespace(self):
+        entries = create_mock_transcript_list(
+            [
+                "[Music]",
+                "  hello \n world [Applause] ",
+                "♪ la la ♪ (Laughter)",
+                "[ __ ]",
+            ]
+        )
+        assert list(clean_segments(entries)) == [
+            Segment(1.0, 1.0, "hello world"),
+            Segment(2.0, 1.0, "la la"),
+        ]
+
+    @pytest.mark.p1
+    @pytest.mark.unit
+    def test_merges_rolling_caption_overlap(self):
+        entries = create_mock_transcript_list(
+            [
+                "so today we are going",
+                "we are going to talk about",
+                "to talk about",
+                "To Talk About python",
+            ]
+        )
+        segments = list(clean_segments(entries, merge_overlaps=True))
+        assert [s.text for s in segments] == [
+            "so today we are going",
+            "to talk about",
+            "python",
+        ]
+        assert [s.start for s in segments] == [0.0, 1.0, 3.0]
+
+    @pytest.mark.p1
+    @pytest.mark.unit
+    def test_single_word_repeats_are_kept(self):
+        entries = create_mock_transcript_list(["no", "no no", "way"])
+        segments = list(clean_segments(entries, merge_overlaps=True))
+        assert [s.text for s in segments] == ["no", "no no", "way"]
+
+    @pytest.mark.p2
+    @pytest.mark.unit
+    def test_overlap_disabled_by_default(self):
+        entries = create_mock_transcript_list(["we are going", "we are going on"])
+        assert len(list(clean_segments(entries))) == 2
+
+    @pytest.mark.p2
+    @pytest.mark.unit
+    def test_rolling_captions_shrink(self):
+        words = [f"w{i}" for i in range(400)]
+        entries = create_mock_transcript_list(
+            [" ".join(words[max(0, i - 4) : i + 8]) for i in range(0, 400, 8)]
+        )
+        raw = Transcript.from_entries(entries)
+        cleaned = Transcript.from_entries(clean_segments(entries, merge_overlaps=True))
+        assert cleaned.text == " ".join(words)
+        assert len(cleaned.text) < 0.8 * len(raw.text)
+
+
+class TestTranscriptSidecar:
+    """Tests for binary (de)serialization (P1)."""
+
+    @pytest.mark.p1
+    @pytest.mark.unit
+    def test_round_trip(self, transcript):
+        loaded = Transcript.from_bytes(transcript.to_bytes())
+        assert loaded.text == transcript.text
+        assert list(loaded) == list(transcript)
+
+    @pytest.mark.p2
+    @pytest.mark.unit
+    def test_rejects_foreign_data(self):
+        with pytest.raises(ValueError, match="Not a transcript sidecar"):
+            Transcript.from_bytes(b"X" * 64)
+
+    @pytest.mark.p2
+    @pytest.mark.unit
+    def test_rejects_truncated_data(self, transcript):
+        data = transcript.to_bytes()
+        with pytest.raises(ValueError):
+            Transcript.from_bytes(data[:-2])
+        with pytest.raises(ValueError, match="Truncated"):
+            Transcript.from_bytes(data[:10])
+
+
+class TestTranscriptMemory:
+    """Tests for memory footprint (P2)."""
+
+    @pytest.mark.p2
+    @pytest.mark.unit
+    def test_smaller_than_segment_objects(self):
+        entries = create_mock_transcript_list([f"word {i}" for i in range(5000)])
+        transcript = Transcript.from_entries(entries)
+        segment_objects = [Segment(e.start, e.duration, e.text) for e in entries]
+        per_segment = sys.getsizeof(segment_objects) + sum(
+            sys.getsizeof(s) + sys.getsizeof(s.text) + 2 * sys.getsizeof(s.start)
+            for s in segment_objects
+        )
+        assert sys.getsizeof(transcript) * 3 < per_segment
@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+"""
+Tests for the vault index in vault_index.py.
+"""
+
+import os
+
+import pytest
+from get_youtube_data import file_owner, vault_index_path
+from vault_index import VaultIndex
+
+
+@pytest.fixture
+def index(tmp_path):
+    with VaultIndex(vault_index_path(str(tmp_path))) as index:
+        yield index
+
+
+class TestVaultIndex:
+    """Tests for note locations and file digests (P1)."""
+
+    @pytest.mark.p1
+    @pytest.mark.unit
+    def test_note_locations(self, index):
+        index.put_note("dQw4w9WgXcQ", os.path.join("2024", "03", "Test.md"))
+        assert index.note_path("dQw4w9WgXcQ") == os.path.join("2024", "03", "Test.md")
+        assert index.video_at(os.path.join("2024", "03", "Test.md")) == "dQw4w9WgXcQ"
+        assert index.video_at("Test.md") is None
+        assert index.note_path("missing") is None
+
+        index.put_note("dQw4w9WgXcQ", "Test.md")
+        assert index.video_at(os.path.join("2024", "03", "Test.md")) is None
+
+    @pytest.mark.p1
+    @pytest.mark.unit
+    def test_digest_needs_matching_stat(self, index, tmp_path):
+        path = tmp_path / "note.md"
+        path.write_text("text", encoding="utf-8")
+        stat = os.stat(path)
+        index.put_file("note.md", b"digest", stat)
+        assert index.file_digest("note.md", stat) == b"digest"
+
+        path.write_text("longer text", encoding="utf-8")
+        assert index.file_digest("note.md", os.stat(path)) is None
+        index.remove_file("note.md")
+        assert len(index) == 0
+
+
+class TestFileOwner:
+    """Tests for finding whose note a vault file is (P1)."""
+
+    @pytest.mark.p1
+    @pytest.mark.unit
+    def test_known_files_are_not_read(self, tmp_path, index, mocker):
+        vault = str(tmp_path)
+        index.put_note("aaaaaaaaaaa", "Talk.md")
+        index.claim_name("aaaaaaaaaaa", "Talk (Transcript 1)")
+        (tmp_path / "Talk (Transcript 1).md").write_text("part", encoding="utf-8")
+        index.put_file("Talk (Transcript 1).md", b"digest", os.stat(tmp_path))
+        read = mocker.patch("get_youtube_data.note_owner")
+        assert file_owner(vault, index, "Talk.md") == "aaaaaaaaaaa"
+        assert file_owner(vault, index, "Talk (Transcript 1).md") == "aaaaaaaaaaa"
+        read.assert_not_called()
+
+    @pytest.mark.p1
+    @pytest.mark.unit
+    def test_unknown_files_are_read(self, tmp_path, index):
+        (tmp_path / "Mine.md").write_text("---\nyoutube_id: x\n---\n", encoding="utf-8")
+        assert file_owner(str(tmp_path), index, "Mine.md") == "x"
+        assert file_owner(str(tmp_path), index, "Missing.md") is None
+
+
+class TestAllocateName:
+    """Tests for collision-safe note names (P1)."""
+
+    @pytest.mark.p1
+    @pytest.mark.unit
+    def test_collision_gets_short_id(self, index):
+        assert index.allocate_name("aaaaaaaaaaa", "Episode 1") == "Episode 1"
+        assert index.allocate_name("aaaaaaaaaaa", "Episode 1") == "Episode 1"
+        assert index.allocate_name("bbbbbbbbbbb", "episode 1") == "episode 1 (bbbbbb)"
+        assert index.allocate_name("bbbbbbbbbbb", "episode 1") == "episode 1 (bbbbbb)"
+
+    @pytest.mark.p1
+    @pytest.mark.unit
+    def test_full_id_when_short_id_is_taken(self, index):
+        index.allocate_name("aaaaaaaaaaa", "Talk")
+        index.allocate_name("bbbbbbXXXXX", "Talk")
+        assert index.allocate_name("bbbbbbYYYYY", "Talk") == "Talk (bbbbbbYYYYY)"
+
+    @pytest.mark.p1
+    @pytest.mark.unit
+    def test_reservations_are_shared_between_writers(self, tmp_path, index):
+        assert index.allocate_name("aaaaaaaaaaa", "Other") == "Other"
+        with VaultIndex(vault_index_path(str(tmp_path))) as other:
+            # Registry loaded before the first writer takes "Talk".
+            assert other.allocate_name("ccccccccccc", "Other") == "Other (cccccc)"
+            assert index.allocate_name("aaaaaaaaaaa", "Talk") == "Talk"
+            assert other.allocate_name("bbbbbbbbbbb", "Talk") == "Talk (bbbbbb)"
+
+    @pytest.mark.p2
+    @pytest.mark.unit
+    def test_import_keeps_existing_owner(self, index):
+        assert not index.has_names()
+        index.import_names([("aaaaaaaaaaa", "Talk"), ("bbbbbbbbbbb", "Talk")])
+        assert index.has_names()
+        assert index.allocate_name("aaaaaaaaaaa", "Talk") == "Talk"
+        assert index.allocate_name("bbbbbbbbbbb", "Talk") == "Talk (bbbbbb)"
+
+    @pytest.mark.p1
+    @pytest.mark.unit
+    def test_claim_name(self, index):
+        assert index.claim_name("aaaaaaaaaaa", "Talk (Transcript 1)")
+        assert index.claim_name("aaaaaaaaaaa", "talk (transcript 1)")
+        assert not index.claim_name("bbbbbbbbbbb", "Talk (Transcript 1)")
+        index.import_names([("", "Notes")])
+        assert not index.claim_name("aaaaaaaaaaa", "Notes")
+        assert index.allocate_name("aaaaaaaaaaa", "Notes") == "Notes (aaaaaa)"
+
+    @pytest.mark.p1
+    @pytest.mark.unit
+    def test_names_turned_down_are_blocked(self, index):
+        assert index.allocate_name("aaaaaaaaaaa", "Talk") == "Talk"
+        # The file at "Talk" turned out to be someone else's note.
+        free = lambda name: name != "Talk"  # noqa: E731
+        assert index.allocate_name("aaaaaaaaaaa", "Talk", free) == "Talk (aaaaaa)"
+        assert index.name_owner("talk") == ""
+        assert index.allocate_name("aaaaaaaaaaa", "Talk") == "Talk (aaaaaa)"
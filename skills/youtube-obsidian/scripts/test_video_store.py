@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+"""
+Tests for the local video store in video_store.py.
+"""
+
+import pytest
+from get_youtube_data import video_store_path
+from transcript import Segment, Transcript
+from video_store import VideoStore
+
+METADATA = {
+    "title": "Rust Ownership",
+    "description": "Borrowing explained",
+    "tags": ["rust", "memory"],
+    "etag": '"abc"',
+}
+
+
+@pytest.fixture
+def store(tmp_path):
+    with VideoStore(video_store_path(str(tmp_path))) as store:
+        store.put_metadata(
+            "dQw4w9WgXcQ", "https://youtu.be/dQw4w9WgXcQ", METADATA, fetched_at=1.0
+        )
+        yield store
+
+
+class TestVideoStore:
+    """Tests for storing and reading fetched video data (P1)."""
+
+    @pytest.mark.p1
+    @pytest.mark.unit
+    def test_metadata_round_trip(self, store):
+        video = store.get("dQw4w9WgXcQ")
+        assert video["title"] == "Rust Ownership"
+        assert video["tags"] == ["rust", "memory"]
+        assert video["etag"] == '"abc"'
+        assert video["fetched_at"] == 1.0
+        assert video["transcript_language"] == ""
+        assert "dQw4w9WgXcQ" in store
+        assert store.get("missing") is None
+
+    @pytest.mark.p1
+    @pytest.mark.unit
+    def test_touch_keeps_metadata(self, store):
+        store.touch_metadata("dQw4w9WgXcQ", fetched_at=2.0)
+        video = store.get("dQw4w9WgXcQ")
+        assert video["fetched_at"] == 2.0
+        assert video["etag"] == '"abc"'
+
+    @pytest.mark.p1
+    @pytest.mark.unit
+    def test_transcript_track(self, store):
+        transcript = Transcript.from_entries([Segment(0.0, 1.5, "Hello")])
+        transcript.language = "en"
+        transcript.kind = "manual"
+        store.put_transcript("dQw4w9WgXcQ", transcript, fetched_at=3.0)
+        video = store.get("dQw4w9WgXcQ")
+        assert (video["transcript_language"], video["transcript_kind"]) == (
+            "en",
+            "manual",
+        )
+        assert video["transcript_fetched_at"] == 3.0
+        tables = store.connection.execute("SELECT name FROM sqlite_master")
+        assert "segments" not in {name for (name,) in tables}
+
+    @pytest.mark.p1
+    @pytest.mark.unit
+    def test_notes_and_tags(self, store):
+        store.put_note("dQw4w9WgXcQ", "Rust Ownership", ["rust", "memory"])
+        assert store.by_note("Rust Ownership") == "dQw4w9WgXcQ"
+        assert store.notes() == [("dQw4w9WgXcQ", "Rust Ownership")]
+        assert store.tags("dQw4w9WgXcQ") == ["memory", "rust"]
+        assert store.video_ids(tag="rust") == ["dQw4w9WgXcQ"]
+
+        store.put_note("dQw4w9WgXcQ", "Rust Ownership", ["rust"])
+        assert store.video_ids(tag="memory") == []
+        assert store.video_ids() == ["dQw4w9WgXcQ"]
+        assert store.by_note("Other") is None
@@ -0,0 +1,230 @@
+#!/usr/bin/env python3
+"""Compact, timestamp-preserving transcript storage.
+
+A Transcript keeps every segment's text in one contiguous string (the
+segments joined by single spaces, i.e. exactly the text written into the
+note) plus three parallel arrays: character offsets, start times and
+durations. Segment strings are only sliced out when asked for, so a long
+transcript costs roughly its text plus 24 bytes per segment instead of a
+Python object, a str and two floats per segment.
+"""
+
+import re
+import struct
+import sys
+from array import array
+from bisect import bisect_right
+from collections import namedtuple
+
+Segment = namedtuple("Segment", ["start", "duration", "text"])
+
+# Non-speech annotations: "[Music]", "[Applause]", "[ __ ]", "(laughter)", "♪".
+NOISE_PATTERN = re.compile(
+    r"\[[^\]]*\]|\((?:music|applause|laughter|laughs|inaudible)\)|[♪♫]+",
+    re.IGNORECASE,
+)
+# Rolling auto-captions repeat the tail of one segment at the start of the
+# next. Overlaps are searched over at most MAX_OVERLAP_WORDS words, and
+# shorter than MIN_OVERLAP_WORDS are left alone ("no / no" is real speech).
+MAX_OVERLAP_WORDS = 30
+MIN_OVERLAP_WORDS = 2
+
+SIDECAR_MAGIC = b"YTT1"
+SIDECAR_HEADER = struct.Struct("<4sQQ")
+
+
+def format_timestamp(seconds):
+    """Format seconds as m:ss, or h:mm:ss from one hour on."""
+    minutes, secs = divmod(int(seconds), 60)
+    hours, minutes = divmod(minutes, 60)
+    if hours:
+        return f"{hours}:{minutes:02d}:{secs:02d}"
+    return f"{minutes:02d}:{secs:02d}"
+
+
+def _overlap(previous, words):
+    """Length of the longest tail of previous that starts words."""
+    limit = min(len(previous), len(words), MAX_OVERLAP_WORDS)
+    for size in range(limit, MIN_OVERLAP_WORDS - 1, -1):
+        if previous[-size:] == words[:size]:
+            return size
+    return 0
+
+
+def clean_segments(entries, merge_overlaps=False):
+    """Normalize caption entries in one streaming pass.
+
+    Strips non-speech annotations and collapses whitespace; with
+    merge_overlaps, also drops the words a segment repeats from the end of
+    the previous one. Segments left empty are dropped. Yields Segments.
+    Each entry costs at most MAX_OVERLAP_WORDS² word comparisons, so the
+    pass is linear in the transcript length.
+    """
+    previous = []
+    for entry in entries:
+        words = NOISE_PATTERN.sub(" ", entry.text).split()
+        if merge_overlaps:
+            lowered = [word.lower() for word in words]
+            skip = _overlap(previous, lowered)
+            words = words[skip:]
+            if words:
+                previous = (previous + lowered[skip:])[-MAX_OVERLAP_WORDS:]
+        if words:
+            yield Segment(entry.start, entry.duration, " ".join(words))
+
+
+class Transcript:
+    """Transcript text with per-segment offsets and timing."""
+
+    __slots__ = ("text", "offsets", "starts", "durations", "language", "kind")
+
+    def __init__(self, text="", offsets=None, starts=None, durations=None):
+        self.text = text
+        # Caption track the transcript came from, e.g. "en" / "manual". Set
+        # by the fetcher; not part of the sidecar format.
+        self.language = ""
+        self.kind = ""
+        # offsets has one entry per segment plus a sentinel; segment i spans
+        # text[offsets[i] : offsets[i + 1] - 1] (the -1 drops the separator).
+        self.offsets = offsets if offsets is not None else array("Q", [0])
+        self.starts = starts if starts is not None else array("d")
+        self.durations = durations if durations is not None else array("d")
+
+    @classmethod
+    def from_entries(cls, entries):
+        """Build a Transcript from objects with text, start and duration."""
+        texts = []
+        offsets = array("Q", [0])
+        starts = array("d")
+        durations = array("d")
+        position = 0
+        for entry in entries:
+            texts.append(entry.text)
+            position += len(entry.text) + 1
+            offsets.append(position)
+            starts.append(entry.start)
+            durations.append(entry.duration)
+        return cls(" ".join(texts), offsets, starts, durations)
+
+    def __len__(self):
+        return len(self.starts)
+
+    def __str__(self):
+        return self.text
+
+    def __repr__(self):
+        return f"<Transcript {len(self)} segments, {len(self.text)} chars>"
+
+    def __sizeof__(self):
+        return (
+            object.__sizeof__(self)
+            + sys.getsizeof(self.text)
+            + sys.getsizeof(self.offsets)
+            + sys.getsizeof(self.starts)
+            + sys.getsizeof(self.durations)
+        )
+
+    def segment_text(self, index):
+        """Return the text of segment index."""
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("segment index out of range")
+        return self.text[self.offsets[index] : self.offsets[index + 1] - 1]
+
+    def __getitem__(self, index):
+        text = self.segment_text(index)
+        if index < 0:
+            index += len(self)
+        return Segment(self.starts[index], self.durations[index], text)
+
+    def __iter__(self):
+        for index in range(len(self)):
+            yield self[index]
+
+    def index_at(self, seconds):
+        """Return the index of the segment playing at seconds, or -1.
+
+        Uses a binary search over the start times; the result is the last
+        segment starting at or before seconds.
+        """
+        return bisect_right(self.starts, seconds) - 1
+
+    def text_between(self, first, stop):
+        """Return the text of segments first..stop-1 as one slice."""
+        if first >= stop:
+            return ""
+        return self.text[self.offsets[first] : self.offsets[stop] - 1]
+
+    def paragraphs(self, max_seconds=60.0, pause_seconds=2.0, first=0, stop=None):
+        """Group consecutive segments into paragraphs in one linear pass.
+
+        A new paragraph starts once the current one spans max_seconds or when
+        the silence before a segment is at least pause_seconds. Only segments
+        first..stop-1 are considered. Yields (start_seconds, text) tuples;
+        each text is a single slice of the buffer.
+        """
+        stop = len(self) if stop is None else stop
+        for index in range(first + 1, stop):
+            previous_end = self.starts[index - 1] + self.durations[index - 1]
+            if (
+                self.starts[index] - self.starts[first] >= max_seconds
+                or self.starts[index] - previous_end >= pause_seconds
+            ):
+                yield self.starts[first], self.text_between(first, index)
+                first = index
+        if first < stop:
+            yield self.starts[first], self.text_between(first, stop)
+
+    def split_at(self, boundaries):
+        """Bucket segments by sorted boundary times in one merge pass.
+
+        Yields one (first, stop) segment index range per boundary: the
+        segments starting at or after that boundary and before the next.
+        Segments starting before the first boundary go to the first bucket.
+        """
+        first = 0
+        for next_boundary in list(boundaries[1:]) + [None]:
+            stop = first
+            while stop < len(self) and (
+                next_boundary is None or self.starts[stop] < next_boundary
+            ):
+                stop += 1
+            yield first, stop
+            first = stop
+
+    def to_bytes(self):
+        """Serialize to the binary sidecar format."""
+        text = self.text.encode("utf-8")
+        arrays = [self.offsets, self.starts, self.durations]
+        if sys.byteorder == "big":
+            arrays = [array(a.typecode, a) for a in arrays]
+            for a in arrays:
+                a.byteswap()
+        header = SIDECAR_HEADER.pack(SIDECAR_MAGIC, len(self), len(text))
+        return b"".join([header, *(a.tobytes() for a in arrays), text])
+
+    @classmethod
+    def from_bytes(cls, data):
+        """Deserialize a Transcript written by to_bytes."""
+        if len(data) < SIDECAR_HEADER.size:
+            raise ValueError("Truncated transcript sidecar")
+        magic, count, text_size = SIDECAR_HEADER.unpack_from(data)
+        if magic != SIDECAR_MAGIC:
+            raise ValueError("Not a transcript sidecar")
+        pos = SIDECAR_HEADER.size
+        arrays = []
+        for typecode, length in (("Q", count + 1), ("d", count), ("d", count)):
+            a = array(typecode)
+            size = length * a.itemsize
+            a.frombytes(data[pos : pos + size])
+            if len(a) != length:
+                raise ValueError("Truncated transcript sidecar")
+            if sys.byteorder == "big":
+                a.byteswap()
+            arrays.append(a)
+            pos += size
+        text = data[pos : pos + text_size]
+        if len(text) != text_size:
+            raise ValueError("Truncated transcript sidecar")
+        return cls(text.decode("utf-8"), *arrays)
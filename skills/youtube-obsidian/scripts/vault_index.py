@@ -0,0 +1,195 @@
+#!/usr/bin/env python3
+"""Index of the notes and files the skill has written into a vault.
+
+The notes table maps each video to where its note lives, so notes can be
+spread over subdirectories (see --layout) and still be found, and whether
+a note path is taken is one primary-key lookup rather than a filesystem
+probe.
+
+Note names are unique across the vault (Obsidian links notes by name,
+whatever their directory), compared case-insensitively. A name is taken by
+inserting it into the names table, which is atomic across processes
+sharing the vault; a video whose title's name is taken by another video
+(or by a note the skill didn't write) gets its short ID appended.
+
+Each note file is recorded with the digest of its content and the size and
+mtime it had right after it was written. As long as a file's stat still
+matches, its digest is known without reading it back, so deciding whether
+a re-rendered note actually changed costs one stat call.
+"""
+
+import os
+import sqlite3
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS files (
+    path TEXT PRIMARY KEY,
+    digest BLOB NOT NULL,
+    size INTEGER NOT NULL,
+    mtime_ns INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS notes (
+    video_id TEXT PRIMARY KEY,
+    path TEXT NOT NULL UNIQUE
+);
+CREATE TABLE IF NOT EXISTS names (
+    key TEXT PRIMARY KEY,
+    video_id TEXT NOT NULL,
+    name TEXT NOT NULL
+);
+"""
+# Length of the video ID prefix appended to a name that is already taken.
+SHORT_ID = 6
+
+
+class VaultIndex:
+    """Note locations and file digests of a vault."""
+
+    def __init__(self, path):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self.connection = sqlite3.connect(path)
+        self.connection.executescript(SCHEMA)
+        self._names = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def close(self):
+        self.connection.commit()
+        self.connection.close()
+
+    def __len__(self):
+        (count,) = self.connection.execute("SELECT COUNT(*) FROM files").fetchone()
+        return count
+
+    def file_digest(self, path, stat):
+        """Return the stored digest of path if stat still matches, else None."""
+        row = self.connection.execute(
+            "SELECT digest FROM files WHERE path = ? AND size = ? AND mtime_ns = ?",
+            (path, stat.st_size, stat.st_mtime_ns),
+        ).fetchone()
+        return row[0] if row else None
+
+    def put_file(self, path, digest, stat):
+        """Record a file's digest with the stat it was seen with."""
+        self.connection.execute(
+            "INSERT OR REPLACE INTO files VALUES (?, ?, ?, ?)",
+            (path, digest, stat.st_size, stat.st_mtime_ns),
+        )
+
+    def has_file(self, path):
+        """Whether path is a file the index has a digest of."""
+        row = self.connection.execute(
+            "SELECT 1 FROM files WHERE path = ?", (path,)
+        ).fetchone()
+        return row is not None
+
+    def remove_file(self, path):
+        self.connection.execute("DELETE FROM files WHERE path = ?", (path,))
+
+    def commit(self):
+        self.connection.commit()
+
+    def note_path(self, video_id):
+        """Return the vault-relative path of a video's note, or None."""
+        row = self.connection.execute(
+            "SELECT path FROM notes WHERE video_id = ?", (video_id,)
+        ).fetchone()
+        return row[0] if row else None
+
+    def video_at(self, path):
+        """Return the ID of the video whose note is at path, or None."""
+        row = self.connection.execute(
+            "SELECT video_id FROM notes WHERE path = ?", (path,)
+        ).fetchone()
+        return row[0] if row else None
+
+    def put_note(self, video_id, path):
+        """Record where a video's note lives (vault-relative path)."""
+        self.connection.execute(
+            "INSERT OR REPLACE INTO notes VALUES (?, ?)", (video_id, path)
+        )
+
+    def has_names(self):
+        row = self.connection.execute("SELECT 1 FROM names LIMIT 1").fetchone()
+        return row is not None
+
+    def import_names(self, notes):
+        """Register existing [(video_id, name)] notes, keeping earlier owners.
+
+        Notes that belong to no video are registered with video_id "", so
+        their names are never handed out.
+        """
+        with self.connection:
+            self.connection.executemany(
+                "INSERT OR IGNORE INTO names VALUES (?, ?, ?)",
+                ((name.casefold(), video_id, name) for video_id, name in notes),
+            )
+        self._names = None
+
+    def _registry(self):
+        if self._names is None:
+            self._names = dict(
+                self.connection.execute("SELECT key, video_id FROM names")
+            )
+        return self._names
+
+    def name_owner(self, name):
+        """Return the video name is registered to ("" for none), or None."""
+        return self._registry().get(name.casefold())
+
+    def block_name(self, name):
+        """Register name as belonging to no video, e.g. a hand-written note."""
+        key = name.casefold()
+        with self.connection:
+            self.connection.execute(
+                "INSERT OR REPLACE INTO names VALUES (?, '', ?)", (key, name)
+            )
+        self._registry()[key] = ""
+
+    def claim_name(self, video_id, name):
+        """Reserve name for video_id; returns False if another owner has it.
+
+        Taken names are looked up in a registry read once per index; the
+        reservation itself is a committed insert, so concurrent writers
+        can't both get the same name.
+        """
+        names = self._registry()
+        key = name.casefold()
+        owner = names.get(key)
+        if owner is None:
+            try:
+                with self.connection:
+                    self.connection.execute(
+                        "INSERT INTO names VALUES (?, ?, ?)", (key, video_id, name)
+                    )
+                owner = video_id
+            except sqlite3.IntegrityError:
+                # Taken by another writer since the registry was read.
+                (owner,) = self.connection.execute(
+                    "SELECT video_id FROM names WHERE key = ?", (key,)
+                ).fetchone()
+            names[key] = owner
+        return owner == video_id
+
+    def allocate_name(self, video_id, name, free=None):
+        """Reserve a note name for video_id and return it.
+
+        Returns name itself if it is free or already the video's, else name
+        with the short video ID appended (the full ID if even that is
+        taken). free, if given, is asked before a name is claimed whether
+        the vault has room for it; names it turns down are blocked.
+        """
+        candidates = (name, f"{name} ({video_id[:SHORT_ID]})", f"{name} ({video_id})")
+        for candidate in candidates:
+            if self.name_owner(candidate) not in (None, video_id):
+                continue
+            if free is not None and not free(candidate):
+                self.block_name(candidate)
+                continue
+            if self.claim_name(video_id, candidate):
+                return candidate
+        raise ValueError(f"No free note name for video {video_id}: {name}")
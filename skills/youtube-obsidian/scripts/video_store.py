@@ -0,0 +1,178 @@
+#!/usr/bin/env python3
+"""Local SQLite store of everything fetched for a video.
+
+The store keeps the API metadata (with its ETag and fetch time), the
+track and fetch time of each transcript and the tags each note was
+rendered with, so notes can be re-rendered, refreshed and queried from
+indexed tables instead of API calls or vault scans. The transcripts
+themselves live in the transcript archive (see archive.py) only.
+User-written sections (summary, comments) stay in the notes, where they
+are edited.
+"""
+
+import json
+import os
+import sqlite3
+import time
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS videos (
+    video_id TEXT PRIMARY KEY,
+    url TEXT NOT NULL,
+    title TEXT NOT NULL,
+    description TEXT NOT NULL,
+    youtube_tags TEXT NOT NULL,
+    channel TEXT,
+    published_at TEXT,
+    etag TEXT,
+    fetched_at REAL NOT NULL,
+    transcript_language TEXT,
+    transcript_kind TEXT,
+    transcript_fetched_at REAL,
+    note TEXT
+);
+CREATE INDEX IF NOT EXISTS videos_by_note ON videos (note);
+CREATE TABLE IF NOT EXISTS tags (
+    video_id TEXT NOT NULL,
+    tag TEXT NOT NULL,
+    PRIMARY KEY (video_id, tag)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS tags_by_tag ON tags (tag);
+"""
+
+
+class VideoStore:
+    """Canonical local copy of fetched video data."""
+
+    def __init__(self, path):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self.connection = sqlite3.connect(path)
+        self.connection.executescript(SCHEMA)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def close(self):
+        self.connection.close()
+
+    def __contains__(self, video_id):
+        row = self.connection.execute(
+            "SELECT 1 FROM videos WHERE video_id = ?", (video_id,)
+        ).fetchone()
+        return row is not None
+
+    def put_metadata(self, video_id, url, metadata, fetched_at=None):
+        """Store API metadata (title, description, tags, channel, etc.)."""
+        fetched_at = time.time() if fetched_at is None else fetched_at
+        with self.connection:
+            self.connection.execute(
+                "INSERT INTO videos (video_id, url, title, description, "
+                "youtube_tags, channel, published_at, etag, fetched_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?) "
+                "ON CONFLICT (video_id) DO UPDATE SET url = excluded.url, "
+                "title = excluded.title, description = excluded.description, "
+                "youtube_tags = excluded.youtube_tags, channel = excluded.channel, "
+                "published_at = excluded.published_at, etag = excluded.etag, "
+                "fetched_at = excluded.fetched_at",
+                (
+                    video_id,
+                    url,
+                    metadata["title"],
+                    metadata["description"],
+                    json.dumps(metadata.get("tags", [])),
+                    metadata.get("channel"),
+                    metadata.get("published_at"),
+                    metadata.get("etag"),
+                    fetched_at,
+                ),
+            )
+
+    def touch_metadata(self, video_id, fetched_at=None):
+        """Record that stored metadata was revalidated (HTTP 304)."""
+        fetched_at = time.time() if fetched_at is None else fetched_at
+        with self.connection:
+            self.connection.execute(
+                "UPDATE videos SET fetched_at = ? WHERE video_id = ?",
+                (fetched_at, video_id),
+            )
+
+    def put_transcript(self, video_id, transcript, fetched_at=None):
+        """Record the track and fetch time of a video's archived transcript."""
+        fetched_at = time.time() if fetched_at is None else fetched_at
+        with self.connection:
+            self.connection.execute(
+                "UPDATE videos SET transcript_language = ?, transcript_kind = ?, "
+                "transcript_fetched_at = ? WHERE video_id = ?",
+                (transcript.language, transcript.kind, fetched_at, video_id),
+            )
+
+    def put_note(self, video_id, note, tags):
+        """Record the note a video was rendered to and its tags."""
+        with self.connection:
+            self.connection.execute(
+                "UPDATE videos SET note = ? WHERE video_id = ?", (note, video_id)
+            )
+            self.connection.execute("DELETE FROM tags WHERE video_id = ?", (video_id,))
+            self.connection.executemany(
+                "INSERT OR IGNORE INTO tags VALUES (?, ?)",
+                ((video_id, tag) for tag in tags),
+            )
+
+    def get(self, video_id):
+        """Return a stored video as a dict, or None.
+
+        The dict has the metadata keys the renderer expects (title,
+        description, tags = YouTube's tags, transcript_language,
+        transcript_kind) plus url, channel, published_at, etag, fetched_at,
+        transcript_fetched_at and note.
+        """
+        self.connection.row_factory = sqlite3.Row
+        try:
+            row = self.connection.execute(
+                "SELECT * FROM videos WHERE video_id = ?", (video_id,)
+            ).fetchone()
+        finally:
+            self.connection.row_factory = None
+        if row is None:
+            return None
+        video = dict(row)
+        video["tags"] = json.loads(video.pop("youtube_tags"))
+        video["transcript_language"] = video["transcript_language"] or ""
+        video["transcript_kind"] = video["transcript_kind"] or ""
+        return video
+
+    def tags(self, video_id):
+        """Return the tags a video's note was rendered with."""
+        rows = self.connection.execute(
+            "SELECT tag FROM tags WHERE video_id = ? ORDER BY tag", (video_id,)
+        )
+        return [tag for (tag,) in rows]
+
+    def video_ids(self, tag=None):
+        """Return stored video IDs, optionally only those tagged tag."""
+        if tag is None:
+            rows = self.connection.execute(
+                "SELECT video_id FROM videos ORDER BY video_id"
+            )
+        else:
+            rows = self.connection.execute(
+                "SELECT video_id FROM tags WHERE tag = ? ORDER BY video_id", (tag,)
+            )
+        return [video_id for (video_id,) in rows]
+
+    def notes(self):
+        """Return [(video_id, note)] for every video rendered to a note."""
+        rows = self.connection.execute(
+            "SELECT video_id, note FROM videos WHERE note IS NOT NULL ORDER BY video_id"
+        )
+        return rows.fetchall()
+
+    def by_note(self, note):
+        """Return the video ID rendered to note, or None."""
+        row = self.connection.execute(
+            "SELECT video_id FROM videos WHERE note = ?", (note,)
+        ).fetchone()
+        return row[0] if row else None